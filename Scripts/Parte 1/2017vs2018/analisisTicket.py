@@ -1,28 +1,42 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import os
+import sys
 
 # === Cargar datos ===
 script_dir = os.path.dirname(os.path.abspath(__file__))
 os.chdir(script_dir)
-data = pd.read_csv(script_dir + "/../../DATA/cadena_subministrament_2015_2018.csv", sep=",")
-
-# === Preparar datos ===
-data['order_date_dateorders'] = pd.to_datetime(data['order_date_dateorders'], errors='coerce')
-data = data.dropna(subset=['order_date_dateorders'])
-
-# Dividir antes y después de septiembre 2017
-antes_sep = data[data['order_date_dateorders'] < '2017-09-01']
-despues_sep = data[data['order_date_dateorders'] >= '2017-09-01']
+sys.path.insert(0, os.path.join(script_dir, "..", ".."))
+from comun.cortes import mejor_corte, nombre_corte
+from comun.cubo import cargar_cubo
+from comun.kpis import ratios_cubo
+from comun.topk import top_k
+
+# Mes de corte: el cambio más significativo en el reparto por categoría (comun/cortes.py);
+# para fijarlo a mano, p. ej. CORTE = pd.Timestamp('2017-09-01')
+CORTE = mejor_corte()
+NOMBRE = nombre_corte(CORTE)
+# Los ficheros se llaman igual con cualquier corte (..._corte.png): el mes sale en los títulos y aquí
+print(f"Mes de corte: {NOMBRE}")
+
+# === Preparar datos: celdas del cubo de ventas ===
+cubo = cargar_cubo()
+
+# Dividir antes y después del corte (order_month es el primer día del mes)
+antes_corte = cubo[cubo['order_month'] < CORTE]
+despues_corte = cubo[cubo['order_month'] >= CORTE]
 
 # =============================
-# Ticket medio por categoría
+# Ticket medio por categoría (ventas / pedidos distintos)
 # =============================
-ticket_antes = antes_sep.groupby('category_name').apply(lambda g: g['sales'].sum() / g['order_id'].nunique())
-ticket_despues = despues_sep.groupby('category_name').apply(lambda g: g['sales'].sum() / g['order_id'].nunique())
+def ticket_medio(celdas):
+    return ratios_cubo('category_name', 'ticket_medio', celdas)['ticket_medio']
+
+ticket_antes = ticket_medio(antes_corte)
+ticket_despues = ticket_medio(despues_corte)
 
 # Seleccionar top 10 categorías con mayor ticket antes o después
-top_categorias = pd.concat([ticket_antes, ticket_despues]).sort_values(ascending=False).head(10).index
+top_categorias = top_k(pd.concat([ticket_antes, ticket_despues]).to_frame('ticket'), 10, 'ticket').index
 
 ticket_antes = ticket_antes[top_categorias].sort_values(ascending=True)
 ticket_despues = ticket_despues[top_categorias].sort_values(ascending=True)
@@ -30,19 +44,19 @@ ticket_despues = ticket_despues[top_categorias].sort_values(ascending=True)
 # --- Gráfico ticket medio antes ---
 plt.figure(figsize=(12,6))
 ticket_antes.plot(kind='barh', color='steelblue', alpha=0.8)
-plt.title('Ticket medio por categoría ANTES de septiembre 2017', fontsize=14, fontweight='bold')
+plt.title(f'Ticket medio por categoría ANTES de {NOMBRE}', fontsize=14, fontweight='bold')
 plt.xlabel('Ticket medio (€)')
 plt.ylabel('Categoría')
 plt.tight_layout()
-plt.savefig('ticket_medio_por_categoria_antes_sep2017.png', dpi=300)
+plt.savefig('ticket_medio_por_categoria_antes_corte.png', dpi=300)
 plt.show()
 
 # --- Gráfico ticket medio después ---
 plt.figure(figsize=(12,6))
 ticket_despues.plot(kind='barh', color='orange', alpha=0.8)
-plt.title('Ticket medio por categoría DESDE septiembre 2017', fontsize=14, fontweight='bold')
+plt.title(f'Ticket medio por categoría DESDE {NOMBRE}', fontsize=14, fontweight='bold')
 plt.xlabel('Ticket medio (€)')
 plt.ylabel('Categoría')
 plt.tight_layout()
-plt.savefig('ticket_medio_por_categoria_despues_sep2017.png', dpi=300)
+plt.savefig('ticket_medio_por_categoria_despues_corte.png', dpi=300)
 plt.show()
@@ -0,0 +1,94 @@
+import matplotlib.pyplot as plt
+import os
+import sys
+
+# === Cargar datos ===
+script_dir = os.path.dirname(os.path.abspath(__file__))
+os.chdir(script_dir)
+sys.path.insert(0, os.path.join(script_dir, "..", ".."))
+from comun.cortes import mejor_corte, nombre_corte
+from comun.datos import cargar_datos
+from comun.kpis import ratios_medidas
+from comun.series import serie
+
+# Mes de corte: el cambio más significativo en el reparto por categoría (comun/cortes.py);
+# para fijarlo a mano, p. ej. CORTE = pd.Timestamp('2017-09-01')
+CORTE = mejor_corte()
+NOMBRE = nombre_corte(CORTE)
+# Los ficheros se llaman igual con cualquier corte (..._corte.png): el mes sale en los títulos y aquí
+print(f"Mes de corte: {NOMBRE}")
+
+# Series mensuales desde el corte, sumadas desde la serie diaria precalculada
+ventas_mercado = serie('ventas', grano='M', por='market', desde=CORTE).rename_axis(['mes', 'market']).reset_index()
+# Ventas, pedidos distintos y ticket medio por mes
+kpis_mes = ratios_medidas(serie(['ventas', 'pedidos'], grano='M', desde=CORTE).rename_axis('mes'),
+                          ['ticket_medio'], componentes=True)
+
+# Los estados de pedido no están en la serie: solo se leen las particiones de esos meses
+data = cargar_datos(["order_month", "order_status"], desde=CORTE)
+
+# Columna mensual (clave de calendario precalculada)
+data = data.rename(columns={'order_month': 'mes'})
+
+# ==========================
+# 1. Ventas mensuales por mercado
+# ==========================
+plt.figure(figsize=(12,6))
+for mkt in ventas_mercado['market'].unique():
+    sub = ventas_mercado[ventas_mercado['market'] == mkt]
+    plt.plot(sub['mes'], sub['ventas'], marker='o', label=mkt)
+
+plt.title(f'Ventas mensuales por mercado (desde {NOMBRE})', fontsize=14, fontweight='bold')
+plt.xlabel('Fecha')
+plt.ylabel('Ventas totales')
+plt.legend()
+plt.grid(True, linestyle='--', alpha=0.5)
+plt.tight_layout()
+plt.savefig("ventas_mensuales_por_mercado_desde_corte.png", dpi=300)
+plt.show()
+
+# ==========================
+# 2. Número de pedidos por mes
+# ==========================
+pedidos_mes = kpis_mes['order_id__nunique']
+
+plt.figure(figsize=(12,5))
+plt.plot(pedidos_mes.index, pedidos_mes.values, marker='o', color='blue')
+plt.title(f'Número de pedidos por mes (desde {NOMBRE})', fontsize=14, fontweight='bold')
+plt.ylabel('Pedidos únicos')
+plt.xlabel('Fecha')
+plt.grid(True, linestyle='--', alpha=0.5)
+plt.tight_layout()
+plt.savefig("pedidos_por_mes_desde_corte.png", dpi=300)
+plt.show()
+
+# ==========================
+# 3. Ticket medio por pedido
+# ==========================
+ticket_medio = kpis_mes['ticket_medio']
+
+plt.figure(figsize=(12,5))
+plt.plot(ticket_medio.index, ticket_medio.values, marker='o', color='green')
+plt.title(f'Ticket medio por pedido (desde {NOMBRE})', fontsize=14, fontweight='bold')
+plt.ylabel('Ticket medio (€)')
+plt.xlabel('Fecha')
+plt.grid(True, linestyle='--', alpha=0.5)
+plt.tight_layout()
+plt.savefig("ticket_medio_por_pedido_desde_corte.png", dpi=300)
+plt.show()
+
+# ==========================
+# 4. Distribución de estados de pedidos
+# ==========================
+estado_mes = data.groupby(['mes','order_status'], observed=True).size().unstack(fill_value=0)
+estado_mes_prop = estado_mes.div(estado_mes.sum(axis=1), axis=0) * 100
+
+plt.figure(figsize=(12,6))
+estado_mes_prop.plot(kind='area', stacked=True, figsize=(12,6), colormap='tab20', ax=plt.gca())
+plt.title(f'Distribución porcentual de estados de pedidos (desde {NOMBRE})', fontsize=14, fontweight='bold')
+plt.ylabel('% de pedidos')
+plt.xlabel('Fecha')
+plt.legend(loc='center left', bbox_to_anchor=(1.0, 0.5))
+plt.tight_layout()
+plt.savefig("distribucion_estados_pedidos_desde_corte.png", dpi=300)
+plt.show()
@@ -1,62 +1,62 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 import os
+import sys
 
 # === Cargar datos ===
 script_dir = os.path.dirname(os.path.abspath(__file__))
 os.chdir(script_dir)
-data = pd.read_csv(script_dir + "/../../DATA/cadena_subministrament_2015_2018.csv", sep=",")
+sys.path.insert(0, os.path.join(script_dir, "..", ".."))
+from comun.cortes import barrido_cortes, nombre_corte
+from comun.cubo import cargar_cubo, consultar_cubo
+from comun.topk import top_k
 
-# === Preparar datos ===
-data['order_date_dateorders'] = pd.to_datetime(data['order_date_dateorders'], errors='coerce')
-data = data.dropna(subset=['order_date_dateorders'])
+# === Mes de corte: se prueban todos los meses a la vez (comun/cortes.py) ===
+cortes = barrido_cortes()
+print("Meses de corte más significativos (chi² del reparto por categoría):")
+print(cortes.head(5).to_string(float_format=lambda v: f"{v:.4g}"))
+# El más significativo; para fijarlo a mano, p. ej. CORTE = pd.Timestamp('2017-09-01')
+CORTE = cortes.index[0]
+NOMBRE = nombre_corte(CORTE)
+# Los ficheros se llaman igual con cualquier corte (..._corte.png): el mes sale en los títulos y aquí
+print(f"Mes de corte: {NOMBRE}")
 
-# Dividir datos antes y después de septiembre 2017
-antes_sep = data[data['order_date_dateorders'] < '2017-09-01']
-despues_sep = data[data['order_date_dateorders'] >= '2017-09-01']
+# === Preparar datos: celdas del cubo de ventas (mes x categoría x ...) ===
+cubo = cargar_cubo()
 
-# --- Top 10 categorías antes ---
-ventas_antes = (
-    antes_sep.groupby('category_name')['sales']
-    .sum()
-    .sort_values(ascending=False)
-    .head(10)
-)
+# Dividir datos antes y después del corte (order_month es el primer día del mes)
+antes_corte = cubo[cubo['order_month'] < CORTE]
+despues_corte = cubo[cubo['order_month'] >= CORTE]
 
-# --- Top 10 categorías después ---
-ventas_despues = (
-    despues_sep.groupby('category_name')['sales']
-    .sum()
-    .sort_values(ascending=False)
-    .head(10)
-)
+# --- Agrupar ventas totales por categoría ---
+ventas_antes = consultar_cubo('category_name', antes_corte)['ventas']
+ventas_despues = consultar_cubo('category_name', despues_corte)['ventas']
+
+# --- Top 10 categorías antes y después ---
+top10_antes = top_k(ventas_antes.to_frame(), 10, 'ventas')['ventas']
+top10_despues = top_k(ventas_despues.to_frame(), 10, 'ventas')['ventas']
 
-# === Gráfico antes de septiembre 2017 ===
+# === Gráfico antes del corte ===
 plt.figure(figsize=(12,6))
-ventas_antes.sort_values().plot(kind='barh', color='steelblue', alpha=0.8)
-plt.title('Top 10 categorías por ventas ANTES de septiembre 2017', fontsize=14, fontweight='bold')
+top10_antes.sort_values().plot(kind='barh', color='steelblue', alpha=0.8)
+plt.title(f'Top 10 categorías por ventas ANTES de {NOMBRE}', fontsize=14, fontweight='bold')
 plt.xlabel('Ventas totales')
 plt.ylabel('Categoría')
 plt.tight_layout()
-plt.savefig('top10_categorias_antes_sep2017.png', dpi=300)
+plt.savefig('top10_categorias_antes_corte.png', dpi=300)
 plt.show()
 
-# === Gráfico desde septiembre 2017 ===
+# === Gráfico desde el corte ===
 plt.figure(figsize=(12,6))
-ventas_despues.sort_values().plot(kind='barh', color='orange', alpha=0.8)
-plt.title('Top 10 categorías por ventas DESDE septiembre 2017', fontsize=14, fontweight='bold')
+top10_despues.sort_values().plot(kind='barh', color='orange', alpha=0.8)
+plt.title(f'Top 10 categorías por ventas DESDE {NOMBRE}', fontsize=14, fontweight='bold')
 plt.xlabel('Ventas totales')
 plt.ylabel('Categoría')
 plt.tight_layout()
-plt.savefig('top10_categorias_despues_sep2017.png', dpi=300)
+plt.savefig('top10_categorias_despues_corte.png', dpi=300)
 plt.show()
 
-# --- Agrupar ventas totales por categoría ---
-ventas_antes = antes_sep.groupby('category_name')['sales'].sum()
-ventas_despues = despues_sep.groupby('category_name')['sales'].sum()
-
 # Seleccionamos top 8 categorías por ventas totales globales
-top_categorias = (ventas_antes + ventas_despues).sort_values(ascending=False).head(8).index
+top_categorias = top_k((ventas_antes + ventas_despues).to_frame('ventas'), 8, 'ventas').index
 
 # Filtramos y calculamos porcentajes
 pct_antes = (ventas_antes[top_categorias] / ventas_antes.sum()) * 100
@@ -67,13 +67,13 @@ x = range(len(top_categorias))
 width = 0.35
 
 plt.figure(figsize=(12,6))
-plt.bar(x, pct_antes, width, label='Antes Sep 2017', color='steelblue', alpha=0.7)
-plt.bar([i + width for i in x], pct_despues, width, label='Desde Sep 2017', color='orange', alpha=0.7)
+plt.bar(x, pct_antes, width, label=f'Antes {NOMBRE}', color='steelblue', alpha=0.7)
+plt.bar([i + width for i in x], pct_despues, width, label=f'Desde {NOMBRE}', color='orange', alpha=0.7)
 
 plt.xticks([i + width/2 for i in x], top_categorias, rotation=45, ha='right')
 plt.ylabel('% sobre ventas totales')
-plt.title('Cambio en la distribución de ventas por categoría (Antes vs Después Sep 2017)', fontsize=14, fontweight='bold')
+plt.title(f'Cambio en la distribución de ventas por categoría (Antes vs Después {NOMBRE})', fontsize=14, fontweight='bold')
 plt.legend()
 plt.tight_layout()
-plt.savefig('comparacion_porcentual_categorias_antes_despues_sep2017.png', dpi=300)
+plt.savefig('comparacion_porcentual_categorias_antes_despues_corte.png', dpi=300)
 plt.show()
\ No newline at end of file
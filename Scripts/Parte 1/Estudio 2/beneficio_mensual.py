@@ -1,15 +1,14 @@
-import pandas as pd, numpy as np, matplotlib.pyplot as plt, os
-from scipy import stats
+import numpy as np, matplotlib.pyplot as plt, os, sys
 
 script_dir = os.path.dirname(os.path.abspath(__file__)); os.chdir(script_dir)
-df = pd.read_csv(script_dir + "/../../DATA/cadena_subministrament_2015_2018.csv")
+sys.path.insert(0, os.path.join(script_dir, "..", "..")); from comun.series import contrastes_serie, serie
+from comun.bootstrap import bootstrap_regresion
 
-col_date = next((c for c in df.columns if "date" in c.lower()), "order_date")
-df[col_date] = pd.to_datetime(df[col_date], errors="coerce")
-col_profit = [c for c in df.columns if any(k in c.lower() for k in ["profit","benefit","margin"])][0]
-
-d = df.dropna(subset=[col_date, col_profit])
-m = d.groupby(pd.Grouper(key=col_date, freq="ME"))[col_profit].sum().reset_index(name="profit_sum")
+# Beneficio (benefit_per_order) sumado por mes desde la serie diaria precalculada, con el último día
+# del mes como etiqueta (como freq="ME"; meses sin pedidos = 0)
+col_date = "order_month"
+m = serie("beneficio", grano="M", etiqueta="fin")["beneficio"].rename("profit_sum")
+m = m.rename_axis(col_date).reset_index()
 
 plt.figure(figsize=(13,5))
 plt.plot(m[col_date], m["profit_sum"], marker="o")
@@ -18,8 +17,12 @@ plt.grid(True, linestyle="--", alpha=0.6); plt.tight_layout()
 plt.savefig("g4_beneficio_mensual_simple.png"); plt.show()
 
 m["t"] = np.arange(len(m))
-r, p = stats.pearsonr(m["t"], m["profit_sum"])
+c = contrastes_serie(m["profit_sum"])
+r, p = c["r"], c["p_tendencia"]
 print(f"Correlación tiempo–beneficio: R={r:.3f}, p={p:.4e}")
+ic = bootstrap_regresion(m["t"], m["profit_sum"]).intervalos()
+print(f"IC 95 % bootstrap: R=[{ic.loc['r','inferior']:.3f}, {ic.loc['r','superior']:.3f}], "
+      f"tendencia={ic.loc['pendiente','estimacion']:.0f} €/mes [{ic.loc['pendiente','inferior']:.0f}, {ic.loc['pendiente','superior']:.0f}]")
 print("Tendencia creciente significativa." if (p<0.05 and r>0)
       else "Tendencia decreciente significativa." if (p<0.05 and r<0)
       else "Sin tendencia lineal significativa.")
@@ -1,21 +1,25 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 from scipy import stats
 import os
+import sys
 
 # Obtener carpeta del script y no donde la ejecutamos
 script_dir = os.path.dirname(os.path.abspath(__file__))
 os.chdir(script_dir)
 
 # Cargar datos
-data = pd.read_csv(script_dir + "/../../DATA/cadena_subministrament_2015_2018.csv", sep=",")
+sys.path.insert(0, os.path.join(script_dir, "..", ".."))
+from comun.bootstrap import bootstrap_regresion
+from comun.datos import cargar_datos
+from comun.graficos import dispersion_densidad
 
-# Detectar columnas equivalentes
-# (ajusta si en tu dataset los nombres son diferentes)
-col_discount = [c for c in data.columns if "discount" in c.lower()][0]
-col_sales = [c for c in data.columns if "sales" in c.lower() or "total" in c.lower()][0]
-col_profit = [c for c in data.columns if "profit" in c.lower() or "benefit" in c.lower() or "margin" in c.lower()][0]
+# Columnas (las que encontraba la búsqueda por nombre sobre el diccionario)
+col_discount = "order_item_discount"
+col_sales = "sales_per_customer"
+col_profit = "benefit_per_order"
+
+data = cargar_datos([col_discount, col_sales, col_profit])
 
 
 
@@ -25,18 +29,22 @@ data["margin_pct"] = 100 * data[col_profit] / data[col_sales].replace(0, np.nan)
 # Eliminar valores nulos o erróneos
 data = data.dropna(subset=[col_discount, "margin_pct"])
 
-# Crear gráfica de dispersión
+# Crear gráfica de dispersión (rasterizada: filas por celda, para que no dependa del nº de filas)
 plt.figure(figsize=(10, 6))
-plt.scatter(data[col_discount], data["margin_pct"], alpha=0.4, c="blue")
+im = dispersion_densidad(data[col_discount], data["margin_pct"], cmap="Blues")
+plt.colorbar(im, label="Filas por celda")
 plt.title("Relación entre Descuento y Margen (%)")
 plt.xlabel(f"Descuento ({col_discount})")
 plt.ylabel("Margen (%)")
 plt.grid(True, linestyle="--", alpha=0.7)
 
-# Línea de tendencia
-z = np.polyfit(data[col_discount], data["margin_pct"], 1)
+# Línea de tendencia con su banda de confianza del 95 % (bootstrap)
+boot = bootstrap_regresion(data[col_discount], data["margin_pct"])
+pendiente, ordenada = boot.estimacion["pendiente"], boot.estimacion["ordenada"]
 xline = np.linspace(data[col_discount].min(), data[col_discount].max(), 100)
-plt.plot(xline, z[0]*xline + z[1], color="red", linewidth=2, label="Tendencia lineal")
+plt.plot(xline, pendiente*xline + ordenada, color="red", linewidth=2, label="Tendencia lineal")
+banda_inf, banda_sup = boot.banda(xline)
+plt.fill_between(xline, banda_inf, banda_sup, color="red", alpha=0.2, label="IC 95 % (bootstrap)")
 plt.legend()
 
 # Guardar y mostrar
@@ -47,6 +55,9 @@ plt.show()
 # Análisis estadístico simple: correlación Pearson
 r, p = stats.pearsonr(data[col_discount], data["margin_pct"])
 print(f"Correlación de Pearson: R = {r:.3f}, p = {p:.4f}")
+ic = boot.intervalos()
+print(f"IC 95 % bootstrap: R en [{ic.loc['r', 'inferior']:.3f}, {ic.loc['r', 'superior']:.3f}], "
+      f"pendiente {pendiente:.3f} en [{ic.loc['pendiente', 'inferior']:.3f}, {ic.loc['pendiente', 'superior']:.3f}]")
 if p < 0.05 and r < 0:
     print("Existe una correlación negativa significativa: a mayor descuento, menor margen.")
 elif p < 0.05 and r > 0:
@@ -1,13 +1,12 @@
-import pandas as pd, numpy as np, matplotlib.pyplot as plt, os
-from scipy import stats
+import numpy as np, matplotlib.pyplot as plt, os, sys
 
 script_dir = os.path.dirname(os.path.abspath(__file__)); os.chdir(script_dir)
-df = pd.read_csv(script_dir + "/../../DATA/cadena_subministrament_2015_2018.csv")
+sys.path.insert(0, os.path.join(script_dir, "..", "..")); from comun.datos import cargar_datos
+from comun.estadistica import anova, momentos
 
-# Detección simple de columnas
-col_cat = [c for c in df.columns if "category" in c.lower()][0]
-col_sales = [c for c in df.columns if ("sales" in c.lower() or "total" in c.lower())][0]
-col_profit = [c for c in df.columns if any(k in c.lower() for k in ["profit","benefit","margin"])][0]
+# Columnas (las que encontraba la búsqueda por nombre sobre el diccionario)
+col_cat, col_sales, col_profit = "category_id", "sales_per_customer", "benefit_per_order"
+df = cargar_datos([col_cat, col_sales, col_profit])
 
 df["margin_pct"] = 100 * df[col_profit] / df[col_sales].replace(0, np.nan)
 df = df.dropna(subset=["margin_pct", col_cat])
@@ -25,7 +24,6 @@ plt.xticks(rotation=35, ha="right"); plt.grid(axis="y", linestyle="--", alpha=0.
 plt.tight_layout(); plt.savefig("g2_boxplot_margen_categoria_simple.png"); plt.show()
 
 # ANOVA simple
-groups = [g["margin_pct"].values for _, g in d.groupby(col_cat)]
-F, p = stats.f_oneway(*groups)
+F, p = anova(momentos(d, col_cat, "margin_pct"))
 print(f"ANOVA: F={F:.2f}, p={p:.4e}")
 print("Diferencias significativas entre categorías." if p<0.05 else "No hay diferencias significativas.")
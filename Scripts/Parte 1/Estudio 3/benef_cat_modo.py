@@ -1,24 +1,26 @@
-import pandas as pd, numpy as np, matplotlib.pyplot as plt, os
-from scipy import stats
+import numpy as np, matplotlib.pyplot as plt, os, sys
 
 # --- Setup y carga ---
 script_dir = os.path.dirname(os.path.abspath(__file__)); os.chdir(script_dir)
-df = pd.read_csv(script_dir + "/../../DATA/cadena_subministrament_2015_2018.csv")
+sys.path.insert(0, os.path.join(script_dir, "..", "..")); from comun.datos import cargar_datos
+from comun.estadistica import agrupar_momentos, anova, medias, momentos
+from comun.topk import top_k
 
 # --- Columnas (según tu diccionario) ---
 col_cat, col_mode, col_ratio = "category_name", "shipping_mode", "order_item_profit_ratio"
 
 # --- Datos y limpieza ---
-d = df[[col_cat, col_mode, col_ratio]].dropna()
+d = cargar_datos([col_cat, col_mode, col_ratio]).dropna()
 d = d[(d[col_ratio] > -10) & (d[col_ratio] < 10)]
 
 # --- (Opcional) limitar a Top N categorías por nº de filas para que sea legible ---
 TOP_N = 12
-top_cats = d[col_cat].value_counts().nlargest(TOP_N).index
+top_cats = top_k(d.groupby(col_cat, observed=True).size().to_frame("filas"), TOP_N, "filas").index
 d = d[d[col_cat].isin(top_cats)]
 
-# --- Agregado y barras agrupadas ---
-agg = d.groupby([col_cat, col_mode])[col_ratio].mean().unstack(col_mode).fillna(0)
+# --- Agregado y barras agrupadas (momentos por categoría x modo, una sola pasada) ---
+mom = momentos(d, [col_cat, col_mode], col_ratio)
+agg = medias(mom).unstack(col_mode).fillna(0)
 x = np.arange(len(agg.index)); modes = agg.columns; width = 0.8/len(modes)
 
 plt.figure(figsize=(13,5))
@@ -31,8 +33,8 @@ plt.legend(title="Modo")
 plt.tight_layout(); plt.savefig("g1_beneficio_cat_modo.png"); plt.show()
 
 # --- Estadística breve (ANOVA 1-factor) ---
-F_cat, p_cat = stats.f_oneway(*[g[col_ratio].values for _, g in d.groupby(col_cat)])
-F_mod, p_mod = stats.f_oneway(*[g[col_ratio].values for _, g in d.groupby(col_mode)])
+F_cat, p_cat = anova(agrupar_momentos(mom, col_cat))
+F_mod, p_mod = anova(agrupar_momentos(mom, col_mode))
 print(f"ANOVA categoría: F={F_cat:.3f}, p={p_cat:.3e}")
 print(f"ANOVA modo:      F={F_mod:.3f}, p={p_mod:.3e}")
 print("Interpretación rápida: p<0.05 => diferencias significativas en el beneficio medio.")
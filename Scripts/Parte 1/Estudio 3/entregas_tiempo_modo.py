@@ -1,15 +1,18 @@
-import pandas as pd, numpy as np, matplotlib.pyplot as plt, os
-from scipy.stats import chi2_contingency
+import numpy as np, matplotlib.pyplot as plt, os, sys
 
 script_dir = os.path.dirname(os.path.abspath(__file__)); os.chdir(script_dir)
-df = pd.read_csv(script_dir + "/../../DATA/cadena_subministrament_2015_2018.csv")
+sys.path.insert(0, os.path.join(script_dir, "..", "..")); from comun.cubo import consultar_cubo
+from comun.contingencia import chi_cuadrado, tabla_contingencia, v_cramer
 
 col_status, col_mode, col_cat = "delivery_status","shipping_mode","category_name"
 
-d = df[[col_status,col_mode,col_cat]].dropna()
+# Líneas por modo x categoría x estado, del cubo de ventas
+d = consultar_cubo([col_mode,col_cat,col_status])["lineas"].reset_index()
 d["on_time"] = d[col_status].str.lower().isin({"shipping on time","on time","delivered on time","entregado a tiempo"}).astype(int)
 
-pct = d.groupby([col_mode,col_cat])["on_time"].mean().unstack(col_cat)*100
+lineas = d.groupby([col_mode,col_cat], observed=True)["lineas"].sum()
+a_tiempo = d[d["on_time"] == 1].groupby([col_mode,col_cat], observed=True)["lineas"].sum()
+pct = (a_tiempo.reindex(lineas.index, fill_value=0) / lineas).unstack(col_cat)*100
 pct = pct.fillna(0)
 
 plt.figure(figsize=(13,5))
@@ -21,7 +24,9 @@ cb = plt.colorbar(im); cb.set_label("% on-time")
 plt.tight_layout(); plt.savefig("g2_on_time_heatmap.png"); plt.show()
 
 # Estadística breve (Chi²: puntualidad ~ modo / categoría)
-chi_m, p_m, _, _ = chi2_contingency(pd.crosstab(d[col_mode], d["on_time"]))
-chi_c, p_c, _, _ = chi2_contingency(pd.crosstab(d[col_cat],  d["on_time"]))
-print(f"Chi² on_time ~ modo:     p={p_m:.3e}")
-print(f"Chi² on_time ~ categoría: p={p_c:.3e}")
+t_m = tabla_contingencia(d, col_mode, "on_time", pesos="lineas")
+t_c = tabla_contingencia(d, col_cat,  "on_time", pesos="lineas")
+chi_m, p_m, _ = chi_cuadrado(t_m)
+chi_c, p_c, _ = chi_cuadrado(t_c)
+print(f"Chi² on_time ~ modo:     p={p_m:.3e}  V de Cramér={v_cramer(t_m):.3f}")
+print(f"Chi² on_time ~ categoría: p={p_c:.3e}  V de Cramér={v_cramer(t_c):.3f}")
@@ -1,21 +1,31 @@
-import pandas as pd, numpy as np, matplotlib.pyplot as plt, os
+import numpy as np, matplotlib.pyplot as plt, os, sys
 from scipy import stats
 
 script_dir = os.path.dirname(os.path.abspath(__file__)); os.chdir(script_dir)
-df = pd.read_csv(script_dir + "/../../DATA/cadena_subministrament_2015_2018.csv")
+sys.path.insert(0, os.path.join(script_dir, "..", "..")); from comun.datos import cargar_datos
+from comun.graficos import dispersion_densidad
+from comun.bootstrap import bootstrap_regresion
 
 col_days, col_ratio, col_mode = "days_for_shipping_real","order_item_profit_ratio","shipping_mode"
 
-d = df[[col_days,col_ratio,col_mode]].dropna()
+d = cargar_datos([col_days,col_ratio,col_mode]).dropna()
 d = d[(d[col_days] >= 0) & (d[col_days] < 60) & (d[col_ratio] > -10) & (d[col_ratio] < 10)]
 
+# Densidad de todos los pedidos (rasterizada) y, encima, el ratio medio por día de cada modo
 plt.figure(figsize=(10,6))
-for m, g in d.groupby(col_mode):
-    plt.scatter(g[col_days], g[col_ratio], s=14, alpha=0.6, label=str(m))
+dias = np.arange(d[col_days].min(), d[col_days].max() + 2) - 0.5  # una columna por día
+im = dispersion_densidad(d[col_days], d[col_ratio], celdas=[dias, 200], cmap="Greys")
+plt.colorbar(im, label="Pedidos por celda")
+medias_modo = d.groupby([col_mode, col_days], observed=True)[col_ratio].mean()
+for m, g in medias_modo.groupby(level=col_mode, observed=True):
+    plt.plot(g.index.get_level_values(col_days), g.values, marker="o", label=str(m))
 plt.xlabel("Días reales de envío"); plt.ylabel("Ratio de beneficio")
-plt.title("Días de envío vs Ratio de beneficio (color: modo)")
+plt.title("Días de envío vs Ratio de beneficio (líneas: media por modo)")
 plt.legend(title="Modo", fontsize=8); plt.grid(True, linestyle="--", alpha=0.4)
 plt.tight_layout(); plt.savefig("g3_scatter_dias_vs_ratio.png"); plt.show()
 
 r, p = stats.pearsonr(d[col_days], d[col_ratio])
 print(f"Correlación Pearson (global): R={r:.3f}, p={p:.3e}")
+ic = bootstrap_regresion(d[col_days], d[col_ratio]).intervalos()
+print(f"IC 95 % bootstrap: R=[{ic.loc['r','inferior']:.3f}, {ic.loc['r','superior']:.3f}], "
+      f"pendiente={ic.loc['pendiente','estimacion']:.4f} [{ic.loc['pendiente','inferior']:.4f}, {ic.loc['pendiente','superior']:.4f}] por día")
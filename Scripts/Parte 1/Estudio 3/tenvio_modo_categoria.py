@@ -1,15 +1,17 @@
-import pandas as pd, numpy as np, matplotlib.pyplot as plt, os
-from scipy import stats
+import numpy as np, matplotlib.pyplot as plt, os, sys
 
 script_dir = os.path.dirname(os.path.abspath(__file__)); os.chdir(script_dir)
-df = pd.read_csv(script_dir + "/../../DATA/cadena_subministrament_2015_2018.csv")
+sys.path.insert(0, os.path.join(script_dir, "..", "..")); from comun.datos import cargar_datos
+from comun.estadistica import agrupar_momentos, anova, medias, momentos
 
 col_days, col_mode, col_cat = "days_for_shipping_real","shipping_mode","category_name"
 
-d = df[[col_days,col_mode,col_cat]].dropna()
+d = cargar_datos([col_days,col_mode,col_cat]).dropna()
 d = d[(d[col_days] >= 0) & (d[col_days] < 60)]
 
-pvt = d.groupby([col_mode,col_cat])[col_days].mean().unstack(col_cat).fillna(0)
+# Momentos por modo x categoría: dan el heatmap y las dos ANOVA sin volver a recorrer las filas
+m = momentos(d, [col_mode,col_cat], col_days)
+pvt = medias(m).unstack(col_cat).fillna(0)
 
 plt.figure(figsize=(13,5))
 im = plt.imshow(pvt.values, aspect="auto")
@@ -19,7 +21,7 @@ plt.title("Tiempo medio de envío por modo y categoría")
 cb = plt.colorbar(im); cb.set_label("Días (media)")
 plt.tight_layout(); plt.savefig("g4_heatmap_dias.png"); plt.show()
 
-F_mod, p_mod = stats.f_oneway(*[g[col_days].values for _, g in d.groupby(col_mode)])
-F_cat, p_cat = stats.f_oneway(*[g[col_days].values for _, g in d.groupby(col_cat)])
+F_mod, p_mod = anova(agrupar_momentos(m, col_mode))
+F_cat, p_cat = anova(agrupar_momentos(m, col_cat))
 print(f"ANOVA días ~ modo:      F={F_mod:.3f}, p={p_mod:.3e}")
 print(f"ANOVA días ~ categoría: F={F_cat:.3f}, p={p_cat:.3e}")
@@ -1,14 +1,17 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 import os
-from scipy import stats
+import sys
 
 # Obtener carpeta del script y no donde la ejecutamos 
 script_dir = os.path.dirname(os.path.abspath(__file__))
 os.chdir(script_dir)
 
 # Cargar datos
-data = pd.read_csv(script_dir + "/../../DATA/cadena_subministrament_2015_2018.csv", sep=",")
+sys.path.insert(0, os.path.join(script_dir, "..", ".."))
+from comun.datos import cargar_datos
+from comun.estadistica import anova, momentos
+
+data = cargar_datos(["days_for_shipping_real", "delivery_status"])
 
 # Eliminar valores nulos
 data = data.dropna(subset=["days_for_shipping_real", "delivery_status"])
@@ -30,10 +33,8 @@ plt.savefig("boxplot_envio_vs_estado.png")
 plt.show()
 
 #ANOVA
-# Agrupar por estado
-groups = [group["days_for_shipping_real"] for _, group in data.groupby("delivery_status")]
-
-F, p = stats.f_oneway(*groups)
+# Momentos (n, suma, suma de cuadrados) de los días por estado
+F, p = anova(momentos(data, "delivery_status", "days_for_shipping_real"))
 print("Resultados del ANOVA:")
 print("La F es el valor estadístico de la prueba y la p es el valor")
 print("Si la F es alta y la p es menor que 0,05, significa que hay diferencias significativas entre los grupos.")
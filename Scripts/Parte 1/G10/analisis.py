@@ -1,18 +1,25 @@
 import pandas as pd
-import numpy as np
 import os
+import sys
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(script_dir, "..", ".."))
+from comun.agregados import cargar_agregado
+from comun.topk import top_k
+from comun.contingencia import chi_cuadrado, tabla_contingencia, v_cramer
+from comun.datos import RUTA_CSV, cargar_datos
+from comun.descriptivos import describir, resumir
 
 # ======================================================================
 # CONFIGURACIÓN
 # ======================================================================
-DATA_FILE = "DATA/cadena_subministrament_2015_2018.csv"
+DATA_FILE = RUTA_CSV
 MIN_ORDERS_THRESHOLD = 20  # Mínimo de pedidos para que el producto sea representativo
 
 # --- Ejecución ---
 try:
-    # 1. Cargar datos (ajusta la ruta si es necesario)
-    # Asumimos que el CSV está en la misma carpeta que el script para este entorno.
-    df = pd.read_csv(DATA_FILE, sep=",")
+    # 1. Cargar datos (caché compartida, ver comun/datos.py)
+    df = cargar_datos(["days_for_shipping_real", "days_for_shipment_scheduled"])
     
     # 2. Ingeniería de Características: Calcular días de diferencia y crear columna de retraso
     df["days_shipping_diff"] = df["days_for_shipping_real"] - df["days_for_shipment_scheduled"]
@@ -29,9 +36,9 @@ try:
     
     if not late_orders.empty:
         # Calcular estadísticas solo para los pedidos efectivamente retrasados
-        diff_stats = late_orders["days_shipping_diff"].describe().to_frame().T
-        diff_stats['Skewness'] = late_orders["days_shipping_diff"].skew()
-        diff_stats['Kurtosis'] = late_orders["days_shipping_diff"].kurt()
+        # (una sola pasada; cuantiles exactos)
+        diff_stats = describir(resumir(late_orders, "days_shipping_diff")).drop(columns='sum')
+        diff_stats = diff_stats.rename(columns={'skewness': 'Skewness', 'kurtosis': 'Kurtosis'})
         
         print("\nEstadísticas (solo para pedidos RETRASADOS - días > 0):")
         print(diff_stats.to_markdown(numalign="left", stralign="left"))
@@ -49,24 +56,28 @@ try:
     print("ANÁLISIS DE RENDIMIENTO: Porcentaje de Retrasos por Producto")
     print("=====================================================================")
 
-    # a) Agrupar por producto y calcular el % de retraso
-    product_stats = (
-        df.groupby("product_name")
-        .agg(total_pedidos=("order_id", "count"),
-             retrasados=("late", "sum"))
-        .reset_index()
-    )
+    # a) Pedidos y retrasos por producto (agregado guardado en la caché) y % de retraso
+    product_stats = cargar_agregado("retrasos_producto").reset_index()
     product_stats["pct_retraso"] = (product_stats["retrasados"] / product_stats["total_pedidos"]) * 100
 
-    # b) Filtrar por representatividad
-    product_stats_filtered = product_stats[product_stats["total_pedidos"] >= MIN_ORDERS_THRESHOLD]
-
-    # c) Seleccionar Top 10 por % retraso
-    top10_retraso = product_stats_filtered.sort_values("pct_retraso", ascending=False).head(10)
+    # b) y c) Top 10 por % retraso entre los productos representativos (selección parcial)
+    top10_retraso = top_k(product_stats, 10, "pct_retraso",
+                          minimo=MIN_ORDERS_THRESHOLD, soporte="total_pedidos")
     
     print(f"Mostrando Top 10 Productos (mínimo {MIN_ORDERS_THRESHOLD} pedidos):")
     print(top10_retraso.to_markdown(index=False, numalign="left", stralign="left"))
 
+    # d) ¿El retraso depende del producto? Chi² producto x retraso sobre todos los
+    #    productos (tabla dispersa a partir de los conteos del agregado)
+    conteos = pd.concat([
+        product_stats.assign(late=True, lineas=product_stats["retrasados"]),
+        product_stats.assign(late=False, lineas=product_stats["total_pedidos"] - product_stats["retrasados"]),
+    ])
+    tabla_retraso = tabla_contingencia(conteos, "product_name", "late", pesos="lineas")
+    chi2, p, gl = chi_cuadrado(tabla_retraso)
+    print(f"\nChi² retraso ~ producto ({len(tabla_retraso.filas)} productos): "
+          f"Chi²={chi2:.1f}, gl={gl}, p={p:.3e}, V de Cramér={v_cramer(tabla_retraso):.3f}")
+
 
     # 5. Conclusión de Negocio
     print("\n=====================================================================")
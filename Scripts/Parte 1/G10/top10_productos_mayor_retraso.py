@@ -1,30 +1,24 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 import os
+import sys
 
 #  Cargar datos 
 script_dir = os.path.dirname(os.path.abspath(__file__))
 os.chdir(script_dir)
-data = pd.read_csv(script_dir + "/../DATA/cadena_subministrament_2015_2018.csv", sep=",")
-
-# Calcular días de diferencia y crear columna de retraso
-data["days_shipping_diff"] = data["days_for_shipping_real"] - data["days_for_shipment_scheduled"]
-data["late"] = data["days_shipping_diff"] > 0
-
-# Agrupar por producto
-product_stats = (
-    data.groupby("product_name")
-    .agg(total_pedidos=("order_id", "count"),
-         retrasados=("late", "sum"))
-    .reset_index()
-)
-product_stats["pct_retraso"] = (product_stats["retrasados"] / product_stats["total_pedidos"]) * 100
-
-# Filtrar productos con un mínimo de pedidos (ej. > 20 para que sea representativo)
-product_stats = product_stats[product_stats["total_pedidos"] >= 20]
-
-# Seleccionar top 10 por % retraso
-top10 = product_stats.sort_values("pct_retraso", ascending=False).head(10)
+sys.path.insert(0, os.path.join(script_dir, "..", ".."))
+from comun.agregados import bloques_agregado
+from comun.topk import top_k_bloques
+
+
+def pct_retraso(product_stats):
+    return product_stats.assign(pct_retraso=(product_stats["retrasados"] / product_stats["total_pedidos"]) * 100)
+
+
+# Pedidos y pedidos retrasados (días reales > programados) por producto, del agregado guardado,
+# recorrido por bloques: top 10 por % retraso entre los productos con un mínimo de pedidos
+# (ej. 20 para que sea representativo), sin ordenar la tabla entera
+top10 = top_k_bloques(bloques_agregado("retrasos_producto"), 10, "pct_retraso",
+                      minimo=20, soporte="total_pedidos", preparar=pct_retraso).reset_index()
 
 # Gráfico
 plt.figure(figsize=(12, 6))
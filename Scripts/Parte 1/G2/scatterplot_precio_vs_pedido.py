@@ -1,6 +1,6 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 import os
+import sys
 import numpy as np
 
 # Obtener carpeta del script y no donde la ejecutamos 
@@ -8,11 +8,17 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 os.chdir(script_dir)
 
 # Cargar datos
-data = pd.read_csv(script_dir + "/../../DATA/cadena_subministrament_2015_2018.csv", sep=",")
+sys.path.insert(0, os.path.join(script_dir, "..", ".."))
+from comun.bootstrap import bootstrap_regresion
+from comun.datos import cargar_datos
+from comun.graficos import dispersion_densidad
 
-# Crear una gráfica de dispersión
+data = cargar_datos(["order_item_product_price", "order_item_total"])
+
+# Crear una gráfica de dispersión (rasterizada: pedidos por celda, para que no dependa del nº de filas)
 plt.figure(figsize=(10, 6))
-plt.scatter(data['order_item_product_price'], data['order_item_total'], alpha=0.5, c='blue')
+im = dispersion_densidad(data['order_item_product_price'], data['order_item_total'], cmap='Blues')
+plt.colorbar(im, label='Pedidos por celda')
 plt.title('Relación entre Precio del Producto y Total del Pedido')
 plt.xlabel('Precio del Producto (order_item_product_price)')
 plt.ylabel('Total del Pedido (order_item_total)')
@@ -28,6 +34,9 @@ y = data['order_item_total'].values
 r = np.corrcoef(x, y)[0, 1]
 print("Si la correlación es próxima a 1 o -1 indica una relación lineal fuerte entre las variables.")
 print(f"Correlación de Pearson (R) = {r:.3f}")
+# Intervalo de confianza del 95 % de R (bootstrap)
+ic = bootstrap_regresion(x, y).intervalos()
+print(f"IC 95 % de R (bootstrap) = [{ic.loc['r', 'inferior']:.3f}, {ic.loc['r', 'superior']:.3f}]")
 if abs(r) > 0.7:
     print("Hay una relación lineal fuerte entre el precio del producto y el total del pedido.") 
 else:
@@ -1,15 +1,17 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 import os
-from scipy import stats
-import itertools
+import sys
 
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
 os.chdir(script_dir)
 
 
-data = pd.read_csv(script_dir + "/../../DATA/cadena_subministrament_2015_2018.csv", sep=",")
+sys.path.insert(0, os.path.join(script_dir, "..", ".."))
+from comun.datos import cargar_datos
+from comun.estadistica import momentos, welch_por_pares
+
+data = cargar_datos(["days_for_shipping_real", "shipping_mode", "category_name"])
 data = data.dropna(subset=["days_for_shipping_real", "shipping_mode"])
 
 
@@ -30,19 +32,13 @@ plt.show()
 
 # T-TEST 
 print("\n Comparaciones t-Student  por múltiples comparaciones")
-modos = data["shipping_mode"].unique()
-print("Modos detectados:", list(modos))
-
-resultados = []
-for a, b in itertools.combinations(modos, 2):
-    ga = data.loc[data["shipping_mode"] == a, "days_for_shipping_real"]
-    gb = data.loc[data["shipping_mode"] == b, "days_for_shipping_real"]
-    t_stat, p_val = stats.ttest_ind(ga, gb, equal_var=False)  # Welch
-    resultados.append((a, b, len(ga), len(gb), t_stat, p_val))
+# Momentos de cada modo (una sola pasada) y Welch para todos los pares, con corrección de Holm
+mom = momentos(data, "shipping_mode", "days_for_shipping_real")
+print("Modos detectados:", list(mom.index))
 
-res_df = pd.DataFrame(resultados, columns=["Grupo A","Grupo B","n_A","n_B","t","p_valor"])
+res_df = welch_por_pares(mom, correccion="holm")
 res_df = res_df.sort_values("p_valor").reset_index(drop=True)
-res_df["significativo_0.05"] = res_df["p_valor"] < 0.05
+res_df["significativo_0.05"] = res_df["p_ajustado"] < 0.05
 
 print("\nResultados:")
 print(res_df)
@@ -53,8 +49,17 @@ res_df.to_csv("t_test_shipping_mode.csv", index=False)
 sig = res_df[res_df["significativo_0.05"]]
 print("\nInterpretación rápida")
 if len(sig) > 0:
-    print(f"Hay {len(sig)} pares con p < 0.05. Ejemplos:")
+    print(f"Hay {len(sig)} pares con p ajustado (Holm) < 0.05. Ejemplos:")
     print(sig[["Grupo A","Grupo B"]].head())
 else:
-    print("No hay pares con p < 0.05.")
+    print("No hay pares con p ajustado (Holm) < 0.05.")
+
+
+# Mismo contraste entre categorías (50+ grupos, más de 1000 pares): Benjamini-Hochberg
+mom_cat = momentos(data, "category_name", "days_for_shipping_real")
+res_cat = welch_por_pares(mom_cat, correccion="bh").sort_values("p_valor").reset_index(drop=True)
+res_cat["significativo_0.05"] = res_cat["p_ajustado"] < 0.05
+res_cat.to_csv("t_test_category_name.csv", index=False)
+print(f"\nCategorías: {len(mom_cat)} grupos, {len(res_cat)} pares, "
+      f"{res_cat['significativo_0.05'].sum()} significativos tras corregir (BH).")
 
@@ -1,17 +1,22 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 import os
-from scipy.stats import chi2_contingency
+import sys
 
 # Obtener carpeta del script y no donde la ejecutamos
 script_dir = os.path.dirname(os.path.abspath(__file__))
 os.chdir(script_dir)
 
 # Cargar datos
-data = pd.read_csv(script_dir + "/../../DATA/cadena_subministrament_2015_2018.csv", sep=",")
+sys.path.insert(0, os.path.join(script_dir, "..", ".."))
+from comun.contingencia import chi_cuadrado, tabla_contingencia, v_cramer
+from comun.distintos import distintos_exactos
 
-# Agrupar clientes por país y segmento
-clientes_segmento = data.groupby(["customer_country", "customer_segment"])["customer_id"].nunique().unstack(fill_value=0)
+# Clientes distintos por país y segmento, exactos (por bloques): el chi² y la V de
+# Cramér no deben llevar el ~1 % de error del boceto HyperLogLog
+clientes = distintos_exactos("customer_id", ["customer_country", "customer_segment"])
+# Tabla país x segmento dispersa para el chi²; la densa solo para el gráfico
+tabla = tabla_contingencia(clientes.reset_index(), "customer_country", "customer_segment", pesos="distintos")
+clientes_segmento = tabla.densa()
 
 # Crear gráfico de barras apiladas
 clientes_segmento.plot(kind="bar", stacked=True, figsize=(14, 7))
@@ -29,11 +34,12 @@ plt.show()
 
 
 # CHI-CUADRADO DE INDEPENDENCIA
-chi2, p, dof, expected = chi2_contingency(clientes_segmento)
+chi2, p, dof = chi_cuadrado(tabla)
 print("\nChi-square test")
 print(f"Chi² = {chi2:.3f}")
 print(f"Grados de libertad = {dof}")
 print(f"p-valor = {p:.4}")
+print(f"V de Cramér = {v_cramer(tabla):.3f}")
 
 if p < 0.05:
     print("La distribución de segmentos depende significativamente del país.")
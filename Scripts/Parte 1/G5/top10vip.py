@@ -1,26 +1,19 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 import os
+import sys
 
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
 os.chdir(script_dir)
 
 
-data = pd.read_csv(script_dir + "/../../DATA/cadena_subministrament_2015_2018.csv", sep=",")
+sys.path.insert(0, os.path.join(script_dir, "..", ".."))
+from comun.agregados import bloques_agregado
+from comun.topk import top_k_bloques
 
-
-data = data.dropna(subset=["customer_id", "order_item_total"])
-
-# Calculo de ventas totales por cliente
-ventas_cliente = (
-    data.groupby("customer_id")["order_item_total"]
-        .sum()
-        .reset_index(name="ventas_totales")
-)
-
-# Top 10
-top_clientes = ventas_cliente.sort_values("ventas_totales", ascending=False).head(10)
+# Top 10 por ventas totales por cliente (agregado guardado en la caché, se actualiza al
+# anexar meses), recorrido por bloques sin ordenar todos los clientes
+top_clientes = top_k_bloques(bloques_agregado("ventas_cliente"), 10, "ventas_totales").reset_index()
 
 # Grafica de barras
 plt.figure(figsize=(12, 6))
@@ -1,25 +1,21 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 import os
-from scipy import stats
+import sys
 import numpy as np
 
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
 os.chdir(script_dir)
 
-data = pd.read_csv(script_dir + "/../../DATA/cadena_subministrament_2015_2018.csv", sep=",")
-# Convertir fechas y limpiar nulos
-data["order_date_dateorders"] = pd.to_datetime(data["order_date_dateorders"], errors="coerce")
-data = data.dropna(subset=["order_date_dateorders", "order_item_total"])
+sys.path.insert(0, os.path.join(script_dir, "..", ".."))
+from comun.bootstrap import bootstrap_regresion
+from comun.series import contrastes_serie, serie
 
-
-# Agrupar ventas por mes
-ventas_tiempo = (
-    data.groupby(pd.Grouper(key="order_date_dateorders", freq="ME"))["order_item_total"]
-    .sum()
-    .reset_index()
-)
+# Ventas (order_item_total) por mes desde la serie diaria precalculada, etiquetadas con el último día
+# del mes (como freq="ME"); los meses sin pedidos cuentan como 0
+ventas_tiempo = serie("total", grano="M", etiqueta="fin")["total"].rename("order_item_total")
+ventas_tiempo = ventas_tiempo.rename_axis("order_date_dateorders").reset_index()
+contrastes = contrastes_serie(ventas_tiempo["order_item_total"])
 # Gráfico de línea
 plt.figure(figsize=(14, 6))
 plt.plot(
@@ -47,8 +43,8 @@ print("\nEstadísticos descriptivos:")
 print(ventas_tiempo["order_item_total"].describe())
 
 # Medidas de forma: asimetría y curtosis
-skew = stats.skew(ventas_tiempo["order_item_total"])
-kurt = stats.kurtosis(ventas_tiempo["order_item_total"])
+skew = contrastes["asimetria"]
+kurt = contrastes["curtosis"]
 print(f"\nAsimetría (skewness): {skew:.3f}")
 print(f"Curtosis (kurtosis): {kurt:.3f}")
 
@@ -56,8 +52,12 @@ print(f"Curtosis (kurtosis): {kurt:.3f}")
 ventas_tiempo["mes_num"] = np.arange(len(ventas_tiempo))
 
 # Correlación tiempo-ventas (Pearson)
-r, p = stats.pearsonr(ventas_tiempo["mes_num"], ventas_tiempo["order_item_total"])
+r, p = contrastes["r"], contrastes["p_tendencia"]
 print(f"\nCorrelación de Pearson tiempo-ventas: R = {r:.3f}, p = {p:.4f}")
+# Intervalos de confianza del 95 % (bootstrap) de R y de la pendiente (ventas por mes)
+ic = bootstrap_regresion(ventas_tiempo["mes_num"], ventas_tiempo["order_item_total"]).intervalos()
+print(f"IC 95 % bootstrap: R en [{ic.loc['r', 'inferior']:.3f}, {ic.loc['r', 'superior']:.3f}], "
+      f"pendiente {ic.loc['pendiente', 'estimacion']:.2f} en [{ic.loc['pendiente', 'inferior']:.2f}, {ic.loc['pendiente', 'superior']:.2f}] por mes")
 
 # Interpretación automática
 print("\nInterpretación:")
@@ -1,16 +1,19 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 import os
+import sys
 
 # Obtener carpeta del script y no donde la ejecutamos
 script_dir = os.path.dirname(os.path.abspath(__file__))
 os.chdir(script_dir)
 
 # Cargar datos
-data = pd.read_csv(script_dir + "/../DATA/cadena_subministrament_2015_2018.csv", sep=",")
+sys.path.insert(0, os.path.join(script_dir, "..", ".."))
+from comun.bloques import agregar_por_bloques
 
 # Sales vs Category Name horizontal bars ordered big to small by sales
-sales_by_category = data.groupby("category_name")["sales"].sum().sort_values(ascending=False)
+# (suma por bloques: no hace falta cargar el dataset entero)
+sales_by_category = agregar_por_bloques("category_name", {"sales": ("sales", "sum")})["sales"]
+sales_by_category = sales_by_category.sort_values(ascending=False)
 plt.figure(figsize=(15, 10))
 sales_by_category.plot(kind="barh", color="skyblue")
 plt.title("Total Sales by Category Name")
@@ -1,14 +1,19 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
+import os
+import sys
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(script_dir, "..", ".."))
+from comun.datos import RUTA_CSV, cargar_datos
 
 # CONFIGURACIÓN: REEMPLAZA EL NOMBRE DE TU ARCHIVO
-DATA_FILE = "DATA/cadena_subministrament_2015_2018.csv"
+DATA_FILE = RUTA_CSV
 QUANTITATIVE_VAR = "sales"
 CATEGORICAL_VAR = "category_name"
 
 try:
-    df = pd.read_csv(DATA_FILE)
+    df = cargar_datos([QUANTITATIVE_VAR, CATEGORICAL_VAR])
 
     print("=========================================================")
     print(f"GENERANDO BOXPLOTS: '{QUANTITATIVE_VAR}' por '{CATEGORICAL_VAR}'")
@@ -16,7 +21,7 @@ try:
 
     # 1. Calcular el orden de las categorías (por Mediana, más robusta que la media)
     # Esto asegura que el gráfico esté ordenado, facilitando la interpretación.
-    category_order = df.groupby(CATEGORICAL_VAR)[QUANTITATIVE_VAR].median().sort_values(ascending=False).index
+    category_order = df.groupby(CATEGORICAL_VAR, observed=True)[QUANTITATIVE_VAR].median().sort_values(ascending=False).index
 
     # 2. Generar el Boxplot
     plt.figure(figsize=(14, 10)) # Tamaño grande para asegurar que las etiquetas no se superpongan
@@ -1,13 +1,22 @@
 import pandas as pd
-import numpy as np
+import os
+import sys
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(script_dir, "..", ".."))
+from comun.datos import RUTA_CSV, cargar_datos
+from comun.descriptivos import describir, resumen_total, resumir
 
 # CONFIGURACIÓN: REEMPLAZA EL NOMBRE DE TU ARCHIVO
-DATA_FILE = "DATA/cadena_subministrament_2015_2018.csv"
+DATA_FILE = RUTA_CSV
 QUANTITATIVE_VAR = "sales"
 CATEGORICAL_VAR = "category_name"
 
 try:
-    df = pd.read_csv(DATA_FILE)
+    df = cargar_datos([QUANTITATIVE_VAR, CATEGORICAL_VAR])
+
+    # Una sola pasada: momentos y boceto de cuantiles por categoría; el total sale de combinarlos
+    resumen = resumir(df, QUANTITATIVE_VAR, CATEGORICAL_VAR)
 
     # ======================================================================
     # 1. ANÁLISIS UNIVARIADO: ESTADÍSTICAS GENERALES DE VENTAS
@@ -17,10 +26,8 @@ try:
     print(f"ESTADÍSTICAS DESCRIPTIVAS UNIVARIADAS para '{QUANTITATIVE_VAR}'")
     print("=========================================================")
 
-    # Calcula las estadísticas de tendencia central, variabilidad y forma
-    sales_stats = df[QUANTITATIVE_VAR].describe().to_frame()
-    sales_stats.loc['skewness'] = df[QUANTITATIVE_VAR].skew()
-    sales_stats.loc['kurtosis'] = df[QUANTITATIVE_VAR].kurt()
+    # Calcula las estadísticas de tendencia central, variabilidad y forma (cuantiles exactos)
+    sales_stats = describir(resumen_total(resumen, QUANTITATIVE_VAR)).T.drop(index='sum')
     sales_stats.loc['IQR'] = sales_stats.loc['75%'] - sales_stats.loc['25%']
 
     print(sales_stats)
@@ -36,15 +43,16 @@ try:
 
     # Agrupa los datos por categoría y calcula las estadísticas clave
     # La mediana es crucial por su robustez ante outliers.
-    stats_por_categoria = df.groupby(CATEGORICAL_VAR)[QUANTITATIVE_VAR].agg(
-        Total_Ventas='sum',
-        Conteo_Ordenes='count',
-        Media='mean',
-        Mediana='median',
-        Desviacion_Estandar='std',
-        Min='min',
-        Max='max'
-    ).sort_values(by='Media', ascending=False)
+    tabla = describir(resumen)
+    stats_por_categoria = pd.DataFrame({
+        'Total_Ventas': tabla['sum'],
+        'Conteo_Ordenes': tabla['count'].astype(int),
+        'Media': tabla['mean'],
+        'Mediana': tabla['50%'],
+        'Desviacion_Estandar': tabla['std'],
+        'Min': tabla['min'],
+        'Max': tabla['max'],
+    }).rename_axis(CATEGORICAL_VAR).sort_values(by='Media', ascending=False)
     
     print(stats_por_categoria)
 
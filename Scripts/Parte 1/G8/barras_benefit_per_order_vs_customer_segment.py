@@ -1,16 +1,17 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 import os
+import sys
 
 # Obtener carpeta del script y no donde la ejecutamos
 script_dir = os.path.dirname(os.path.abspath(__file__))
 os.chdir(script_dir)
 
 # Cargar datos
-data = pd.read_csv(script_dir + "/../DATA/cadena_subministrament_2015_2018.csv", sep=",")
+sys.path.insert(0, os.path.join(script_dir, "..", ".."))
+from comun.cubo import consultar_cubo
 
-# Benefit per Order vs Customer Segment agrupated bars or boxplot 
-benefit_per_order = data.groupby("customer_segment")["benefit_per_order"].sum().sort_values(ascending=False)
+# Benefit per Order vs Customer Segment agrupated bars or boxplot (sumas del cubo)
+benefit_per_order = consultar_cubo("customer_segment")["beneficio"].sort_values(ascending=False)
 plt.figure(figsize=(10, 6))
 benefit_per_order.plot(kind="bar", color="lightgreen")
 plt.title("Total Benefit per Order by Customer Segment")
@@ -2,15 +2,20 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
+import sys
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(script_dir, "..", ".."))
+from comun.datos import RUTA_CSV, cargar_datos
+from comun.descriptivos import describir, resumir
 
 # --- CONFIGURACIÓN DE ARCHIVO Y COLUMNAS ---
-# Nota: La ruta relativa puede fallar. Se recomienda asegurar que el archivo esté en la raíz de trabajo.
-DATA_FILE = "DATA/cadena_subministrament_2015_2018.csv"
+DATA_FILE = RUTA_CSV
 QUANTITATIVE_VAR = "benefit_per_order"
 CATEGORICAL_VAR = "customer_segment"
 
 try:
-    df = pd.read_csv(DATA_FILE) 
+    df = cargar_datos([QUANTITATIVE_VAR, CATEGORICAL_VAR])
 
     # ======================================================================
     # A. ESTADÍSTICAS DESCRIPTIVAS CONDICIONALES
@@ -20,15 +25,17 @@ try:
     print(f"ESTADÍSTICAS CONDICIONALES: '{QUANTITATIVE_VAR}' por '{CATEGORICAL_VAR}'")
     print("=================================================================")
 
-    # Agrupa por segmento y calcula Media, Mediana y Desviación Estándar
-    stats_por_segmento = df.groupby(CATEGORICAL_VAR)[QUANTITATIVE_VAR].agg(
-        Total_Beneficio='sum',
-        Ordenes_Contadas='count',
-        Media_Beneficio='mean',
-        Mediana_Beneficio='median',
-        Desviacion_Estandar='std',
-        IQR=lambda x: x.quantile(0.75) - x.quantile(0.25)
-    ).sort_values(by='Media_Beneficio', ascending=False)
+    # Agrupa por segmento y calcula Media, Mediana, Desviación Estándar e IQR en una
+    # sola pasada (mediana y cuartiles exactos: el DataFrame está en memoria)
+    tabla = describir(resumir(df, QUANTITATIVE_VAR, CATEGORICAL_VAR))
+    stats_por_segmento = pd.DataFrame({
+        'Total_Beneficio': tabla['sum'],
+        'Ordenes_Contadas': tabla['count'].astype(int),
+        'Media_Beneficio': tabla['mean'],
+        'Mediana_Beneficio': tabla['50%'],
+        'Desviacion_Estandar': tabla['std'],
+        'IQR': tabla['75%'] - tabla['25%'],
+    }).rename_axis(CATEGORICAL_VAR).sort_values(by='Media_Beneficio', ascending=False)
     
     print(stats_por_segmento)
     print("\n")
@@ -1,19 +1,21 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import numpy as np
 import os
+import sys
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(script_dir, "..", ".."))
+from comun.datos import RUTA_CSV, cargar_datos
+from comun.descriptivos import describir, resumir
 
 # ======================================================================
 # CONFIGURACIÓN
 # ======================================================================
-DATA_FILE = "DATA/cadena_subministrament_2015_2018.csv"
+DATA_FILE = RUTA_CSV
 COLUMN = "order_item_profit_ratio"
 
 # --- Ejecución ---
 try:
-    # Cargar datos. Asegúrate de que esta ruta sea correcta para tu entorno.
-    # Asumimos que el CSV está en la misma carpeta que el script.
-    df = pd.read_csv(DATA_FILE, sep=",")
+    # Cargar datos (caché compartida, ver comun/datos.py)
+    df = cargar_datos([COLUMN])
     
     # Verificar que la columna exista
     if COLUMN not in df.columns:
@@ -27,12 +29,10 @@ try:
     print(f"ANÁLISIS ESTADÍSTICO para '{COLUMN}'")
     print("=========================================================")
     
-    # Calcular Estadísticas Descriptivas (Tendencia Central, Posición, Variabilidad)
-    stats_df = df[COLUMN].describe().to_frame().T
-    
-    # Añadir medidas de Forma (Asimetría y Curtosis)
-    stats_df['Skewness'] = df[COLUMN].skew()
-    stats_df['Kurtosis'] = df[COLUMN].kurt()
+    # Estadísticas Descriptivas (Tendencia Central, Posición, Variabilidad) y medidas de
+    # Forma (Asimetría y Curtosis) en una sola pasada; los cuantiles son exactos
+    stats_df = describir(resumir(df, COLUMN)).drop(columns='sum')
+    stats_df = stats_df.rename(columns={'skewness': 'Skewness', 'kurtosis': 'Kurtosis'})
     
     print("\nEstadísticas Descriptivas Completas:")
     # Usamos Markdown para formatear la salida en la terminal
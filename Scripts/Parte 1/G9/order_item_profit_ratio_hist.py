@@ -1,13 +1,16 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 import os
+import sys
 
 # Obtener carpeta del script y no donde la ejecutamos
 script_dir = os.path.dirname(os.path.abspath(__file__))
 os.chdir(script_dir)
 
 # Cargar datos
-data = pd.read_csv(script_dir + "/../DATA/cadena_subministrament_2015_2018.csv", sep=",")
+sys.path.insert(0, os.path.join(script_dir, "..", ".."))
+from comun.datos import cargar_datos
+
+data = cargar_datos(["order_item_profit_ratio"])
 
 # Histograma del ratio de beneficio por articulo 
 plt.figure(figsize=(10, 6))
@@ -1,28 +1,34 @@
-import pandas as pd
 import geopandas as gpd
 import matplotlib.pyplot as plt
+import os
+import sys
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(script_dir, "..", ".."))
+from comun.cubo import consultar_cubo
+from comun.datos import DIR_DATOS, RUTA_CSV
 
 # --- Configuración de Rutas ---
 # Asegúrate de que estas rutas sean correctas en tu entorno local.
-CSV_FILE_PATH = "DATA/cadena_subministrament_2015_2018.csv"
-GEOJSON_FILE_PATH = "DATA/countries.geojson"
-OUTPUT_IMAGE_PATH = "PART2/G1/mapa_beneficio_pais.png" # Salida como imagen PNG
+CSV_FILE_PATH = RUTA_CSV
+GEOJSON_FILE_PATH = os.path.join(DIR_DATOS, "countries.geojson")
+OUTPUT_IMAGE_PATH = os.path.join(script_dir, "mapa_beneficio_pais.png") # Salida como imagen PNG
 
 print("Iniciando la generación del mapa...")
 
 try:
     # --- 1. Cargar y procesar los datos (Pandas) ---
     try:
-        df = pd.read_csv(CSV_FILE_PATH, encoding='latin1')
-        print("CSV cargado correctamente.")
+        df_pais = consultar_cubo('order_country_en')
+        print("Datos cargados correctamente.")
     except FileNotFoundError:
         print(f"Error: No se encontró el archivo CSV en: {CSV_FILE_PATH}")
         print("Asegúrate de que la ruta es correcta.")
         exit()
 
     # Agrupar por país y calcular el beneficio medio
-    df_agrupado = df.groupby('order_country_en')['benefit_per_order'].mean().reset_index()
-    df_agrupado.columns = ['pais', 'beneficio_medio']
+    df_agrupado = (df_pais['beneficio'] / df_pais['lineas']).rename('beneficio_medio')
+    df_agrupado = df_agrupado.rename_axis('pais').reset_index()
     print("Datos agrupados por país.")
 
     # --- 2. Cargar el GeoJSON (Geopandas) ---
@@ -1,25 +1,48 @@
-import pandas as pd
 import geopandas as gpd
 import matplotlib.pyplot as plt
-import seaborn as sns  # Necesario para el mapa de densidad (KDE)
+import os
 import sys
 
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(script_dir, "..", ".."))
+from comun.datos import DIR_DATOS, RUTA_CSV, cargar_datos
+from comun.densidad import densidad_guardada, niveles_masa
+
 # --- Configuración de Rutas ---
 # Basado en tu script anterior
-CSV_FILE_PATH = "DATA/cadena_subministrament_2015_2018.csv"
-GEOJSON_FILE_PATH = "DATA/countries.geojson"
-OUTPUT_IMAGE_PATH = "PART2/G2/mapa_calor_retrasos.png" 
+CSV_FILE_PATH = RUTA_CSV
+GEOJSON_FILE_PATH = os.path.join(DIR_DATOS, "countries.geojson")
+OUTPUT_IMAGE_PATH = os.path.join(script_dir, "mapa_calor_retrasos.png") 
+
+# Rejilla de la densidad: medio grado por celda sobre todo el mundo
+CELDAS = (720, 360)
+RANGO_MUNDO = [[-180, 180], [-90, 90]]
 
 print("Iniciando la generación del mapa de calor (PNG)...")
 
 try:
-    # --- 1. Cargar el CSV (Pandas) ---
-    try:
-        df = pd.read_csv(CSV_FILE_PATH, encoding='latin1')
-        print("CSV cargado correctamente.")
-    except FileNotFoundError:
-        print(f"Error: No se encontró el archivo CSV en: {CSV_FILE_PATH}")
-        sys.exit()
+    # --- 1. Puntos de los pedidos con retraso ---
+    # Solo se leen los datos si no hay densidad guardada para esta rejilla
+    def puntos_retrasos():
+        try:
+            df = cargar_datos(['late_delivery_risk', 'latitude_dest', 'longitude_dest'])
+            print("Datos cargados correctamente.")
+        except FileNotFoundError:
+            print(f"Error: No se encontró el archivo CSV en: {CSV_FILE_PATH}")
+            sys.exit()
+
+        # Filtrar solo pedidos con retraso
+        df_retrasos = df[df['late_delivery_risk'] == 1]
+        print(f"Se encontraron {len(df_retrasos)} pedidos con retraso.")
+
+        # Limpiar NaNs (la densidad no los soporta)
+        df_retrasos = df_retrasos.dropna(subset=['latitude_dest', 'longitude_dest'])
+        print(f"Se usarán {len(df_retrasos)} puntos con coordenadas válidas.")
+
+        if len(df_retrasos) < 2:
+            print("No hay datos de retraso para mostrar en el mapa.")
+            sys.exit()
+        return df_retrasos['longitude_dest'], df_retrasos['latitude_dest'], None
 
     # --- 2. Cargar el GeoJSON (Fondo del Mapa) ---
     try:
@@ -29,27 +52,11 @@ try:
         print(f"Error: No se pudo cargar el archivo GeoJSON desde: {GEOJSON_FILE_PATH}")
         sys.exit()
 
-    # --- 3. Preparar los datos de puntos ---
-    
-    # 3a. Filtrar solo pedidos con retraso
-    df_retrasos = df[df['late_delivery_risk'] == 1].copy()
-    print(f"Se encontraron {len(df_retrasos)} pedidos con retraso.")
-
-    # 3b. Asegurarse de que las columnas existen
-    required_cols = ['latitude_dest', 'longitude_dest']
-    if not all(col in df.columns for col in required_cols):
-        print("Error: Las columnas 'latitude_dest' o 'longitude_dest' no se encuentran en el CSV.")
-        sys.exit()
-
-    # 3c. Limpiar NaNs (KDE no los soporta)
-    df_retrasos = df_retrasos.dropna(subset=required_cols)
-    print(f"Se usarán {len(df_retrasos)} puntos con coordenadas válidas.")
-    
-    if df_retrasos.empty:
-        print("No hay datos de retraso para mostrar en el mapa.")
-        sys.exit()
+    # --- 3. Densidad de los retrasos (KDE por FFT sobre la rejilla) ---
+    densidad = densidad_guardada("retrasos", puntos_retrasos, celdas=CELDAS, rango=RANGO_MUNDO)
+    print(f"Densidad calculada (ancho de banda: {densidad.ancho_banda[0]:.1f}° x {densidad.ancho_banda[1]:.1f}°).")
 
-    # --- 4. Generar el Mapa (Matplotlib + Seaborn) ---
+    # --- 4. Generar el Mapa (Matplotlib) ---
     
     # 4a. Crear la figura y los ejes
     fig, ax = plt.subplots(figsize=(15, 10))
@@ -58,17 +65,15 @@ try:
     # 4b. Dibujar el mapa de fondo (GeoJSON)
     world_gdf.plot(ax=ax, color='#E0E0E0', edgecolor='white', linewidth=0.5)
 
-    # 4c. Dibujar la capa de calor (KDE) encima
-    # Esto calcula la densidad de los puntos y la dibuja
-    sns.kdeplot(
-        x=df_retrasos['longitude_dest'],
-        y=df_retrasos['latitude_dest'],
-        ax=ax,
-        fill=True,          # Rellenar las zonas
+    # 4c. Dibujar la capa de calor encima
+    # Niveles de igual proporción de masa, como kdeplot: el 5% de menor densidad no se pinta
+    ax.contourf(
+        densidad.x,
+        densidad.y,
+        densidad.valores,
+        levels=niveles_masa(densidad, umbral=0.05),
         cmap="Reds",        # Mapa de color "caliente"
         alpha=0.6,          # Transparencia
-        thresh=0.05,        # Nivel mínimo de densidad para dibujar
-        warn_singular=False # Evitar avisos si hay pocos datos
     )
 
     # 4d. Añadir título y limpiar ejes
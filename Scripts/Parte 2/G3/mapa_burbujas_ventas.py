@@ -1,12 +1,16 @@
-import pandas as pd
 import geopandas as gpd
 import matplotlib.pyplot as plt
+import os
 import sys
 
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(script_dir, "..", ".."))
+from comun.datos import DIR_DATOS, RUTA_CSV, cargar_datos
+
 # --- Configuración de Rutas ---
-CSV_FILE_PATH = "DATA/cadena_subministrament_2015_2018.csv"
-GEOJSON_FILE_PATH = "DATA/countries.geojson"
-OUTPUT_IMAGE_PATH = "PART2/G3/mapa_burbujas_ventas.png" 
+CSV_FILE_PATH = RUTA_CSV
+GEOJSON_FILE_PATH = os.path.join(DIR_DATOS, "countries.geojson")
+OUTPUT_IMAGE_PATH = os.path.join(script_dir, "mapa_burbujas_ventas.png") 
 
 # --- PARÁMETRO DE FILTRADO ---
 # Umbral de ventas (ajústalo si es necesario)
@@ -17,8 +21,8 @@ print(f"Iniciando la generación del mapa de burbujas enfocado (Threshold > {SAL
 try:
     # --- 1. Cargar el CSV (Pandas) ---
     try:
-        df = pd.read_csv(CSV_FILE_PATH, encoding='latin1')
-        print("CSV cargado correctamente.")
+        df = cargar_datos(['customer_city', 'sales', 'latitude_src', 'longitude_src'])
+        print("Datos cargados correctamente.")
     except FileNotFoundError:
         print(f"Error: No se encontró el archivo CSV en: {CSV_FILE_PATH}")
         sys.exit()
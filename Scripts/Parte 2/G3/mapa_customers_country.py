@@ -1,13 +1,18 @@
-import pandas as pd
 import geopandas as gpd
 import matplotlib.pyplot as plt
-import sys
 import warnings # Para ocultar advertencias de matplotlib
+import os
+import sys
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(script_dir, "..", ".."))
+from comun.cubo import consultar_cubo
+from comun.datos import DIR_DATOS, RUTA_CSV
 
 # --- Configuración de Rutas ---
-CSV_FILE_PATH = "DATA/cadena_subministrament_2015_2018.csv"
-GEOJSON_FILE_PATH = "DATA/countries.geojson"
-OUTPUT_IMAGE_PATH = "PART2/G3/mapa_ventas_y_pedidos_top10.png" 
+CSV_FILE_PATH = RUTA_CSV
+GEOJSON_FILE_PATH = os.path.join(DIR_DATOS, "countries.geojson")
+OUTPUT_IMAGE_PATH = os.path.join(script_dir, "mapa_ventas_y_pedidos_top10.png") 
 
 # --- PARÁMETRO DE ESCALA DE BURBUJAS ---
 BUBBLE_SCALE_DIVISOR = 5
@@ -15,10 +20,11 @@ BUBBLE_SCALE_DIVISOR = 5
 print("Iniciando la generación del mapa combinado (Color Ventas + Burbujas Pedidos)...")
 
 try:
-    # --- 1. Cargar el CSV (Pandas) ---
+    # --- 1. Ventas y nº de pedidos (líneas) por país, del cubo de ventas ---
     try:
-        df = pd.read_csv(CSV_FILE_PATH, encoding='latin1')
-        print("CSV cargado correctamente.")
+        df_stats = consultar_cubo('order_country_en')[['ventas', 'lineas']]
+        df_stats.columns = ['total_sales', 'num_ventas']
+        print("Datos cargados correctamente.")
     except FileNotFoundError:
         print(f"Error: No se encontró el archivo CSV en: {CSV_FILE_PATH}")
         sys.exit()
@@ -33,19 +39,9 @@ try:
         sys.exit()
 
     # --- 3. Preparar los Datos ---
-    
-    # 3a. VOLUMEN TOTAL DE VENTAS (para el color)
-    df_sales = df.groupby('order_country_en')['sales'].sum().reset_index()
-    df_sales.columns = ['pais', 'total_sales']
-    print(f"Agregado: Ventas totales ($) por país.")
-
-    # 3b. NÚMERO DE PEDIDOS (para las burbujas)
-    df_orders = df.groupby('order_country_en')['order_id'].count().reset_index()
-    df_orders.columns = ['pais', 'num_ventas']
-    print(f"Agregado: Número de pedidos por país.")
-
-    # 3c. Unir ambas estadísticas
-    df_stats = pd.merge(df_sales, df_orders, on='pais', how='outer')
+    # Volumen total de ventas (para el color) y número de pedidos (para las burbujas)
+    df_stats = df_stats.rename_axis('pais').reset_index()
+    print(f"Agregado: Ventas totales ($) y número de pedidos por país.")
 
     # --- 4. Unir Datos Estadísticos con GeoDataFrame ---
     merged_gdf = world_gdf.merge(df_stats, left_on='ADMIN', right_on='pais', how='left')
@@ -1,7 +1,6 @@
 # -*- coding: utf-8 -*-
 import pandas as pd
 import folium
-from folium.plugins import MarkerCluster
 import sys
 import os
 
@@ -13,21 +12,33 @@ except NameError:
     script_dir = os.path.abspath('.')
 
 os.chdir(script_dir)
+sys.path.insert(0, os.path.join(script_dir, '..', '..'))
+from comun.datos import RUTA_CSV, cargar_datos
+from comun.mapas import cluster_rapido
+from comun.recursos import guardar_mapa
+from comun.teselas import RUTA_PAISES, capa_base, capa_teselas, piramide_guardada, teselas_puntos
 
-CSV_FILE_PATH = os.path.normpath(os.path.join(script_dir, '../../DATA/cadena_subministrament_2015_2018.csv'))
+CSV_FILE_PATH = RUTA_CSV
 OUTPUT_HTML_PATH = "mapa_clusters_shipping_mode_leyenda.html"
+# "cluster": los destinos van en el HTML y el navegador los agrupa (con popups)
+# "teselas": los destinos van en una pirámide de teselas PNG junto al HTML (solo se cargan las que se ven)
+# None: cluster hasta MAX_PUNTOS_CLUSTER puntos distintos y teselas por encima
+MODO_PUNTOS = None
+MAX_PUNTOS_CLUSTER = 100_000
+DIR_TESELAS = "teselas_destinos"
+DIR_BASE = "teselas_base"
 
 print("Iniciando la generación del mapa de clústeres categórico con leyenda...\n")
 
 try:
-    # --- 1) Cargar CSV ---
-    df = pd.read_csv(CSV_FILE_PATH, encoding='latin1')
-    print("CSV cargado correctamente.")
+    # --- 1) Cargar datos ---
+    df = cargar_datos(['latitude_dest', 'longitude_dest', 'shipping_mode'])
+    print("Datos cargados correctamente.")
 except FileNotFoundError:
     print(f"❌ No se encontró el archivo CSV en: {CSV_FILE_PATH}")
     sys.exit(1)
 except Exception as e:
-    print(f"❌ Error al leer el CSV: {e}")
+    print(f"❌ Error al leer los datos: {e}")
     sys.exit(1)
 
 # --- 2) Validar columnas necesarias y limpiar ---
@@ -58,17 +69,16 @@ df_grouped = (
 )
 print(f"Datos reducidos a {len(df_grouped)} puntos únicos.")
 
-# --- 4) Colores por modo de envío ---
-def get_color(mode: str) -> str:
-    if mode == 'Same Day':
-        return 'red'
-    elif mode == 'First Class':
-        return 'blue'
-    elif mode == 'Second Class':
-        return 'green'
-    elif mode == 'Standard Class':
-        return 'purple'
-    return 'gray'
+modo = MODO_PUNTOS or ('teselas' if len(df_grouped) > MAX_PUNTOS_CLUSTER else 'cluster')
+print(f"Destinos como {modo}.")
+
+# --- 4) Colores por modo de envío (el resto, gris) ---
+COLORES_MODO = {
+    'Same Day': 'red',
+    'First Class': 'blue',
+    'Second Class': 'green',
+    'Standard Class': 'purple',
+}
 
 # --- 5) Crear mapa base (sin tiles por defecto) ---
 ATTR_OSM = '&copy; <a href="https://www.openstreetmap.org/copyright">OpenStreetMap</a> contributors'
@@ -82,32 +92,38 @@ map_center = [df_clean['latitude_dest'].mean(), df_clean['longitude_dest'].mean(
 m = folium.Map(location=map_center, zoom_start=2, tiles=None)  # sin tiles por defecto
 
 # --- 6) Capas base con atribución ---
-folium.TileLayer('openstreetmap', name='OpenStreetMap', attr=ATTR_OSM).add_to(m)
-folium.TileLayer('cartodbdark_matter', name='CartoDB Dark', attr=ATTR_CARTO).add_to(m)
-folium.TileLayer('cartodbpositron', name='CartoDB Positron', attr=ATTR_CARTO).add_to(m)
-folium.TileLayer('Stamen Toner', name='Stamen Toner', attr=ATTR_STAMEN).add_to(m)
-
-# --- 7) Marcadores + Clúster ---
-cluster = MarkerCluster(name='Envíos (cluster)').add_to(m)
-
-for _, row in df_grouped.iterrows():
-    lat = float(row['latitude_dest'])
-    lon = float(row['longitude_dest'])
-    mode = row['shipping_mode']
-    cnt = int(row['count'])
-    color = get_color(mode)
-
-    popup_html = folium.Popup(
-        f"<b>Shipping mode:</b> {mode}<br><b>Pedidos en este punto:</b> {cnt}",
-        max_width=300
+# La de países va en teselas junto al HTML (sin red); las demás se pueden elegir en el control.
+# Sin el GeoJSON de países se muestra OpenStreetMap, para que el mapa tenga fondo
+con_base = os.path.exists(RUTA_PAISES)
+if con_base:
+    capa_base(DIR_BASE).add_to(m)
+else:
+    print(f"⚠️ No se encontró {RUTA_PAISES}: el mapa solo tendrá las capas base en línea.")
+folium.TileLayer('openstreetmap', name='OpenStreetMap', attr=ATTR_OSM, show=not con_base).add_to(m)
+folium.TileLayer('cartodbdark_matter', name='CartoDB Dark', attr=ATTR_CARTO, show=False).add_to(m)
+folium.TileLayer('cartodbpositron', name='CartoDB Positron', attr=ATTR_CARTO, show=False).add_to(m)
+folium.TileLayer('Stamen Toner', name='Stamen Toner', attr=ATTR_STAMEN, show=False).add_to(m)
+
+# --- 7) Destinos ---
+if modo == "teselas":
+    # Se dibujan una vez por nivel de zoom y solo se rehacen si cambian los datos
+    colores = df_grouped['shipping_mode'].map(COLORES_MODO).fillna('gray')
+    rehecha = piramide_guardada(
+        DIR_TESELAS,
+        lambda d: teselas_puntos(d, df_grouped['latitude_dest'], df_grouped['longitude_dest'], colores),
+        colores=COLORES_MODO,
     )
-
-    # Puedes usar Marker con Icon o CircleMarker. Aquí uso Marker con Icon
-    folium.Marker(
-        location=[lat, lon],
-        popup=popup_html,
-        icon=folium.Icon(color=color, icon="circle")
-    ).add_to(cluster)
+    print(f"Teselas de destinos {'generadas' if rehecha else 'reutilizadas'} en: {os.path.abspath(DIR_TESELAS)}")
+    capa_teselas(DIR_TESELAS, 'Envíos (teselas)').add_to(m)
+else:
+    # Los puntos van como un array compacto y el navegador crea los marcadores
+    # (y cada popup solo al abrirlo), en vez de un Marker con Popup e Icon por punto
+    cluster_rapido(
+        df_grouped, 'latitude_dest', 'longitude_dest', 'shipping_mode',
+        colores=COLORES_MODO,
+        campos=[('Shipping mode', 'shipping_mode'), ('Pedidos en este punto', 'count')],
+        nombre='Envíos (cluster)',
+    ).add_to(m)
 
 # Control de capas
 folium.LayerControl().add_to(m)
@@ -129,6 +145,6 @@ legend_html = """
 """
 m.get_root().html.add_child(folium.Element(legend_html))
 
-# --- 9) Guardar ---
-m.save(OUTPUT_HTML_PATH)
+# --- 9) Guardar (con Leaflet y demás librerías copiadas en lib/) ---
+guardar_mapa(m, OUTPUT_HTML_PATH)
 print(f" Mapa guardado en: {os.path.abspath(OUTPUT_HTML_PATH)}")
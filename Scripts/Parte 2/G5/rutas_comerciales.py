@@ -1,10 +1,8 @@
 import os
 import sys
-import math
 import pandas as pd
 import folium
 from folium import FeatureGroup
-from folium.plugins import MarkerCluster
 
 # --- Config rutas (igual estilo que antes) ---
 try:
@@ -12,15 +10,26 @@ try:
 except NameError:
     SCRIPT_DIR = os.path.abspath('.')
 os.chdir(SCRIPT_DIR)
+sys.path.insert(0, os.path.join(SCRIPT_DIR, '..', '..'))
+from comun.datos import RUTA_CSV, cargar_datos
+from comun.recursos import guardar_mapa
+from comun.teselas import RUTA_PAISES, capa_base, capa_teselas, piramide_guardada, teselas_lineas
+from comun.topk import top_k
 
-CSV_FILE_PATH = os.path.normpath(os.path.join(SCRIPT_DIR, '../../DATA/cadena_subministrament_2015_2018.csv'))
+CSV_FILE_PATH = RUTA_CSV
 OUTPUT_HTML_PATH = "mapa_flujo_rutas_principales.html"
+# Rutas que se dibujan en teselas PNG junto al HTML (las TOP_N principales van además como líneas)
+TOP_TESELAS = 1000
+DIR_TESELAS = "teselas_rutas"
+ZOOM_TESELAS = 5
+DIR_BASE = "teselas_base"
 
 print("\n🔄 Generando Mapa de Flujo (Tránsito)…")
 
 # --- 1) Cargar datos ---
 try:
-    df = pd.read_csv(CSV_FILE_PATH, encoding='latin1')
+    df = cargar_datos(['order_id', 'latitude_src', 'longitude_src', 'latitude_dest', 'longitude_dest',
+                       'customer_country', 'order_country'])
 except FileNotFoundError:
     print(f"❌ No se encontró el CSV: {CSV_FILE_PATH}")
     sys.exit(1)
@@ -115,7 +124,7 @@ else:
 
 # --- 4) Seleccionar Top-N rutas ---
 TOP_N = 20
-routes_top = routes.sort_values('count', ascending=False).head(TOP_N).reset_index(drop=True)
+routes_top = top_k(routes, TOP_N, 'count').reset_index(drop=True)
 print(f"Top {TOP_N} rutas encontradas:")
 print(routes_top[['src','dst','count']].head(10).to_string(index=False))
 
@@ -130,8 +139,15 @@ else:
 ATTR_OSM = '&copy; <a href="https://www.openstreetmap.org/copyright">OpenStreetMap</a> contributors'
 ATTR_CARTO = (ATTR_OSM + ' &copy; <a href="https://carto.com/attributions">CARTO</a>')
 m = folium.Map(location=[lat_center, lon_center], zoom_start=2, tiles=None)
-folium.TileLayer('cartodbdark_matter', name='CartoDB Dark', attr=ATTR_CARTO).add_to(m)
-folium.TileLayer('openstreetmap', name='OpenStreetMap', attr=ATTR_OSM).add_to(m)
+# Fondo de países en teselas junto al HTML (sin red); los en línea se pueden elegir en el control.
+# Sin el GeoJSON de países se muestra CartoDB Dark, para que el mapa tenga fondo
+con_base = os.path.exists(RUTA_PAISES)
+if con_base:
+    capa_base(DIR_BASE).add_to(m)
+else:
+    print(f"⚠️ No se encontró {RUTA_PAISES}: el mapa solo tendrá las capas base en línea.")
+folium.TileLayer('cartodbdark_matter', name='CartoDB Dark', attr=ATTR_CARTO, show=not con_base).add_to(m)
+folium.TileLayer('openstreetmap', name='OpenStreetMap', attr=ATTR_OSM, show=False).add_to(m)
 
 # --- 6) Escalado de grosor (weight) por nº de pedidos ---
 cmin, cmax = routes_top['count'].min(), routes_top['count'].max()
@@ -179,6 +195,24 @@ for idx, row in routes_top.iterrows():
         tooltip=tooltip
     ).add_to(routes_fg)
 
+# Resto de rutas: pirámide de teselas (solo se cargan las que se ven), más finas,
+# con las de más pedidos encima
+routes_teselas = top_k(routes, TOP_TESELAS, 'count').iloc[::-1]
+def dibujar_rutas(directorio):
+    c = routes_teselas['count'].to_numpy(dtype='float64')
+    anchos = 1 + 2 * (c - c.min()) / ((c.max() - c.min()) or 1)
+    teselas_lineas(directorio,
+                   [lat for lat, _ in routes_teselas['src']], [lon for _, lon in routes_teselas['src']],
+                   [lat for lat, _ in routes_teselas['dst']], [lon for _, lon in routes_teselas['dst']],
+                   colores="#955196", anchos=anchos, zoom_max=ZOOM_TESELAS, opacidad=0.5)
+rehecha = piramide_guardada(DIR_TESELAS, dibujar_rutas, top=TOP_TESELAS, zoom=ZOOM_TESELAS)
+print(f"Teselas de {len(routes_teselas)} rutas {'generadas' if rehecha else 'reutilizadas'} en: "
+      f"{os.path.abspath(DIR_TESELAS)}")
+if len(routes) > len(routes_teselas):
+    print(f"⚠️ {len(routes) - len(routes_teselas)} rutas con menos pedidos no entran en las teselas "
+          f"(TOP_TESELAS = {TOP_TESELAS}).")
+capa_teselas(DIR_TESELAS, f"Top {TOP_TESELAS} rutas (teselas)", zoom_max=ZOOM_TESELAS).add_to(m)
+
 # Marcadores (origen/destino) como círculos con tamaño por grado
 nodes_fg = FeatureGroup(name="Nodos (origen/destino)").add_to(m)
 for (lat, lon), val in deg.items():
@@ -209,6 +243,6 @@ m.get_root().html.add_child(folium.Element(legend))
 
 folium.LayerControl(collapsed=False).add_to(m)
 
-# --- 9) Guardar ---
-m.save(OUTPUT_HTML_PATH)
+# --- 9) Guardar (con Leaflet y demás librerías copiadas en lib/) ---
+guardar_mapa(m, OUTPUT_HTML_PATH)
 print(f" Mapa guardado en: {os.path.abspath(OUTPUT_HTML_PATH)}")
\ No newline at end of file
@@ -0,0 +1,7 @@
+"""
+Utilidades compartidas por los scripts de la Parte 1 y la Parte 2.
+
+Los scripts añaden la carpeta Scripts/ al sys.path y luego importan, p. ej.:
+
+    from comun.datos import cargar_datos
+"""
@@ -0,0 +1,130 @@
+"""
+Agregados guardados en DATA/cache que se actualizan al anexar datos nuevos.
+
+Cada agregado se define por sus claves y medidas (sumas, conteos, mínimos,
+máximos o medias, como en comun/bloques.py). Se guardan los parciales (sumas y
+conteos), no el resultado, para poder sumarles los de las filas nuevas sin
+recorrer el histórico:
+
+    from comun.agregados import cargar_agregado
+    ventas = cargar_agregado("ventas_cliente")
+
+Se reconstruyen por bloques si cambia el CSV principal o si falta alguno de los
+anexos (comun/anexos.py).
+"""
+import json
+import os
+from dataclasses import dataclass
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from . import bloques, datos
+
+# Se incrementa cuando cambia la definición de algún agregado
+VERSION_AGREGADOS = 1
+
+
+def _marcar_retraso(df):
+    # Retraso: el envío tardó más días de los programados
+    return df.assign(late=df["days_for_shipping_real"] > df["days_for_shipment_scheduled"])
+
+
+@dataclass
+class Agregado:
+    claves: list
+    medidas: dict
+    # Columnas del dataset que se leen además de las claves (por defecto, las de las medidas)
+    columnas: list = None
+    # Función que añade al bloque las columnas calculadas que usan las medidas
+    preparar: object = None
+
+    def columnas_necesarias(self):
+        columnas = self.columnas if self.columnas is not None else [col for col, _ in self.medidas.values()]
+        return list(dict.fromkeys(self.claves + columnas))
+
+    def parciales(self, df):
+        if self.preparar is not None:
+            df = self.preparar(df)
+        return bloques.agregar_bloque(df, self.claves, self.medidas)
+
+
+AGREGADOS = {
+    # Pedidos y pedidos retrasados por producto (G10)
+    "retrasos_producto": Agregado(
+        claves=["product_name"],
+        medidas={"total_pedidos": ("order_id", "count"), "retrasados": ("late", "sum")},
+        columnas=["order_id", "days_for_shipping_real", "days_for_shipment_scheduled"],
+        preparar=_marcar_retraso,
+    ),
+    # Ventas totales por cliente (G5)
+    "ventas_cliente": Agregado(
+        claves=["customer_id"],
+        medidas={"ventas_totales": ("order_item_total", "sum")},
+    ),
+}
+
+
+def _rutas(nombre):
+    base = os.path.join(datos.DIR_CACHE, f"agregado_{nombre}")
+    return base + ".parquet", base + ".json"
+
+
+def _huella():
+    return {**datos.huella_datos(), "agregados": VERSION_AGREGADOS}
+
+
+def agregado_vigente(nombre):
+    """True si el agregado guardado corresponde a la caché actual (CSV y anexos)."""
+    ruta, ruta_huella = _rutas(nombre)
+    if not os.path.exists(ruta) or not os.path.exists(ruta_huella):
+        return False
+    if not os.path.exists(datos.RUTA_CSV):
+        return True
+    with open(ruta_huella, encoding="utf-8") as f:
+        return json.load(f) == _huella()
+
+
+def _guardar(nombre, parciales):
+    ruta, ruta_huella = _rutas(nombre)
+    os.makedirs(datos.DIR_CACHE, exist_ok=True)
+    parciales.to_parquet(ruta + ".tmp")
+    os.replace(ruta + ".tmp", ruta)
+    with open(ruta_huella, "w", encoding="utf-8") as f:
+        json.dump(_huella(), f)
+
+
+def construir_agregado(nombre, forzar=False):
+    """Calcula los parciales del agregado recorriendo el dataset por bloques."""
+    if not forzar and agregado_vigente(nombre):
+        return _rutas(nombre)[0]
+    agregado = AGREGADOS[nombre]
+    acumulado = None
+    for bloque in bloques.leer_bloques(agregado.columnas_necesarias()):
+        acumulado = bloques.combinar_parciales(acumulado, agregado.parciales(bloque))
+    if acumulado is None:
+        # Sin filas: parciales vacíos, pero con las columnas de siempre
+        acumulado = agregado.parciales(pd.DataFrame(columns=agregado.columnas_necesarias()))
+    _guardar(nombre, acumulado)
+    return _rutas(nombre)[0]
+
+
+def actualizar_agregado(nombre, parte):
+    """Suma a los parciales guardados los de una parte recién anexada a la caché."""
+    agregado = AGREGADOS[nombre]
+    nuevos = agregado.parciales(datos.cargar_parte(parte, agregado.columnas_necesarias()))
+    _guardar(nombre, bloques.combinar_parciales(pd.read_parquet(_rutas(nombre)[0]), nuevos))
+
+
+def cargar_agregado(nombre):
+    """Medidas del agregado indexadas por sus claves (se construye si no está al día)."""
+    construir_agregado(nombre)
+    return bloques.resultado_parciales(pd.read_parquet(_rutas(nombre)[0]), AGREGADOS[nombre].medidas)
+
+
+def bloques_agregado(nombre, filas=None):
+    """Medidas del agregado en bloques de como mucho `filas` claves (cada clave sale una vez)."""
+    construir_agregado(nombre)
+    medidas = AGREGADOS[nombre].medidas
+    for lote in pq.ParquetFile(_rutas(nombre)[0]).iter_batches(batch_size=filas or datos.FILAS_BLOQUE):
+        yield bloques.resultado_parciales(lote.to_pandas(), medidas)
@@ -0,0 +1,45 @@
+"""
+Anexa pedidos nuevos (p. ej. el CSV de un mes) sin recalcular el histórico.
+
+Las filas del CSV nuevo se convierten a una parte Parquet más de la caché y el
+cubo de ventas, la serie diaria, los agregados y los bocetos de distintos se
+actualizan sumando (o uniendo) solo lo de esas filas, así que el coste depende
+del tamaño del anexo y no del histórico:
+
+    cd Scripts
+    python -m comun.anexos ../DATA/pedidos_2018_02.csv
+
+Un mismo fichero (nombre, tamaño y fecha) no se anexa dos veces.
+"""
+import sys
+
+from . import agregados, cubo, datos, distintos, series
+
+
+def anexar_datos(ruta_csv):
+    """Anexa `ruta_csv` a la caché y actualiza cubo, serie diaria, agregados y bocetos. Devuelve la parte o None."""
+    # Se comprueba antes de anexar: solo lo que estaba al día se puede actualizar sumando
+    cubo_al_dia = cubo.cubo_vigente()
+    serie_al_dia = series.serie_vigente()
+    agregados_al_dia = [nombre for nombre in agregados.AGREGADOS if agregados.agregado_vigente(nombre)]
+    bocetos_al_dia = [nombre for nombre in distintos.BOCETOS if distintos.boceto_vigente(nombre)]
+
+    parte = datos.anexar_csv(ruta_csv)
+    if parte is None:
+        return None
+    # Lo que no estaba al día se reconstruirá entero la próxima vez que se pida
+    if cubo_al_dia:
+        cubo.actualizar_cubo(parte)
+    if serie_al_dia:
+        series.actualizar_serie(parte)
+    for nombre in agregados_al_dia:
+        agregados.actualizar_agregado(nombre, parte)
+    for nombre in bocetos_al_dia:
+        distintos.actualizar_boceto(nombre, parte)
+    return parte
+
+
+if __name__ == "__main__":
+    for ruta in sys.argv[1:]:
+        parte = anexar_datos(ruta)
+        print(f"{ruta}: ya estaba anexado" if parte is None else f"{ruta}: anexado en {parte}")
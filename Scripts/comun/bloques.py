@@ -0,0 +1,126 @@
+"""
+Agregación por bloques del dataset, para cuando no cabe entero en memoria.
+
+La caché Parquet se recorre en bloques de FILAS_BLOQUE filas; cada bloque se
+agrega por separado y los parciales se van combinando con los acumulados. La
+memoria usada depende del tamaño de bloque y del número de grupos, no del
+número de filas.
+
+    from comun.bloques import agregar_por_bloques
+    ventas = agregar_por_bloques("category_name", {"ventas": ("sales", "sum")})
+
+Funciones admitidas: sum, count, min, max y mean (se guarda como suma y conteo).
+"""
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from . import datos
+
+# Parciales que se guardan por cada función y cómo se combinan entre bloques
+PARCIALES = {
+    "sum": ("sum",),
+    "count": ("count",),
+    "min": ("min",),
+    "max": ("max",),
+    "mean": ("sum", "count"),
+}
+COMBINAR = {"sum": "sum", "count": "sum", "min": "min", "max": "max"}
+
+
+def leer_bloques(columnas=None, filas=None):
+    """
+    Recorre el dataset en DataFrames de como mucho `filas` filas (FILAS_BLOQUE por defecto).
+
+    Si el dataset está precargado en memoria se trocea ese; si no, se leen la
+    caché Parquet y sus anexos bloque a bloque.
+    """
+    filas = filas or datos.FILAS_BLOQUE
+    if datos.hay_datos_precargados():
+        df = datos.cargar_datos(columnas)
+        for inicio in range(0, len(df), filas):
+            yield df.iloc[inicio:inicio + filas]
+        return
+    datos.construir_cache()
+    columnas = None if columnas is None else datos.validar_columnas(columnas)
+    for parte in datos.partes_cache():
+        for lote in pq.ParquetFile(parte).iter_batches(batch_size=filas, columns=columnas):
+            yield lote.to_pandas()
+
+
+def _validar_medidas(medidas):
+    for nombre, (_, funcion) in medidas.items():
+        if funcion not in PARCIALES:
+            raise ValueError(f"Función '{funcion}' de '{nombre}' no admitida por bloques: {sorted(PARCIALES)}")
+
+
+def columnas_medidas(claves, medidas):
+    """Columnas del dataset que hacen falta para agregar `medidas` por `claves`."""
+    return list(dict.fromkeys(list(claves) + [col for col, _ in medidas.values()]))
+
+
+def agregar_bloque(bloque, claves, medidas, dropna=True):
+    """
+    Parciales de un bloque por `claves`: una columna "<columna>__<parcial>" por cada
+    suma, conteo, mínimo o máximo que necesitan las `medidas`. Con dropna=False
+    las claves nulas forman su propio grupo.
+    """
+    _validar_medidas(medidas)
+    # (columna, parcial) sin repetir: sum y mean de la misma columna comparten la suma
+    pares = {}
+    for columna, funcion in medidas.values():
+        for parcial in PARCIALES[funcion]:
+            pares[f"{columna}__{parcial}"] = (columna, parcial)
+    return bloque.groupby(claves, observed=True, dropna=dropna, sort=False).agg(**pares)
+
+
+def combinar_parciales(acumulado, parcial, dropna=True):
+    """Combina dos tablas de parciales con las mismas claves (acumulado puede ser None)."""
+    if acumulado is None:
+        return parcial
+    unidos = pd.concat([acumulado, parcial])
+    combinar = {nombre: COMBINAR[nombre.rsplit("__", 1)[1]] for nombre in unidos.columns}
+    return unidos.groupby(level=list(unidos.index.names), dropna=dropna, sort=False).agg(combinar)
+
+
+def primeras_apariciones(claves, vistas=None):
+    """
+    Máscara de las `claves` que salen por primera vez, ni antes en el bloque ni en
+    `vistas` (las de los bloques anteriores), y las vistas con las del bloque.
+
+    Sirve para contar distintos exactos por bloques (p. ej. cada pedido en su
+    primera línea) sin volver a las filas de los bloques anteriores.
+    """
+    claves = np.asarray(claves)
+    vistas = claves[:0] if vistas is None else vistas
+    nuevas = ~pd.Series(claves).duplicated().to_numpy() & ~np.isin(claves, vistas)
+    return nuevas, np.union1d(vistas, claves[nuevas])
+
+
+def resultado_parciales(parciales, medidas):
+    """Medidas finales a partir de los parciales, ordenadas por las claves."""
+    resultado = pd.DataFrame(index=parciales.index)
+    for nombre, (columna, funcion) in medidas.items():
+        if funcion == "mean":
+            resultado[nombre] = parciales[f"{columna}__sum"] / parciales[f"{columna}__count"]
+        else:
+            resultado[nombre] = parciales[f"{columna}__{funcion}"]
+    return resultado.sort_index()
+
+
+def agregar_por_bloques(claves, medidas, filas=None):
+    """
+    Agrega el dataset por `claves` sin cargarlo entero.
+
+    `medidas` es {nombre: (columna, función)}, como en DataFrame.agg con nombres.
+    Devuelve un DataFrame indexado por las claves (ordenado) con una columna por
+    medida. Igual que groupby, las filas con la clave nula no cuentan.
+    """
+    claves = [claves] if isinstance(claves, str) else list(claves)
+    _validar_medidas(medidas)
+    acumulado = None
+    for bloque in leer_bloques(columnas_medidas(claves, medidas), filas):
+        acumulado = combinar_parciales(acumulado, agregar_bloque(bloque, claves, medidas))
+    if acumulado is None:
+        acumulado = agregar_bloque(pd.DataFrame(columns=columnas_medidas(claves, medidas)), claves, medidas)
+    return resultado_parciales(acumulado, medidas)
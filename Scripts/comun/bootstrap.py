@@ -0,0 +1,135 @@
+"""
+Intervalos de confianza bootstrap para la correlación de Pearson y la recta de regresión.
+
+Las remuestras no se hacen una a una en un bucle de Python: cada lote es una
+matriz de índices (remuestras x n) sacada de una vez, que se pasa a cuántas
+veces sale cada fila en cada remuestra. Las sumas de x, y, x², y² y x·y de todas
+las remuestras del lote salen de un solo producto de matrices, y de ellas r,
+pendiente y ordenada. Por defecto los lotes se hacen en serie: arrancar
+procesos no compensaba. Se reparten en un pool si se pide con procesos > 1, o
+con SIO_PROCESOS_BOOTSTRAP si el trabajo es grande. Cada lote tiene su propia
+semilla derivada (SeedSequence.spawn), así que el resultado es el mismo con
+cualquier número de procesos:
+
+    from comun.bootstrap import bootstrap_regresion
+    b = bootstrap_regresion(data["discount"], data["margin_pct"])
+    print(b.intervalos())           # r, pendiente y ordenada: estimación, inferior, superior
+    inferior, superior = b.banda(xline)
+
+Los intervalos son de percentiles (nivel 0.95 por defecto).
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+REMUESTRAS = 2000
+NIVEL = 0.95
+# Elementos (remuestras x filas) de cada matriz de índices: acota la memoria por lote
+ELEMENTOS_LOTE = 4_000_000
+# Por debajo de este trabajo total (remuestras x filas) no compensa arrancar procesos
+MINIMO_PARALELO = 20_000_000
+# Procesos por defecto (SIO_PROCESOS_BOOTSTRAP; 1 = en serie, 0 = uno por núcleo)
+PROCESOS = int(os.environ.get("SIO_PROCESOS_BOOTSTRAP", "1")) or os.cpu_count() or 1
+
+ESTADISTICOS = ["r", "pendiente", "ordenada"]
+
+
+def _potencias(x, y):
+    # Columnas cuyas sumas dan los estadísticos: 1, x, y, x², y², x·y
+    return np.column_stack([np.ones_like(x), x, y, x * x, y * y, x * y])
+
+
+def _estadisticos(sumas):
+    # sumas: (..., 6) con las de _potencias; r, pendiente y ordenada por fila
+    n, sx, sy, sxx, syy, sxy = np.moveaxis(sumas, -1, 0)
+    mx, my = sx / n, sy / n
+    cxx, cyy, cxy = sxx - n * mx * mx, syy - n * my * my, sxy - n * mx * my
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = cxy / np.sqrt(cxx * cyy)
+        pendiente = cxy / cxx
+    return np.stack([r, pendiente, my - pendiente * mx], axis=-1)
+
+
+def _lote(potencias, semilla, remuestras):
+    n = len(potencias)
+    rng = np.random.default_rng(semilla)
+    indices = rng.integers(0, n, size=(remuestras, n))
+    # Veces que sale cada fila en cada remuestra (un bincount para todo el lote)
+    desplazados = indices + np.arange(remuestras)[:, None] * n
+    veces = np.bincount(desplazados.ravel(), minlength=remuestras * n).reshape(remuestras, n)
+    return _estadisticos(veces @ potencias)
+
+
+def _contexto_procesos():
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+@dataclass
+class Bootstrap:
+    # Estadísticos con los datos originales (Series r, pendiente, ordenada)
+    estimacion: pd.Series
+    # Un estadístico por columna y una remuestra por fila
+    muestras: pd.DataFrame
+
+    def intervalos(self, nivel=NIVEL):
+        """Estimación e intervalo de percentiles de cada estadístico."""
+        alfa = (1 - nivel) / 2
+        limites = self.muestras.quantile([alfa, 1 - alfa]).T
+        limites.columns = ["inferior", "superior"]
+        return pd.concat([self.estimacion.rename("estimacion"), limites], axis=1)
+
+    def banda(self, x, nivel=NIVEL):
+        """Banda de la recta de regresión en los puntos `x`: (inferior, superior)."""
+        x = np.asarray(x, dtype="float64")
+        rectas = (self.muestras["ordenada"].to_numpy()[:, None]
+                  + self.muestras["pendiente"].to_numpy()[:, None] * x[None, :])
+        alfa = (1 - nivel) / 2
+        return tuple(np.nanquantile(rectas, [alfa, 1 - alfa], axis=0))
+
+
+def bootstrap_regresion(x, y, remuestras=REMUESTRAS, semilla=0, procesos=None):
+    """
+    Bootstrap por pares (x, y) de r de Pearson y de la recta y = ordenada + pendiente·x.
+
+    Los pares con algún nulo no cuentan. `procesos` None usa PROCESOS (1, en serie,
+    salvo que se pida otra cosa) si el trabajo es grande (MINIMO_PARALELO) y uno
+    solo si no.
+    """
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    validos = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[validos], y[validos]
+    n = len(x)
+    if n < 3:
+        raise ValueError(f"Hacen falta al menos 3 pares para el bootstrap (hay {n})")
+    # Centrados para que las sumas de cuadrados no pierdan precisión; se deshace al final
+    cx, cy = x.mean(), y.mean()
+    potencias = _potencias(x - cx, y - cy)
+
+    por_lote = max(1, min(remuestras, ELEMENTOS_LOTE // n))
+    tamanos = [min(por_lote, remuestras - inicio) for inicio in range(0, remuestras, por_lote)]
+    semillas = np.random.SeedSequence(semilla).spawn(len(tamanos))
+    if procesos is None:
+        procesos = PROCESOS if remuestras * n >= MINIMO_PARALELO else 1
+    procesos = min(procesos, len(tamanos))
+
+    # Un worker de un pool daemónico no puede crear procesos: entonces se hace en serie
+    if procesos <= 1 or multiprocessing.current_process().daemon:
+        lotes = [_lote(potencias, s, t) for s, t in zip(semillas, tamanos)]
+    else:
+        with ProcessPoolExecutor(max_workers=procesos, mp_context=_contexto_procesos()) as pool:
+            lotes = list(pool.map(_lote, [potencias] * len(tamanos), semillas, tamanos))
+
+    estimacion = _estadisticos(potencias.sum(axis=0))
+    muestras = np.concatenate(lotes)
+    # La ordenada se calculó con x e y centradas
+    for valores in (estimacion[None, :], muestras):
+        valores[:, 2] += cy - valores[:, 1] * cx
+    return Bootstrap(pd.Series(estimacion, index=ESTADISTICOS),
+                     pd.DataFrame(muestras, columns=ESTADISTICOS))
@@ -0,0 +1,101 @@
+"""
+Tablas de contingencia dispersas y contraste chi² / V de Cramér sobre ellas.
+
+Las dos variables se codifican como enteros (los códigos de las categóricas o
+pd.factorize) y los conteos se guardan en una matriz dispersa de scipy con solo
+las celdas no vacías. Así una tabla producto x retraso o ciudad x segmento con
+miles de filas ocupa lo que sus celdas con datos, y el chi² se calcula sobre
+ellas sin pasar a una tabla densa:
+
+    from comun.contingencia import chi_cuadrado, tabla_contingencia, v_cramer
+    t = tabla_contingencia(df, "product_name", "late")
+    chi2, p, gl = chi_cuadrado(t)
+
+Con datos ya agregados (el cubo, agregados guardados) se pasan los conteos de
+cada combinación como `pesos`.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy import sparse, stats
+
+
+@dataclass
+class Tabla:
+    # Matriz dispersa (CSR) filas x columnas con los conteos
+    conteos: sparse.csr_matrix
+    filas: pd.Index
+    columnas: pd.Index
+
+    @property
+    def total(self):
+        return float(self.conteos.sum())
+
+    def densa(self):
+        """La tabla como DataFrame (solo para tablas pequeñas: gráficos, impresión)."""
+        return pd.DataFrame(self.conteos.toarray(), index=self.filas, columns=self.columnas)
+
+
+def _codificar(serie):
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.codes.to_numpy(), serie.cat.categories
+    codigos, etiquetas = pd.factorize(serie, sort=True)
+    return codigos, pd.Index(etiquetas)
+
+
+def tabla_contingencia(df, fila, columna, pesos=None):
+    """
+    Conteos de `fila` x `columna` (número de filas de `df`, o suma de la columna
+    `pesos`). Las filas con alguna de las dos variables nula no cuentan.
+    """
+    cf, etiquetas_f = _codificar(df[fila])
+    cc, etiquetas_c = _codificar(df[columna])
+    w = np.ones(len(df)) if pesos is None else df[pesos].to_numpy(dtype="float64")
+    validos = (cf >= 0) & (cc >= 0)
+    # coo -> csr suma las entradas repetidas de la misma celda
+    conteos = sparse.coo_matrix((w[validos], (cf[validos], cc[validos])),
+                                shape=(len(etiquetas_f), len(etiquetas_c))).tocsr()
+    conteos.eliminate_zeros()
+    # Fuera las categorías sin ninguna observación (como crosstab con observed=True)
+    usadas_f = np.flatnonzero(np.asarray(conteos.sum(axis=1)).ravel())
+    usadas_c = np.flatnonzero(np.asarray(conteos.sum(axis=0)).ravel())
+    return Tabla(conteos[usadas_f][:, usadas_c], pd.Index(etiquetas_f[usadas_f], name=fila),
+                 pd.Index(etiquetas_c[usadas_c], name=columna))
+
+
+def chi_cuadrado(tabla, correccion=True):
+    """
+    Chi² de independencia sobre la tabla dispersa: (chi2, p, grados de libertad).
+
+    Igual que scipy.stats.chi2_contingency: con 1 grado de libertad y
+    correccion=True se aplica la corrección de Yates.
+    """
+    o = tabla.conteos
+    n = o.sum()
+    r = np.asarray(o.sum(axis=1), dtype="float64").ravel()
+    c = np.asarray(o.sum(axis=0), dtype="float64").ravel()
+    gl = (len(r) - 1) * (len(c) - 1)
+    if gl == 0 or n == 0:
+        return 0.0, 1.0, gl
+    if gl == 1 and correccion:
+        # 2x2: se hace denso, con las celdas vacías incluidas
+        esperado = np.outer(r, c) / n
+        diferencia = np.abs(o.toarray() - esperado)
+        diferencia = np.maximum(diferencia - 0.5, 0)
+        chi2 = (diferencia ** 2 / esperado).sum()
+    else:
+        # sum((O - E)² / E) = N · (sum(O² / (R·C)) - 1), y solo suman las celdas con O > 0
+        coo = o.tocoo()
+        chi2 = n * ((coo.data ** 2 / (r[coo.row] * c[coo.col])).sum() - 1)
+    return float(chi2), float(stats.chi2.sf(chi2, gl)), gl
+
+
+def v_cramer(tabla):
+    """V de Cramér (sin corrección de Yates), de 0 (independencia) a 1."""
+    filas, columnas = tabla.conteos.shape
+    k = min(filas, columnas) - 1
+    if k == 0:
+        return np.nan
+    chi2, _, _ = chi_cuadrado(tabla, correccion=False)
+    return float(np.sqrt(chi2 / (tabla.total * k)))
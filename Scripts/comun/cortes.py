@@ -0,0 +1,108 @@
+"""
+Búsqueda del mes de corte (cambio de régimen) en las ventas por categoría.
+
+En vez de fijar el corte a mano (antes y después de septiembre 2017), se
+prueban todos los meses a la vez: con la serie mensual por categoría
+(comun/series.py) como matriz meses x categorías, las sumas acumuladas dan
+para cada corte los totales de antes y de después sin volver a agrupar. Para
+cada corte se calcula:
+
+    desplazamiento  cuánto cambia el reparto de ventas entre categorías
+                    (distancia de variación total: 0 igual, 1 sin nada en común)
+    v_cramer        tamaño del efecto del chi² (0..1)
+    chi2, p_valor   homogeneidad del reparto de líneas por categoría antes/después
+    ventas_mes_*    ventas medias por mes antes y después
+    ticket_*        ticket medio (ventas / pedidos) antes y después
+
+Los cortes se ordenan por el chi², que mide la diferencia de repartos en
+unidades de su error. El desplazamiento no sirve para ordenar: con pocos meses
+a un lado el reparto es ruidoso y ganaban los cortes de los extremos. Como
+todos los cortes tienen los mismos grados de libertad, el orden es el mismo
+que el del p-valor (que con tantas líneas se queda en 0 y no desempata) y el
+de la V de Cramér:
+
+    from comun.cortes import mejor_corte, nombre_corte
+    corte = mejor_corte()                  # p. ej. Timestamp("2017-09-01")
+    nombre_corte(corte)                    # "septiembre 2017", para títulos
+"""
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from . import series
+
+# Meses mínimos a cada lado del corte
+MINIMO_MESES = 3
+
+MESES = ["enero", "febrero", "marzo", "abril", "mayo", "junio", "julio",
+         "agosto", "septiembre", "octubre", "noviembre", "diciembre"]
+
+
+def _matriz(medida, por):
+    tabla = series.serie(medida, grano="M", por=por)[medida].unstack(por, fill_value=0)
+    return tabla.sort_index()
+
+
+def barrido_cortes(por="category_name", minimo=MINIMO_MESES):
+    """
+    Todos los meses de corte candidatos (el corte es el primer mes de "después"),
+    ordenados de más a menos significativos (chi² del reparto de líneas).
+    """
+    ventas = _matriz("ventas", por)
+    lineas = _matriz("lineas", por).reindex_like(ventas).fillna(0)
+    totales = series.serie(["ventas", "pedidos"], grano="M").reindex(ventas.index, fill_value=0)
+
+    meses = len(ventas)
+    cortes = np.arange(minimo, meses - minimo + 1)
+    if len(cortes) == 0:
+        raise ValueError(f"Hacen falta al menos {2 * minimo} meses para buscar el corte (hay {meses})")
+
+    # Sumas acumuladas: fila c = total de los meses anteriores al corte c
+    def antes_de(matriz):
+        acumulada = np.vstack([np.zeros((1,) + matriz.shape[1:]), np.cumsum(matriz, axis=0)])
+        return acumulada[cortes], acumulada[-1]
+
+    v_antes, v_total = antes_de(ventas.to_numpy(dtype="float64"))
+    v_despues = v_total - v_antes
+    with np.errstate(divide="ignore", invalid="ignore"):
+        reparto_antes = v_antes / v_antes.sum(axis=1, keepdims=True)
+        reparto_despues = v_despues / v_despues.sum(axis=1, keepdims=True)
+    desplazamiento = 0.5 * np.abs(reparto_antes - reparto_despues).sum(axis=1)
+
+    # Chi² de la tabla 2 x categorías de cada corte: N · (sum(O² / (R·C)) - 1)
+    l_antes, l_total = antes_de(lineas.to_numpy(dtype="float64"))
+    l_despues = l_total - l_antes
+    usadas = l_total > 0
+    n = l_total.sum()
+    filas = np.stack([l_antes.sum(axis=1), l_despues.sum(axis=1)], axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        suma = ((l_antes[:, usadas] ** 2 / l_total[usadas]).sum(axis=1) / filas[:, 0]
+                + (l_despues[:, usadas] ** 2 / l_total[usadas]).sum(axis=1) / filas[:, 1])
+    chi2 = n * (suma - 1)
+    gl = max(usadas.sum() - 1, 1)
+
+    t_antes, t_total = antes_de(totales[["ventas", "pedidos"]].to_numpy(dtype="float64"))
+    t_despues = t_total - t_antes
+    with np.errstate(divide="ignore", invalid="ignore"):
+        resultado = pd.DataFrame({
+            "desplazamiento": desplazamiento,
+            "v_cramer": np.sqrt(chi2 / n),
+            "chi2": chi2,
+            "p_valor": stats.chi2.sf(chi2, gl),
+            "ventas_mes_antes": t_antes[:, 0] / cortes,
+            "ventas_mes_despues": t_despues[:, 0] / (meses - cortes),
+            "ticket_antes": t_antes[:, 0] / t_antes[:, 1],
+            "ticket_despues": t_despues[:, 0] / t_despues[:, 1],
+        }, index=pd.DatetimeIndex(ventas.index[cortes], name="corte"))
+    return resultado.sort_values("chi2", ascending=False, kind="stable")
+
+
+def mejor_corte(por="category_name", minimo=MINIMO_MESES):
+    """Mes de corte más significativo (primer día del primer mes de "después")."""
+    return barrido_cortes(por, minimo).index[0]
+
+
+def nombre_corte(corte):
+    """Mes y año para títulos: "septiembre 2017"."""
+    corte = pd.Timestamp(corte)
+    return f"{MESES[corte.month - 1]} {corte.year}"
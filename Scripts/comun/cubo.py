@@ -0,0 +1,188 @@
+"""
+Cubo preagregado (OLAP) de las ventas por las dimensiones más usadas en los informes.
+
+Cada celda es una combinación de mes, mercado, categoría, modo de envío, país de
+destino, segmento de cliente y estado de entrega, con las sumas de sus líneas de
+pedido. El cubo se guarda en DATA/cache junto a la caché Parquet y se reconstruye
+cuando cambia el CSV; al anexar datos nuevos (comun/anexos.py) solo se agregan
+las filas nuevas y se suman a las celdas existentes. Los informes que solo necesitan sumas, conteos o medias por
+estas dimensiones lo consultan en vez de recorrer el dataset fila a fila:
+
+    from comun.cubo import consultar_cubo
+    ventas = consultar_cubo(["category_name"])["ventas"]
+
+Medidas por celda:
+    ventas      suma de sales
+    beneficio   suma de benefit_per_order
+    total       suma de order_item_total
+    articulos   suma de order_item_quantity
+    lineas      número de líneas de pedido (filas)
+    retrasos    suma de late_delivery_risk (líneas con riesgo de retraso)
+    pedidos     pedidos distintos (order_id) de la celda
+
+Todas son sumables entre celdas salvo `pedidos`: un pedido puede tener líneas de
+varias categorías. Las demás dimensiones son del pedido (fecha, destino, cliente,
+envío), así que al agregar sin category_name se usa `pedidos_linea1`, que cuenta
+cada pedido solo en la celda de su primera línea.
+"""
+import json
+import os
+
+import pandas as pd
+
+from . import bloques, datos
+
+RUTA_CUBO = os.path.join(datos.DIR_CACHE, "cubo_ventas.parquet")
+RUTA_HUELLA_CUBO = os.path.join(datos.DIR_CACHE, "cubo_ventas.json")
+
+# Se incrementa cuando cambian las dimensiones o medidas del cubo
+VERSION_CUBO = 1
+
+DIMENSIONES = [
+    "order_month",
+    "market",
+    "category_name",
+    "shipping_mode",
+    "order_country_en",
+    "customer_segment",
+    "delivery_status",
+]
+
+# Medida -> columna del dataset que se suma
+SUMAS = {
+    "ventas": "sales",
+    "beneficio": "benefit_per_order",
+    "total": "order_item_total",
+    "articulos": "order_item_quantity",
+    "retrasos": "late_delivery_risk",
+}
+MEDIDAS = list(SUMAS) + ["lineas", "pedidos"]
+
+
+def _huella_cubo():
+    return {**datos.huella_datos(), "cubo": VERSION_CUBO}
+
+
+def cubo_vigente():
+    """True si el cubo guardado corresponde al CSV actual (o si no hay CSV del que reconstruirlo)."""
+    if not os.path.exists(RUTA_CUBO) or not os.path.exists(RUTA_HUELLA_CUBO):
+        return False
+    if not os.path.exists(datos.RUTA_CSV):
+        return True
+    with open(RUTA_HUELLA_CUBO, encoding="utf-8") as f:
+        return json.load(f) == _huella_cubo()
+
+
+# Columnas del dataset que hacen falta para calcular las celdas
+COLUMNAS = DIMENSIONES + list(SUMAS.values()) + ["order_id"]
+
+
+# Medidas de cada bloque (comun/bloques.py): todas son sumas. `pedidos` suma las líneas
+# que son la primera de su pedido en la celda y `pedidos_linea1` las primeras del pedido
+MEDIDAS_BLOQUE = {
+    **{medida: (columna, "sum") for medida, columna in SUMAS.items()},
+    "lineas": ("linea", "sum"),
+    "pedidos": ("pedido_celda", "sum"),
+    "pedidos_linea1": ("pedido_nuevo", "sum"),
+}
+
+
+def celdas_por_bloques(bloques_filas, claves=DIMENSIONES, preparar=None):
+    """
+    Suma de MEDIDAS (y pedidos_linea1) por `claves` recorriendo `bloques_filas`
+    (DataFrames en el orden del dataset), sin tenerlos todos en memoria.
+
+    Los pedidos ya vistos se recuerdan entre bloques (sus order_id y un hash de
+    celda + order_id), así que `pedidos` y `pedidos_linea1` salen igual que con
+    nunique() y duplicated() sobre el dataset entero. `preparar` se aplica a
+    cada bloque después de marcar la primera línea de cada pedido (p. ej. para
+    añadir o filtrar claves).
+    """
+    claves = list(claves)
+    acumulado, categorias = None, {}
+    pedidos_vistos = pares_vistos = None
+    for bloque in bloques_filas:
+        nuevos, pedidos_vistos = bloques.primeras_apariciones(bloque["order_id"], pedidos_vistos)
+        bloque = bloque.assign(pedido_nuevo=nuevos.astype("int32"), linea=1)
+        if preparar is not None:
+            bloque = preparar(bloque)
+        pares = pd.util.hash_pandas_object(bloque[claves + ["order_id"]], index=False)
+        celda, pares_vistos = bloques.primeras_apariciones(pares, pares_vistos)
+        bloque = bloque.assign(pedido_celda=celda.astype("int32"))
+        # Cada bloque trae sus propias categorías: se juntan en orden de aparición
+        for col in claves:
+            if isinstance(bloque[col].dtype, pd.CategoricalDtype):
+                previas = categorias.get(col, pd.Index([]))
+                categorias[col] = previas.append(bloque[col].cat.categories.difference(previas, sort=False))
+        parcial = bloques.agregar_bloque(bloque, claves, MEDIDAS_BLOQUE, dropna=False)
+        acumulado = bloques.combinar_parciales(acumulado, parcial, dropna=False)
+    if acumulado is None:
+        vacio = pd.DataFrame(columns=bloques.columnas_medidas(claves, MEDIDAS_BLOQUE))
+        acumulado = bloques.agregar_bloque(vacio, claves, MEDIDAS_BLOQUE)
+
+    celdas = bloques.resultado_parciales(acumulado, MEDIDAS_BLOQUE).reset_index()
+    for col, valores in categorias.items():
+        celdas[col] = pd.Categorical(celdas[col], categories=valores)
+    return celdas.sort_values(claves, ignore_index=True)
+
+
+def construir_cubo(forzar=False):
+    """Agrega el dataset bloque a bloque en las celdas del cubo y lo guarda si no está al día."""
+    if not forzar and cubo_vigente():
+        return RUTA_CUBO
+    _guardar(celdas_por_bloques(bloques.leer_bloques(COLUMNAS)))
+    return RUTA_CUBO
+
+
+def actualizar_cubo(parte):
+    """
+    Suma a las celdas del cubo las de una parte recién anexada a la caché.
+
+    Los pedidos de la parte son nuevos, así que todas las medidas (también
+    `pedidos`) se suman celda a celda.
+    """
+    nuevas = celdas_por_bloques([datos.cargar_parte(parte, COLUMNAS)])
+    celdas = pd.concat([pd.read_parquet(RUTA_CUBO), nuevas], ignore_index=True)
+    celdas = celdas.groupby(DIMENSIONES, observed=True, dropna=False, sort=True).sum().reset_index()
+    _guardar(celdas)
+    return RUTA_CUBO
+
+
+def _guardar(celdas):
+    os.makedirs(datos.DIR_CACHE, exist_ok=True)
+    tmp = RUTA_CUBO + ".tmp"
+    celdas.to_parquet(tmp, index=False)
+    os.replace(tmp, RUTA_CUBO)
+    with open(RUTA_HUELLA_CUBO, "w", encoding="utf-8") as f:
+        json.dump(_huella_cubo(), f)
+
+
+def cargar_cubo():
+    """Celdas del cubo: una fila por combinación de DIMENSIONES presente en los datos."""
+    construir_cubo()
+    return pd.read_parquet(RUTA_CUBO)
+
+
+def consultar_cubo(dimensiones, celdas=None):
+    """
+    Suma las medidas del cubo por `dimensiones` (subconjunto de DIMENSIONES).
+
+    `celdas` permite pasar el cubo ya filtrado (p. ej. por meses); por defecto
+    se usa el cubo entero. Devuelve un DataFrame indexado por las dimensiones
+    con las columnas de MEDIDAS.
+    """
+    dimensiones = [dimensiones] if isinstance(dimensiones, str) else list(dimensiones)
+    fuera = [d for d in dimensiones if d not in DIMENSIONES]
+    if fuera:
+        raise KeyError(f"Dimensiones que no están en el cubo: {fuera}")
+    celdas = cargar_cubo() if celdas is None else celdas
+
+    sumas = celdas.groupby(dimensiones, observed=True, sort=True)[
+        MEDIDAS + ["pedidos_linea1"]].sum()
+    if "category_name" not in dimensiones:
+        sumas["pedidos"] = sumas["pedidos_linea1"]
+    return sumas[MEDIDAS]
+
+
+if __name__ == "__main__":
+    print(f"Cubo generado en: {construir_cubo(forzar=True)}")
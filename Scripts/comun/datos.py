@@ -0,0 +1,495 @@
+"""
+Carga compartida del conjunto de datos de la cadena de suministro.
+
+La primera vez que se pide el dataset se lee el CSV original una sola vez,
+se aplican los tipos de cada columna del diccionario de datos y se guarda una
+copia columnar (Parquet) en DATA/cache. Las dimensiones de pocos valores
+(modo de envío, mercado, región, estados, segmento, categoría, departamento
+y tipo) se guardan como categóricas, tanto en disco (columnas de diccionario)
+como en el DataFrame cargado. Las fechas de pedido y de envío se convierten
+a datetime con un formato explícito y se añaden las claves de calendario del
+pedido (order_year, order_month, order_week). Las siguientes cargas leen esa
+copia, que solo se reconstruye si el CSV cambia (tamaño o fecha de modificación).
+
+La caché está particionada por año y mes del pedido (anio=2017/mes=09/...), así
+que cargar_datos(desde=..., hasta=...) solo lee las particiones de esas fechas.
+La conversión se hace por bloques de FILAS_BLOQUE filas, así que la memoria
+necesaria no depende del tamaño del CSV. Para agregar sin cargar el dataset
+entero, ver comun/bloques.py.
+
+Los pedidos nuevos que llegan en CSV aparte (p. ej. un mes) se añaden con
+anexar_csv() como una parte más (un fichero por partición que toca), sin volver
+a convertir el histórico. Si el CSV principal cambia, la caché se reconstruye
+desde él y los anexos se descartan.
+
+Uso desde un script (pidiendo solo las columnas que usa el análisis):
+
+    from comun.datos import cargar_datos
+    data = cargar_datos(["category_name", "sales"])
+    recientes = cargar_datos(["order_month", "sales"], desde="2017-09-01")
+
+Cuando varios informes se ejecutan en el mismo proceso (ejecutar_informes.py),
+el dataset se precarga una vez con precargar_datos() y cargar_datos() devuelve
+copias de las columnas pedidas sin volver a leer el disco.
+"""
+import json
+import os
+import shutil
+import warnings
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# --- Rutas ---
+DIR_SCRIPTS = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIR_DATOS = os.environ.get("SIO_DATOS", os.path.normpath(os.path.join(DIR_SCRIPTS, "..", "DATA")))
+RUTA_CSV = os.path.join(DIR_DATOS, "cadena_subministrament_2015_2018.csv")
+RUTA_DICCIONARIO = os.path.join(DIR_DATOS, "cadena_subministrament_2015_2018_diccionari.csv")
+DIR_CACHE = os.path.join(DIR_DATOS, "cache")
+DIR_PARTICIONES = os.path.join(DIR_CACHE, "cadena_subministrament_2015_2018")
+RUTA_HUELLA = os.path.join(DIR_CACHE, "cadena_subministrament_2015_2018.json")
+RUTA_MANIFIESTO = os.path.join(DIR_CACHE, "anexos.json")
+
+# Parte que sale del CSV principal; los anexos son parte_0001, parte_0002...
+PARTE_BASE = "parte_0000"
+# Partición de las filas sin fecha de pedido
+SIN_FECHA = "sin_fecha"
+
+# Se incrementa cuando cambia el formato de la caché para forzar su reconstrucción
+VERSION_CACHE = 5
+
+# Codificaciones que se prueban, en orden, al leer el CSV
+CODIFICACIONES = ("utf-8", "latin1")
+
+# Formatos de fecha admitidos en el CSV; se usa el primero que encaja con una muestra de la columna
+FORMATOS_FECHA = ("%m/%d/%Y %H:%M", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%d/%m/%Y %H:%M")
+MUESTRA_FECHAS = 1000
+
+# Filas por bloque al convertir el CSV y al recorrer la caché por bloques
+FILAS_BLOQUE = int(os.environ.get("SIO_FILAS_BLOQUE", 250_000))
+
+# --- Tipos por columna (campos de DATA/cadena_subministrament_2015_2018_diccionari.csv) ---
+TEXTO, CATEGORIA, FECHA, ENTERO, ENTERO_PEQ, DECIMAL = str, "category", "datetime64[ns]", "int32", "int16", "float64"
+
+TIPOS = {
+    "type": CATEGORIA,
+    "days_for_shipping_real": ENTERO_PEQ,
+    "days_for_shipment_scheduled": ENTERO_PEQ,
+    "benefit_per_order": DECIMAL,
+    "sales_per_customer": DECIMAL,
+    "delivery_status": CATEGORIA,
+    "late_delivery_risk": ENTERO_PEQ,
+    "category_id": ENTERO,
+    "category_name": CATEGORIA,
+    "customer_city": TEXTO,
+    "customer_country": TEXTO,
+    "customer_email": TEXTO,
+    "customer_fname": TEXTO,
+    "customer_id": ENTERO,
+    "customer_lname": TEXTO,
+    "customer_password": TEXTO,
+    "customer_segment": CATEGORIA,
+    "customer_state": TEXTO,
+    "customer_street": TEXTO,
+    "customer_zipcode": DECIMAL,
+    "department_id": ENTERO,
+    "department_name": CATEGORIA,
+    "latitude_src": DECIMAL,
+    "longitude_src": DECIMAL,
+    "market": CATEGORIA,
+    "order_city": TEXTO,
+    "order_country": TEXTO,
+    "order_customer_id": ENTERO,
+    "order_date_dateorders": FECHA,
+    "order_id": ENTERO,
+    "order_item_cardprod_id": ENTERO,
+    "order_item_discount": DECIMAL,
+    "order_item_discount_rate": DECIMAL,
+    "order_item_id": ENTERO,
+    "order_item_product_price": DECIMAL,
+    "order_item_profit_ratio": DECIMAL,
+    "order_item_quantity": ENTERO_PEQ,
+    "sales": DECIMAL,
+    "order_item_total": DECIMAL,
+    "order_profit_per_order": DECIMAL,
+    "order_region": CATEGORIA,
+    "order_state": TEXTO,
+    "order_status": CATEGORIA,
+    "product_card_id": ENTERO,
+    "product_category_id": ENTERO,
+    "product_image": TEXTO,
+    "product_name": TEXTO,
+    "product_price": DECIMAL,
+    "product_status": ENTERO_PEQ,
+    "shipping_date_dateorders": FECHA,
+    "shipping_mode": CATEGORIA,
+    "latitude_dest": DECIMAL,
+    "longitude_dest": DECIMAL,
+    "address_dest": TEXTO,
+    "order_city_en": TEXTO,
+    "order_state_en": TEXTO,
+    "order_country_en": TEXTO,
+    "order_zipcode": DECIMAL,
+}
+
+# Claves de calendario derivadas de order_date_dateorders (no están en el diccionario)
+COLUMNAS_DERIVADAS = {
+    "order_year": ENTERO_PEQ,
+    "order_month": FECHA,  # primer día del mes
+    "order_week": FECHA,  # lunes de la semana
+}
+
+# Tipo en la caché Parquet de cada tipo de columna. Se fija de antemano para que todos los
+# bloques tengan el mismo esquema; un entero con nulos se lee en pandas como decimal.
+TIPOS_PARQUET = {
+    TEXTO: pa.large_string(),
+    CATEGORIA: pa.dictionary(pa.int32(), pa.string()),
+    FECHA: pa.timestamp("us"),
+    ENTERO: pa.int32(),
+    ENTERO_PEQ: pa.int16(),
+    DECIMAL: pa.float64(),
+}
+
+# Dataset completo compartido por los informes que se ejecutan en el mismo proceso
+_EN_MEMORIA = None
+
+
+def leer_diccionario():
+    """Devuelve el diccionario de datos (FIELDS, DESCRIPTION) sin espacios sobrantes."""
+    dicc = pd.read_csv(RUTA_DICCIONARIO, encoding="utf-8")
+    dicc["FIELDS"] = dicc["FIELDS"].str.strip()
+    dicc["DESCRIPTION"] = dicc["DESCRIPTION"].str.strip()
+    return dicc
+
+
+def tipos_columnas():
+    """Tipos de las columnas del diccionario. Falla si algún campo no tiene tipo asignado."""
+    campos = leer_diccionario()["FIELDS"].tolist()
+    sin_tipo = [c for c in campos if c not in TIPOS]
+    if sin_tipo:
+        raise ValueError(f"Columnas del diccionario sin tipo definido en comun/datos.py: {sin_tipo}")
+    return {c: TIPOS[c] for c in campos}
+
+
+def huella_csv():
+    """Versión de la caché más el tamaño y la fecha de modificación del CSV."""
+    st = os.stat(RUTA_CSV)
+    return {"version": VERSION_CACHE, "csv_bytes": st.st_size, "csv_mtime_ns": st.st_mtime_ns}
+
+
+def cache_vigente():
+    """True si la caché existe y corresponde al CSV actual (o si no hay CSV del que reconstruirla)."""
+    if not os.path.isdir(DIR_PARTICIONES) or not os.path.exists(RUTA_HUELLA):
+        return False
+    if not os.path.exists(RUTA_CSV):
+        return True
+    with open(RUTA_HUELLA, encoding="utf-8") as f:
+        return json.load(f) == huella_csv()
+
+
+def _leer_csv(ruta, tipos, codificacion):
+    return pd.read_csv(ruta, sep=",", encoding=codificacion, dtype=_tipos_lectura(tipos),
+                       chunksize=FILAS_BLOQUE)
+
+
+def _tipos_lectura(tipos):
+    # Los enteros se leen como decimales: si hay nulos no se pueden representar como int.
+    # Las fechas se leen como texto y se convierten después con un formato explícito.
+    # Las categóricas se leen como texto: cada bloque tendría sus propias categorías y
+    # es Parquet quien las guarda como columnas de diccionario.
+    lectura = {ENTERO: DECIMAL, ENTERO_PEQ: DECIMAL, FECHA: TEXTO, CATEGORIA: TEXTO}
+    return {c: lectura.get(t, t) for c, t in tipos.items()}
+
+
+def formato_fechas(serie):
+    """Primer formato de FORMATOS_FECHA que interpreta todos los valores de una muestra de la serie."""
+    muestra = serie.dropna().head(MUESTRA_FECHAS)
+    for formato in FORMATOS_FECHA:
+        try:
+            pd.to_datetime(muestra, format=formato)
+            return formato
+        except ValueError:
+            continue
+    raise ValueError(f"Fechas con un formato no reconocido ({muestra.iloc[0]!r}); añádelo a FORMATOS_FECHA")
+
+
+def _entero_si_completo(serie, tipo):
+    return serie if serie.isna().any() else serie.astype(tipo)
+
+
+def _aplicar_tipos(df, tipos, formatos):
+    # `formatos` guarda el formato de fecha de cada columna detectado en el primer bloque
+    for col, tipo in tipos.items():
+        if tipo == FECHA and col in df.columns:
+            if col not in formatos:
+                formatos[col] = formato_fechas(df[col])
+            texto = df[col]
+            df[col] = pd.to_datetime(texto, format=formatos[col], errors="coerce")
+            # El formato sale de una muestra: las fechas con otro formato quedarían como NaT sin avisar
+            perdidas = df[col].isna() & texto.notna()
+            if perdidas.any():
+                warnings.warn(f"{int(perdidas.sum())} valores de '{col}' no encajan con el formato "
+                              f"{formatos[col]!r} (p. ej. {texto[perdidas].iloc[0]!r}) y quedan sin fecha",
+                              stacklevel=2)
+    return df
+
+
+def _añadir_claves_calendario(df):
+    fecha = df["order_date_dateorders"]
+    df["order_year"] = _entero_si_completo(fecha.dt.year, COLUMNAS_DERIVADAS["order_year"])
+    df["order_month"] = fecha.dt.to_period("M").dt.start_time
+    df["order_week"] = fecha.dt.to_period("W").dt.start_time
+    return df
+
+
+def esquema_cache(tipos):
+    """Esquema Arrow de la caché: las columnas de `tipos` seguidas de las claves de calendario."""
+    tipos = {**tipos, **COLUMNAS_DERIVADAS}
+    return pa.schema([(col, TIPOS_PARQUET[tipo]) for col, tipo in tipos.items()])
+
+
+def particion(mes):
+    """Carpeta relativa de la partición de un mes (Timestamp del primer día, o NaT)."""
+    if pd.isna(mes):
+        return SIN_FECHA
+    return os.path.join(f"anio={mes.year}", f"mes={mes.month:02d}")
+
+
+def _escribir_particiones(ruta_csv, directorio, parte, tipos, codificacion):
+    # Un ParquetWriter por partición abierto durante toda la conversión: cada bloque
+    # del CSV añade un grupo de filas a las particiones de sus meses
+    formatos, escritores = {}, {}
+    try:
+        for bloque in _leer_csv(ruta_csv, tipos, codificacion):
+            if not escritores:
+                # Solo las columnas del diccionario que trae el CSV
+                esquema = esquema_cache({c: t for c, t in tipos.items() if c in bloque.columns})
+            bloque = _añadir_claves_calendario(_aplicar_tipos(bloque, tipos, formatos))
+            for mes, filas in bloque.groupby("order_month", dropna=False, sort=False):
+                carpeta = particion(mes)
+                if carpeta not in escritores:
+                    os.makedirs(os.path.join(directorio, carpeta), exist_ok=True)
+                    ruta = os.path.join(directorio, carpeta, parte + ".parquet")
+                    escritores[carpeta] = pq.ParquetWriter(ruta, esquema)
+                tabla = pa.Table.from_pandas(filas[esquema.names], preserve_index=False)
+                escritores[carpeta].write_table(tabla.cast(esquema), row_group_size=FILAS_BLOQUE)
+    finally:
+        for escritor in escritores.values():
+            escritor.close()
+    return sorted(escritores)
+
+
+def _convertir_csv(ruta_csv, parte, tipos):
+    # Se escribe en una carpeta temporal y al final se mueven los ficheros a su partición
+    tmp = os.path.join(DIR_CACHE, f"{parte}.tmp")
+    for codificacion in CODIFICACIONES:
+        shutil.rmtree(tmp, ignore_errors=True)
+        try:
+            carpetas = _escribir_particiones(ruta_csv, tmp, parte, tipos, codificacion)
+            break
+        except UnicodeDecodeError:
+            continue
+    else:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise ValueError(f"No se pudo leer {ruta_csv} con ninguna de las codificaciones {CODIFICACIONES}")
+    for carpeta in carpetas:
+        os.makedirs(os.path.join(DIR_PARTICIONES, carpeta), exist_ok=True)
+        fichero = os.path.join(carpeta, parte + ".parquet")
+        os.replace(os.path.join(tmp, fichero), os.path.join(DIR_PARTICIONES, fichero))
+    shutil.rmtree(tmp)
+    return carpetas
+
+
+def construir_cache(forzar=False):
+    """Convierte el CSV a Parquet particionado por mes, con los tipos del diccionario, si la caché no está al día."""
+    if not forzar and cache_vigente():
+        return DIR_PARTICIONES
+    if not os.path.exists(RUTA_CSV):
+        raise FileNotFoundError(RUTA_CSV)
+
+    # Los anexos eran ampliaciones de la caché anterior: el CSV nuevo ya es el histórico completo
+    shutil.rmtree(DIR_PARTICIONES, ignore_errors=True)
+    if os.path.exists(RUTA_MANIFIESTO):
+        os.remove(RUTA_MANIFIESTO)
+    os.makedirs(DIR_CACHE, exist_ok=True)
+    _convertir_csv(RUTA_CSV, PARTE_BASE, tipos_columnas())
+    with open(RUTA_HUELLA, "w", encoding="utf-8") as f:
+        json.dump(huella_csv(), f)
+    return DIR_PARTICIONES
+
+
+def leer_manifiesto():
+    """Anexos añadidos a la caché, en orden: nombre, tamaño y fecha del CSV, filas, parte y particiones."""
+    if not os.path.exists(RUTA_MANIFIESTO):
+        return []
+    with open(RUTA_MANIFIESTO, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _mes_particion(carpeta):
+    anio, mes = (int(p.split("=")[1]) for p in carpeta.split(os.sep))
+    return pd.Timestamp(anio, mes, 1)
+
+
+def particiones(desde=None, hasta=None):
+    """
+    Carpetas de partición (relativas a DIR_PARTICIONES) con pedidos entre `desde`
+    (incluido) y `hasta` (excluido). Sin límites se incluye también la de filas sin fecha.
+    """
+    carpetas = []
+    for anio in sorted(os.listdir(DIR_PARTICIONES)):
+        if anio == SIN_FECHA:
+            continue
+        carpetas += [os.path.join(anio, mes) for mes in sorted(os.listdir(os.path.join(DIR_PARTICIONES, anio)))]
+    if desde is not None:
+        # El mes de `desde` cuenta aunque empiece a mitad de mes
+        inicio = pd.Timestamp(desde).to_period("M").start_time
+        carpetas = [c for c in carpetas if _mes_particion(c) >= inicio]
+    if hasta is not None:
+        carpetas = [c for c in carpetas if _mes_particion(c) < pd.Timestamp(hasta)]
+    if desde is None and hasta is None and os.path.isdir(os.path.join(DIR_PARTICIONES, SIN_FECHA)):
+        carpetas.append(SIN_FECHA)
+    return carpetas
+
+
+def partes_cache(desde=None, hasta=None, parte=None):
+    """Ficheros Parquet del dataset (de las particiones entre `desde` y `hasta`, o de una sola `parte`)."""
+    ficheros = []
+    for carpeta in particiones(desde, hasta):
+        ruta = os.path.join(DIR_PARTICIONES, carpeta)
+        ficheros += [os.path.join(ruta, f) for f in sorted(os.listdir(ruta))
+                     if f.endswith(".parquet") and (parte is None or f == parte + ".parquet")]
+    return ficheros
+
+
+def huella_datos():
+    """Huella del CSV más la lista de anexos; sirve para invalidar los agregados derivados."""
+    return {**huella_csv(), "anexos": [a["parte"] for a in leer_manifiesto()]}
+
+
+def _esquema_guardado():
+    return pq.read_schema(partes_cache(parte=PARTE_BASE)[0])
+
+
+def anexar_csv(ruta_csv):
+    """
+    Añade las filas de `ruta_csv` (mismas columnas que el CSV principal) como una
+    parte nueva de la caché. Devuelve el nombre de la parte, o None si ese fichero
+    (mismo nombre, tamaño y fecha) ya se había anexado.
+    """
+    construir_cache()
+    st = os.stat(ruta_csv)
+    anexo = {"nombre": os.path.basename(ruta_csv), "csv_bytes": st.st_size, "csv_mtime_ns": st.st_mtime_ns}
+    manifiesto = leer_manifiesto()
+    if any({k: a[k] for k in anexo} == anexo for a in manifiesto):
+        return None
+
+    tipos = tipos_columnas()
+    cabecera = pd.read_csv(ruta_csv, nrows=0, encoding="latin1").columns
+    distintas = set(cabecera) ^ (set(_esquema_guardado().names) - set(COLUMNAS_DERIVADAS))
+    if distintas:
+        raise ValueError(f"{ruta_csv} no tiene las mismas columnas que el CSV principal: {sorted(distintas)}")
+
+    anexo["parte"] = f"parte_{len(manifiesto) + 1:04d}"
+    anexo["particiones"] = _convertir_csv(ruta_csv, anexo["parte"], tipos)
+    anexo["filas"] = sum(pq.read_metadata(f).num_rows for f in partes_cache(parte=anexo["parte"]))
+
+    tmp = RUTA_MANIFIESTO + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifiesto + [anexo], f, indent=1)
+    os.replace(tmp, RUTA_MANIFIESTO)
+    return anexo["parte"]
+
+
+def validar_columnas(columnas):
+    """
+    Comprueba que las columnas pedidas existen en el diccionario (o son claves de
+    calendario derivadas) y en la caché. Lanza KeyError si no.
+    """
+    columnas = list(columnas)
+    tipos = {**tipos_columnas(), **COLUMNAS_DERIVADAS}
+    desconocidas = [c for c in columnas if c not in tipos]
+    if desconocidas:
+        raise KeyError(f"Columnas que no están en el diccionario de datos: {desconocidas}")
+    construir_cache()
+    disponibles = set(_esquema_guardado().names)
+    ausentes = [c for c in columnas if c not in disponibles]
+    if ausentes:
+        raise KeyError(f"Columnas del diccionario que no están en el CSV: {ausentes}")
+    return columnas
+
+
+def _filtrar_fechas(df, desde, hasta):
+    fecha = df["order_date_dateorders"]
+    dentro = fecha.notna()
+    if desde is not None:
+        dentro &= fecha >= pd.Timestamp(desde)
+    if hasta is not None:
+        dentro &= fecha < pd.Timestamp(hasta)
+    return df[dentro]
+
+
+def cargar_datos(columnas=None, desde=None, hasta=None):
+    """
+    DataFrame del dataset, leído de la caché Parquet (se reconstruye si el CSV cambió).
+
+    Si se indican `columnas`, solo se leen esas columnas del disco, en ese orden.
+    Con `desde` (incluido) y/o `hasta` (excluido) solo se leen las particiones de
+    esos meses y se devuelven los pedidos con order_date_dateorders en el rango.
+    """
+    por_fecha = desde is not None or hasta is not None
+    if columnas is not None:
+        columnas = validar_columnas(columnas)
+    # La fecha hace falta para el filtro exacto aunque no se haya pedido
+    lectura = columnas
+    if por_fecha and columnas is not None and "order_date_dateorders" not in columnas:
+        lectura = columnas + ["order_date_dateorders"]
+
+    if _EN_MEMORIA is not None:
+        df = _EN_MEMORIA if lectura is None else _EN_MEMORIA[lectura]
+        if por_fecha:
+            df = _filtrar_fechas(df, desde, hasta)
+        return (df if columnas is None else df[columnas]).copy()
+
+    construir_cache()
+    ficheros = partes_cache(desde, hasta)
+    if not ficheros:
+        # Ningún mes en el rango: DataFrame vacío con los tipos de la caché
+        df = _esquema_guardado().empty_table().to_pandas()
+        return df if columnas is None else df[columnas]
+    df = pd.read_parquet(ficheros, columns=lectura)
+    if por_fecha:
+        df = _filtrar_fechas(df, desde, hasta).reset_index(drop=True)
+        if columnas is not None:
+            df = df[columnas]
+    return df
+
+
+def cargar_parte(parte, columnas=None):
+    """Filas de una sola parte de la caché (p. ej. el anexo recién añadido)."""
+    columnas = None if columnas is None else validar_columnas(columnas)
+    return pd.read_parquet(partes_cache(parte=parte), columns=columnas)
+
+
+def precargar_datos():
+    """Carga el dataset completo en memoria para que lo compartan las siguientes llamadas a cargar_datos()."""
+    global _EN_MEMORIA
+    _EN_MEMORIA = None
+    _EN_MEMORIA = cargar_datos()
+    return _EN_MEMORIA
+
+
+def hay_datos_precargados():
+    """True si precargar_datos() dejó el dataset en memoria en este proceso."""
+    return _EN_MEMORIA is not None
+
+
+def liberar_datos():
+    """Descarta el dataset precargado; cargar_datos() vuelve a leer de la caché."""
+    global _EN_MEMORIA
+    _EN_MEMORIA = None
+
+
+if __name__ == "__main__":
+    print(f"Caché generada en: {construir_cache(forzar=True)}")
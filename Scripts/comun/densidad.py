@@ -0,0 +1,163 @@
+"""
+Densidad (KDE gaussiana) sobre una rejilla fija, por convolución con FFT.
+
+En vez de evaluar el núcleo de cada punto en cada punto de la rejilla (lo que
+hace seaborn.kdeplot, con coste filas x rejilla), los puntos se cuentan en las
+celdas de la rejilla (np.histogram2d, con pesos si se indican) y la rejilla se
+convoluciona una sola vez con el núcleo gaussiano (scipy.signal.fftconvolve).
+El coste depende del tamaño de la rejilla, no del número de puntos:
+
+    from comun.densidad import densidad_rejilla, niveles_masa
+    d = densidad_rejilla(df["longitude_dest"], df["latitude_dest"])
+    ax.contourf(d.x, d.y, d.valores, levels=niveles_masa(d), cmap="Reds")
+
+Con `pesos` la densidad es de la suma de pesos (p. ej. beneficio perdido) en
+vez del número de puntos. densidad_guardada() guarda la rejilla en DATA/cache
+(un .npz por nombre y resolución) y solo vuelve a los datos si cambian.
+"""
+import json
+import os
+from dataclasses import dataclass
+
+import numpy as np
+from scipy import signal
+
+from . import datos
+
+# Celdas de la rejilla (x, y)
+CELDAS = (720, 360)
+# Desviaciones típicas del núcleo que se incluyen en la convolución
+RADIO_NUCLEO = 4
+
+
+@dataclass
+class Densidad:
+    # Matriz (celdas_y, celdas_x): fila = y, columna = x
+    valores: np.ndarray
+    # Bordes de las celdas
+    bordes_x: np.ndarray
+    bordes_y: np.ndarray
+    # Ancho de banda usado (x, y), en unidades de los datos
+    ancho_banda: tuple
+
+    @property
+    def x(self):
+        """Centros de las celdas en x."""
+        return (self.bordes_x[:-1] + self.bordes_x[1:]) / 2
+
+    @property
+    def y(self):
+        """Centros de las celdas en y."""
+        return (self.bordes_y[:-1] + self.bordes_y[1:]) / 2
+
+    @property
+    def extension(self):
+        """(x0, x1, y0, y1), para imshow(extent=...)."""
+        return self.bordes_x[0], self.bordes_x[-1], self.bordes_y[0], self.bordes_y[-1]
+
+
+def ancho_scott(x, y, pesos=None):
+    """Regla de Scott en 2-D (la de scipy y seaborn por defecto): desviación típica · n^(-1/6)."""
+    if pesos is None:
+        n, sx, sy = len(x), np.std(x, ddof=1), np.std(y, ddof=1)
+    else:
+        # Tamaño efectivo de muestra con pesos, como gaussian_kde
+        w = pesos / pesos.sum()
+        n = 1 / (w ** 2).sum()
+        sx = np.sqrt(np.cov(x, aweights=pesos))
+        sy = np.sqrt(np.cov(y, aweights=pesos))
+    factor = n ** (-1 / 6)
+    return sx * factor, sy * factor
+
+
+def densidad_rejilla(x, y, pesos=None, celdas=CELDAS, rango=None, ancho_banda=None, ajuste=1.0,
+                     normalizar=True):
+    """
+    Densidad de los puntos (x, y) en una rejilla de `celdas` (nx, ny).
+
+    `ancho_banda` es (hx, hy) o un solo valor en unidades de los datos; por
+    defecto, la regla de Scott multiplicada por `ajuste` (como bw_adjust de
+    seaborn). `rango` es [[x0, x1], [y0, y1]]; por defecto el de los datos más
+    tres anchos de banda. Con normalizar=True la densidad integra 1; si no, se
+    expresa en (puntos o suma de pesos) por unidad de área.
+    """
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    validos = ~(np.isnan(x) | np.isnan(y))
+    if pesos is not None:
+        pesos = np.asarray(pesos, dtype="float64")
+        validos &= ~np.isnan(pesos)
+        pesos = pesos[validos]
+    x, y = x[validos], y[validos]
+    if len(x) < 2:
+        raise ValueError(f"Hacen falta al menos 2 puntos para la densidad (hay {len(x)})")
+
+    if ancho_banda is None:
+        hx, hy = (h * ajuste for h in ancho_scott(x, y, pesos))
+    else:
+        hx, hy = (ancho_banda, ancho_banda) if np.isscalar(ancho_banda) else ancho_banda
+    if rango is None:
+        rango = [[x.min() - 3 * hx, x.max() + 3 * hx], [y.min() - 3 * hy, y.max() + 3 * hy]]
+
+    conteos, bordes_x, bordes_y = np.histogram2d(x, y, bins=celdas, range=rango, weights=pesos)
+    dx, dy = bordes_x[1] - bordes_x[0], bordes_y[1] - bordes_y[0]
+
+    # Núcleo gaussiano muestreado en la rejilla (en celdas), normalizado a suma 1
+    sx, sy = max(hx / dx, 1e-6), max(hy / dy, 1e-6)
+    ix = np.arange(-int(np.ceil(RADIO_NUCLEO * sx)), int(np.ceil(RADIO_NUCLEO * sx)) + 1)
+    iy = np.arange(-int(np.ceil(RADIO_NUCLEO * sy)), int(np.ceil(RADIO_NUCLEO * sy)) + 1)
+    nucleo = np.outer(np.exp(-0.5 * (ix / sx) ** 2), np.exp(-0.5 * (iy / sy) ** 2))
+    nucleo /= nucleo.sum()
+
+    suavizado = np.clip(signal.fftconvolve(conteos, nucleo, mode="same"), 0, None)
+    total = conteos.sum() if normalizar else 1.0
+    # histogram2d devuelve [x, y]: se transpone para que las filas sean y
+    return Densidad((suavizado / (total * dx * dy)).T, bordes_x, bordes_y, (hx, hy))
+
+
+def niveles_masa(densidad, umbral=0.05, niveles=10):
+    """
+    Niveles de contorno de igual proporción de masa, como kdeplot(thresh=..., levels=...):
+    por debajo del primero queda la fracción `umbral` de la masa.
+    """
+    valores = np.sort(densidad.valores.ravel())
+    acumulada = np.cumsum(valores)
+    acumulada /= acumulada[-1]
+    proporciones = np.linspace(umbral, 1, niveles)
+    limites = valores[np.minimum(np.searchsorted(acumulada, proporciones), len(valores) - 1)]
+    return np.unique(limites)
+
+
+def _ruta(nombre, celdas):
+    return os.path.join(datos.DIR_CACHE, f"densidad_{nombre}_{celdas[0]}x{celdas[1]}.npz")
+
+
+def densidad_guardada(nombre, puntos, celdas=CELDAS, **parametros):
+    """
+    Densidad guardada en DATA/cache para `nombre` y la resolución `celdas`.
+
+    `puntos` es una función sin argumentos que devuelve (x, y, pesos) y solo se
+    llama si no hay rejilla guardada para los datos actuales y esos parámetros
+    (los de densidad_rejilla()).
+    """
+    ruta = _ruta(nombre, celdas)
+    clave = json.dumps({k: repr(v) for k, v in parametros.items()}, sort_keys=True)
+    if os.path.exists(ruta):
+        guardada = np.load(ruta)
+        # Sin el CSV original se da por buena la rejilla guardada, como el resto de la caché
+        vigente = (not os.path.exists(datos.RUTA_CSV)
+                   or json.loads(str(guardada["huella"])) == datos.huella_datos())
+        if vigente and str(guardada["clave"]) == clave:
+            return Densidad(guardada["valores"], guardada["bordes_x"], guardada["bordes_y"],
+                            tuple(guardada["ancho_banda"]))
+
+    x, y, pesos = puntos()
+    densidad = densidad_rejilla(x, y, pesos, celdas=celdas, **parametros)
+    huella = datos.huella_datos() if os.path.exists(datos.RUTA_CSV) else {}
+    os.makedirs(datos.DIR_CACHE, exist_ok=True)
+    tmp = ruta + ".tmp.npz"
+    np.savez_compressed(tmp, valores=densidad.valores, bordes_x=densidad.bordes_x,
+                        bordes_y=densidad.bordes_y, ancho_banda=np.array(densidad.ancho_banda),
+                        huella=np.array(json.dumps(huella)), clave=np.array(clave))
+    os.replace(tmp, ruta)
+    return densidad
@@ -0,0 +1,239 @@
+"""
+Estadísticos descriptivos por grupo en una pasada, combinables entre bloques.
+
+resumir() hace un solo groupby con las sumas de x, x², x³ y x⁴ (más conteo,
+mínimo y máximo) y de ellas saca, por grupo, el estado parcial:
+    - momentos: n, media y sumas de potencias centradas (M2, M3, M4), mínimo y máximo
+    - cuantiles: con el DataFrame en memoria se guardan los valores y los
+      cuantiles son exactos; por bloques (resumir_por_bloques) se guarda un
+      boceto de conteos por cubeta logarítmica (tipo DDSketch), con error
+      relativo PRECISION_CUANTILES en cualquier percentil
+
+Dos resúmenes de bloques (o procesos) distintos se combinan con
+combinar_resumenes() sin volver a los datos, y describir() da el equivalente
+a describe() + skew() + kurt() de pandas:
+
+    from comun.descriptivos import describir, resumir
+    tabla = describir(resumir(df, "sales", "category_name"))
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from . import bloques
+
+# Error relativo máximo de los cuantiles del boceto (0.01 = 1 %)
+PRECISION_CUANTILES = 0.01
+GAMMA = (1 + PRECISION_CUANTILES) / (1 - PRECISION_CUANTILES)
+# Valores más pequeños (en valor absoluto) van a la cubeta del cero
+MINIMO_INDEXABLE = 1e-9
+
+PERCENTILES = (0.25, 0.5, 0.75)
+
+
+@dataclass
+class Resumen:
+    # Índice: grupos. Columnas: n, media, m2, m3, m4, min, max
+    momentos: pd.DataFrame
+    # Índice: grupos + signo (-1, 0, 1) + cubeta. Columna: cuenta (None si se guardan los valores)
+    boceto: pd.DataFrame = None
+    # Valores no nulos indexados por sus grupos, para los cuantiles exactos (None si hay boceto)
+    valores: pd.Series = None
+
+
+def _claves(df, valor, grupos):
+    if grupos is None:
+        # Un solo grupo con el nombre de la variable
+        return [pd.Series(valor, index=df.index, name=None)]
+    return [df[g] for g in ([grupos] if isinstance(grupos, str) else grupos)]
+
+
+def _momentos(x, claves):
+    # Sumas de potencias de una vez; se desplazan por la media global para no perder precisión
+    centro = x.mean() if len(x) else 0.0
+    d = x - centro
+    d2 = d * d
+    sumas = pd.DataFrame({"s1": d, "s2": d2, "s3": d2 * d, "s4": d2 * d2, "min": x, "max": x}).groupby(
+        claves, observed=True).agg({"s1": ["count", "sum"], "s2": "sum", "s3": "sum", "s4": "sum",
+                                    "min": "min", "max": "max"})
+    sumas.columns = ["n", "s1", "s2", "s3", "s4", "min", "max"]
+    n = sumas["n"]
+    # Momentos centrados a partir de las sumas de potencias (respecto a la media del grupo)
+    mu = sumas["s1"] / n
+    m2 = sumas["s2"] - n * mu ** 2
+    m3 = sumas["s3"] - 3 * mu * sumas["s2"] + 2 * n * mu ** 3
+    m4 = sumas["s4"] - 4 * mu * sumas["s3"] + 6 * mu ** 2 * sumas["s2"] - 3 * n * mu ** 4
+    return pd.DataFrame({"n": n.astype("int64"), "media": mu + centro, "m2": m2.clip(lower=0), "m3": m3,
+                         "m4": m4.clip(lower=0), "min": sumas["min"], "max": sumas["max"]})
+
+
+def _boceto(x, claves):
+    signo = np.sign(x.to_numpy()).astype("int8")
+    absoluto = np.abs(x.to_numpy())
+    signo[absoluto < MINIMO_INDEXABLE] = 0
+    with np.errstate(divide="ignore"):
+        cubeta = np.ceil(np.log(absoluto) / np.log(GAMMA))
+    cubeta = np.where(signo == 0, 0, cubeta).astype("int32")
+    nombres = [c.name for c in claves]
+    boceto = (pd.DataFrame({"signo": signo, "cubeta": cubeta}, index=x.index)
+              .groupby(claves + ["signo", "cubeta"], observed=True).size().to_frame("cuenta"))
+    boceto.index = boceto.index.set_names(nombres + ["signo", "cubeta"])
+    return boceto
+
+
+def _valores_boceto(valores):
+    # Boceto de unos valores guardados (índice = grupos)
+    x = valores.reset_index(drop=True)
+    claves = [pd.Series(valores.index.get_level_values(i), name=nombre)
+              for i, nombre in enumerate(valores.index.names)]
+    return _boceto(x, claves)
+
+
+def resumir(df, valor, grupos=None, exactos=True):
+    """
+    Resumen de `valor` por `grupos` (o de toda la columna si no hay grupos). Los nulos no cuentan.
+
+    Con exactos=True se guardan los valores para que los cuantiles sean exactos;
+    con False, solo el boceto (lo que usa resumir_por_bloques()).
+    """
+    claves = _claves(df, valor, grupos)
+    x = df[valor].astype("float64")
+    validos = x.notna()
+    x, claves = x[validos], [c[validos] for c in claves]
+    momentos = _momentos(x, claves)
+    if not exactos:
+        return Resumen(momentos, boceto=_boceto(x, claves))
+    indice = pd.MultiIndex.from_arrays(claves) if len(claves) > 1 else pd.Index(claves[0])
+    return Resumen(momentos, valores=pd.Series(x.to_numpy(), index=indice, name=valor))
+
+
+def combinar_resumenes(a, b):
+    """Resumen conjunto de dos resúmenes (mismos grupos o no). `a` puede ser None."""
+    if a is None:
+        return b
+    indice = a.momentos.index.union(b.momentos.index)
+    vacio = {"n": 0, "media": 0.0, "m2": 0.0, "m3": 0.0, "m4": 0.0, "min": np.inf, "max": -np.inf}
+    ma = a.momentos.reindex(indice).fillna(vacio)
+    mb = b.momentos.reindex(indice).fillna(vacio)
+
+    # Combinación de momentos centrados (Chan / Pébay)
+    na, nb = ma["n"], mb["n"]
+    n = na + nb
+    delta = mb["media"] - ma["media"]
+    m2 = ma["m2"] + mb["m2"] + delta ** 2 * na * nb / n
+    m3 = (ma["m3"] + mb["m3"] + delta ** 3 * na * nb * (na - nb) / n ** 2
+          + 3 * delta * (na * mb["m2"] - nb * ma["m2"]) / n)
+    m4 = (ma["m4"] + mb["m4"] + delta ** 4 * na * nb * (na ** 2 - na * nb + nb ** 2) / n ** 3
+          + 6 * delta ** 2 * (na ** 2 * mb["m2"] + nb ** 2 * ma["m2"]) / n ** 2
+          + 4 * delta * (na * mb["m3"] - nb * ma["m3"]) / n)
+    momentos = pd.DataFrame({
+        "n": n.astype("int64"), "media": ma["media"] + delta * nb / n,
+        "m2": m2, "m3": m3, "m4": m4,
+        "min": np.minimum(ma["min"], mb["min"]), "max": np.maximum(ma["max"], mb["max"]),
+    })
+
+    if a.valores is not None and b.valores is not None:
+        return Resumen(momentos, valores=pd.concat([a.valores, b.valores]))
+    bocetos = [r.boceto if r.boceto is not None else _valores_boceto(r.valores) for r in (a, b)]
+    unidos = pd.concat(bocetos)
+    boceto = unidos.groupby(level=list(unidos.index.names), observed=True).sum()
+    return Resumen(momentos, boceto=boceto)
+
+
+def resumir_por_bloques(valor, grupos=None, preparar=None, columnas=None, filas=None):
+    """
+    Resumen recorriendo el dataset por bloques (comun/bloques.py).
+
+    `preparar` recibe cada bloque y devuelve el bloque filtrado o con columnas
+    calculadas; `columnas` son las del dataset que necesita (por defecto grupos y valor).
+    """
+    lista = [] if grupos is None else ([grupos] if isinstance(grupos, str) else list(grupos))
+    acumulado = None
+    for bloque in bloques.leer_bloques(columnas or lista + [valor], filas):
+        if preparar is not None:
+            bloque = preparar(bloque)
+        acumulado = combinar_resumenes(acumulado, resumir(bloque, valor, grupos, exactos=False))
+    return acumulado
+
+
+def resumen_total(resumen, nombre):
+    """Resumen de todos los grupos juntos, como un solo grupo llamado `nombre`."""
+    m = resumen.momentos
+    n = m["n"].sum()
+    media = (m["n"] * m["media"]).sum() / n
+    # Momentos de cada grupo respecto a la media total
+    d = m["media"] - media
+    momentos = pd.DataFrame({
+        "n": [n], "media": [media],
+        "m2": [(m["m2"] + m["n"] * d ** 2).sum()],
+        "m3": [(m["m3"] + 3 * d * m["m2"] + m["n"] * d ** 3).sum()],
+        "m4": [(m["m4"] + 4 * d * m["m3"] + 6 * d ** 2 * m["m2"] + m["n"] * d ** 4).sum()],
+        "min": [m["min"].min()], "max": [m["max"].max()],
+    }, index=pd.Index([nombre]))
+    if resumen.valores is not None:
+        valores = pd.Series(resumen.valores.to_numpy(), index=pd.Index([nombre] * len(resumen.valores)))
+        return Resumen(momentos, valores=valores)
+    boceto = resumen.boceto.groupby(level=["signo", "cubeta"]).sum()
+    boceto.index = pd.MultiIndex.from_tuples([(nombre, *k) for k in boceto.index], names=[None, "signo", "cubeta"])
+    return Resumen(momentos, boceto=boceto)
+
+
+def _valor_cubeta(signo, cubeta):
+    return signo * 2 * GAMMA ** cubeta.astype("float64") / (GAMMA + 1)
+
+
+def cuantiles(resumen, qs=PERCENTILES):
+    """
+    Cuantiles por grupo; columnas = qs. Exactos (como quantile() de pandas) si el
+    resumen guarda los valores; si no, del boceto (error relativo PRECISION_CUANTILES).
+    """
+    if resumen.valores is not None:
+        valores = resumen.valores
+        tabla = valores.groupby(level=list(range(valores.index.nlevels)), observed=True).quantile(list(qs))
+        return tabla.unstack().reindex(resumen.momentos.index)
+    boceto = resumen.boceto["cuenta"]
+    niveles = list(boceto.index.names[:-2])
+    posiciones = 0 if len(niveles) == 1 else list(range(len(niveles)))
+    claves, filas = [], []
+    for grupo, cuentas in boceto.groupby(level=posiciones, observed=True):
+        signo = cuentas.index.get_level_values("signo").to_numpy()
+        cubeta = cuentas.index.get_level_values("cubeta").to_numpy()
+        # Orden de menor a mayor valor: negativos (cubeta más alta primero), cero, positivos
+        orden = np.lexsort((signo * cubeta, signo))
+        acumuladas = np.cumsum(cuentas.to_numpy()[orden])
+        valores = _valor_cubeta(signo[orden], cubeta[orden])
+        rangos = np.asarray(qs) * (acumuladas[-1] - 1)
+        claves.append(grupo)
+        filas.append(valores[np.searchsorted(acumuladas, rangos, side="right")])
+    if len(niveles) == 1:
+        indice = pd.Index(claves, name=niveles[0])
+    else:
+        indice = pd.MultiIndex.from_tuples(claves, names=niveles)
+    tabla = pd.DataFrame(filas, index=indice, columns=list(qs)).reindex(resumen.momentos.index)
+    # Los extremos no pueden salir del rango observado
+    return tabla.clip(lower=resumen.momentos["min"], upper=resumen.momentos["max"], axis=0)
+
+
+def describir(resumen, percentiles=PERCENTILES):
+    """
+    Tabla por grupo como describe() (count, mean, std, min, percentiles, max)
+    más sum, skewness y kurtosis con las mismas fórmulas que pandas.
+    """
+    m = resumen.momentos
+    n = m["n"].astype("float64")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        var = m["m2"] / (n - 1)
+        g1 = np.sqrt(n) * m["m3"] / m["m2"] ** 1.5
+        g2 = n * m["m4"] / m["m2"] ** 2 - 3
+        skew = (np.sqrt(n * (n - 1)) / (n - 2) * g1).where(n > 2)
+        kurt = (((n + 1) * g2 + 6) * (n - 1) / ((n - 2) * (n - 3))).where(n > 3)
+    tabla = pd.DataFrame({"count": n, "mean": m["media"], "std": np.sqrt(var).where(n > 1), "min": m["min"]})
+    q = cuantiles(resumen, percentiles)
+    for p in percentiles:
+        tabla[f"{p * 100:g}%"] = q[p]
+    tabla["max"] = m["max"]
+    tabla["sum"] = m["media"] * n
+    tabla["skewness"] = skew
+    tabla["kurtosis"] = kurt
+    return tabla
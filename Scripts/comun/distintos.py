@@ -0,0 +1,256 @@
+"""
+Conteo aproximado de valores distintos (HyperLogLog) combinable entre bloques y meses.
+
+nunique() no se puede sumar: un cliente que compra en dos meses cuenta una vez
+en el total pero una vez en cada mes. Un boceto HyperLogLog guarda por grupo
+2^precision registros con el máximo de "ceros iniciales" de los hashes vistos;
+el de la unión de dos conjuntos es el máximo registro a registro, así que los
+bocetos de bloques, particiones o meses distintos se combinan sin volver a las
+filas. El error relativo típico es 1.04 / sqrt(2^precision):
+
+    from comun.distintos import boceto_distintos, contar_distintos
+    b = boceto_distintos(df, "customer_id", ["customer_country", "customer_segment"])
+    clientes = contar_distintos(b)
+
+Los bocetos se guardan dispersos (solo los registros no vacíos), como tabla
+indexada por grupos + registro con la columna rango. En BOCETOS están los que
+se guardan en DATA/cache por mes, que se actualizan al anexar datos nuevos
+(comun/anexos.py) y se pueden agregar sobre cualquier rango de meses:
+
+    clientes = contar_distintos(cargar_boceto("clientes", desde="2017-09-01"),
+                                ["customer_country", "customer_segment"])
+
+Cuando el conteo va a un contraste, distintos_exactos() da el exacto por bloques.
+"""
+import json
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from . import bloques, datos
+
+# Error relativo típico buscado (0.01 = 1 %) y la precisión que lo da
+ERROR_DISTINTOS = 0.01
+
+
+def precision_para_error(error):
+    """Número de bits de registro (4..18) para un error relativo típico `error`."""
+    return min(max(math.ceil(2 * math.log2(1.04 / error)), 4), 18)
+
+
+PRECISION_DISTINTOS = precision_para_error(ERROR_DISTINTOS)
+
+# Se incrementa cuando cambia la definición de algún boceto guardado
+VERSION_BOCETOS = 1
+
+# Bocetos guardados: nombre -> (columna que se cuenta, dimensiones)
+BOCETOS = {
+    # Clientes distintos por mes, país y segmento
+    "clientes": ("customer_id", ["order_month", "customer_country", "customer_segment"]),
+}
+
+
+def _lista(grupos):
+    if grupos is None:
+        return []
+    return [grupos] if isinstance(grupos, str) else list(grupos)
+
+
+def boceto_distintos(df, columna, grupos=None, precision=PRECISION_DISTINTOS):
+    """Boceto HyperLogLog de `columna` por `grupos` (o de toda la columna). Los nulos no cuentan."""
+    grupos = _lista(grupos)
+    validos = df[columna].notna()
+    df = df[validos]
+    h = pd.util.hash_pandas_object(df[columna], index=False).to_numpy()
+
+    registro = (h >> np.uint64(64 - precision)).astype("int32")
+    resto = h << np.uint64(precision)
+    # Ceros iniciales de los 64 - precision bits restantes (con los 53 de más peso,
+    # que se pasan a float sin perder nada): rango = ceros + 1
+    alto = (resto >> np.uint64(11)).astype("float64")
+    bits = np.frexp(alto)[1] + 11
+    rango = np.where(alto > 0, 64 - bits + 1, 64 - precision + 1).astype("int8")
+
+    tabla = pd.DataFrame({"registro": registro, "rango": rango}, index=df.index)
+    claves = [df[g] for g in grupos] + [tabla["registro"]]
+    boceto = tabla.groupby(claves, observed=True, dropna=False)[["rango"]].max()
+    boceto.index = boceto.index.set_names(grupos + ["registro"])
+    boceto.attrs["precision"] = precision
+    return boceto
+
+
+def combinar_distintos(*bocetos):
+    """Boceto de la unión: máximo registro a registro (los None se ignoran)."""
+    bocetos = [b for b in bocetos if b is not None]
+    precision = bocetos[0].attrs.get("precision", PRECISION_DISTINTOS)
+    unidos = pd.concat(bocetos)
+    combinado = unidos.groupby(level=list(unidos.index.names), observed=True).max()
+    combinado.attrs["precision"] = precision
+    return combinado
+
+
+def agrupar_distintos(boceto, grupos=None):
+    """Boceto por `grupos` (un subconjunto de sus niveles), uniendo los demás niveles."""
+    niveles = _lista(grupos) + ["registro"]
+    agrupado = boceto.groupby(level=niveles, observed=True).max()
+    agrupado.attrs["precision"] = boceto.attrs.get("precision", PRECISION_DISTINTOS)
+    return agrupado
+
+
+def _sigma(x):
+    # sigma(x) = x + sum_k x^(2^k) · 2^(k-1): corrección por los registros vacíos
+    x = np.asarray(x, dtype="float64")
+    z, potencia, peso = x.copy(), x.copy(), 1.0
+    for _ in range(64):
+        potencia = potencia * potencia
+        z += potencia * peso
+        peso += peso
+    return np.where(x == 1, np.inf, z)
+
+
+def _tau(x):
+    # tau(x) = (1 - x - sum_k (1 - x^(2^-k))² · 2^-k) / 3: corrección por los registros saturados
+    x = np.asarray(x, dtype="float64")
+    z, raiz, peso = 1 - x, x.copy(), 1.0
+    for _ in range(64):
+        raiz = np.sqrt(raiz)
+        peso *= 0.5
+        z -= (1 - raiz) ** 2 * peso
+    return np.where((x == 0) | (x == 1), 0.0, z / 3)
+
+
+def contar_distintos(boceto, grupos=None):
+    """
+    Número estimado de distintos por grupo (Series) o en total (float) si el
+    boceto no tiene grupos. `grupos` agrupa antes por esos niveles.
+
+    Se usa el estimador de Ertl (2017) sobre el histograma de rangos de cada
+    grupo, que no tiene sesgo en ningún tramo: el clásico (media armónica con
+    conteo lineal por debajo de 2.5·m registros) se desvía un 2-3 % cerca del cambio.
+    """
+    if grupos is not None:
+        boceto = agrupar_distintos(boceto, grupos)
+    precision = boceto.attrs.get("precision", PRECISION_DISTINTOS)
+    m = 2 ** precision
+    q = 64 - precision
+
+    niveles = list(boceto.index.names[:-1])
+    # Registros con cada rango (1..q+1) por grupo; los que faltan están vacíos (rango 0)
+    if niveles:
+        histograma = boceto.reset_index(niveles).groupby(niveles + ["rango"], observed=True).size().unstack(
+            "rango", fill_value=0)
+    else:
+        histograma = boceto["rango"].value_counts().to_frame().T
+    c = histograma.reindex(columns=range(q + 2), fill_value=0).to_numpy(dtype="float64", copy=True)
+    c[:, 0] = m - c[:, 1:].sum(axis=1)
+
+    z = m * _tau(1 - c[:, q + 1] / m)
+    for k in range(q, 0, -1):
+        z = 0.5 * (z + c[:, k])
+    z = z + m * _sigma(c[:, 0] / m)
+    estimacion = m * m / (2 * np.log(2) * z)
+    if niveles:
+        return pd.Series(estimacion, index=histograma.index, name="distintos")
+    return float(estimacion[0])
+
+
+def distintos_por_bloques(columna, grupos=None, precision=PRECISION_DISTINTOS, filas=None):
+    """Boceto recorriendo el dataset por bloques (comun/bloques.py)."""
+    grupos = _lista(grupos)
+    acumulado = None
+    for bloque in bloques.leer_bloques(grupos + [columna], filas):
+        acumulado = combinar_distintos(acumulado, boceto_distintos(bloque, columna, grupos, precision))
+    return acumulado
+
+
+def distintos_exactos(columna, grupos=None, filas=None):
+    """
+    Número exacto de distintos de `columna` por `grupos` (Series) o en total (int),
+    recorriendo el dataset por bloques.
+
+    Se guardan los pares (grupos, valor) sin repetir, así que la memoria depende
+    del número de distintos y no del de filas. Es para contrastes (chi², V de
+    Cramér) que no deben arrastrar el error del boceto; para rangos de meses, los
+    bocetos guardados.
+    """
+    grupos = _lista(grupos)
+    vistos = None
+    for bloque in bloques.leer_bloques(grupos + [columna], filas):
+        bloque = bloque[bloque[columna].notna()].drop_duplicates()
+        vistos = bloque if vistos is None else pd.concat([vistos, bloque], ignore_index=True).drop_duplicates()
+    if not grupos:
+        return 0 if vistos is None else len(vistos)
+    if vistos is None:
+        return pd.Series(dtype="int64", name="distintos")
+    return vistos.groupby(grupos, observed=True, dropna=False).size().rename("distintos")
+
+
+# --- Bocetos guardados en DATA/cache ---
+
+def _rutas(nombre):
+    base = os.path.join(datos.DIR_CACHE, f"distintos_{nombre}")
+    return base + ".parquet", base + ".json"
+
+
+def _huella():
+    return {**datos.huella_datos(), "bocetos": VERSION_BOCETOS, "precision": PRECISION_DISTINTOS}
+
+
+def boceto_vigente(nombre):
+    """True si el boceto guardado corresponde a la caché actual (CSV y anexos)."""
+    ruta, ruta_huella = _rutas(nombre)
+    if not os.path.exists(ruta) or not os.path.exists(ruta_huella):
+        return False
+    if not os.path.exists(datos.RUTA_CSV):
+        return True
+    with open(ruta_huella, encoding="utf-8") as f:
+        return json.load(f) == _huella()
+
+
+def _guardar(nombre, boceto):
+    ruta, ruta_huella = _rutas(nombre)
+    os.makedirs(datos.DIR_CACHE, exist_ok=True)
+    boceto.to_parquet(ruta + ".tmp")
+    os.replace(ruta + ".tmp", ruta)
+    with open(ruta_huella, "w", encoding="utf-8") as f:
+        json.dump(_huella(), f)
+
+
+def construir_boceto(nombre, forzar=False):
+    """Calcula el boceto guardado `nombre` recorriendo el dataset por bloques."""
+    if not forzar and boceto_vigente(nombre):
+        return _rutas(nombre)[0]
+    columna, dimensiones = BOCETOS[nombre]
+    _guardar(nombre, distintos_por_bloques(columna, dimensiones))
+    return _rutas(nombre)[0]
+
+
+def actualizar_boceto(nombre, parte):
+    """Une al boceto guardado el de una parte recién anexada a la caché."""
+    columna, dimensiones = BOCETOS[nombre]
+    nuevo = boceto_distintos(datos.cargar_parte(parte, dimensiones + [columna]), columna, dimensiones)
+    _guardar(nombre, combinar_distintos(_leer(nombre), nuevo))
+
+
+def _leer(nombre):
+    boceto = pd.read_parquet(_rutas(nombre)[0])
+    boceto.attrs["precision"] = PRECISION_DISTINTOS
+    return boceto
+
+
+def cargar_boceto(nombre, desde=None, hasta=None):
+    """
+    Boceto guardado (se construye si no está al día), con los meses de pedido
+    entre `desde` (incluido) y `hasta` (excluido) si se indican.
+    """
+    construir_boceto(nombre)
+    boceto = _leer(nombre)
+    meses = boceto.index.get_level_values("order_month")
+    seleccion = np.ones(len(boceto), dtype=bool)
+    if desde is not None:
+        seleccion &= np.asarray(meses >= pd.Timestamp(desde))
+    if hasta is not None:
+        seleccion &= np.asarray(meses < pd.Timestamp(hasta))
+    return boceto[seleccion]
@@ -0,0 +1,148 @@
+"""
+Contrastes estadísticos a partir de momentos por grupo.
+
+En vez de pasar a scipy un array por grupo, se resume cada grupo con su número
+de valores, su suma y su suma de cuadrados. Estos momentos se pueden sumar
+entre bloques o subgrupos, así que los contrastes funcionan igual con el
+dataset entero, recorriéndolo por bloques o desde una tabla ya agregada:
+
+    from comun.estadistica import agrupar_momentos, anova, momentos
+    m = momentos(d, ["shipping_mode", "category_name"], "days_for_shipping_real")
+    F, p = anova(agrupar_momentos(m, "shipping_mode"))
+"""
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from . import bloques
+
+MOMENTOS = ["n", "suma", "suma2"]
+
+
+def momentos(df, grupos, valor):
+    """n, suma y suma de cuadrados de `valor` por `grupos` (los nulos no cuentan)."""
+    x = df[valor].astype("float64")
+    tabla = pd.DataFrame({"x": x, "x2": x * x})
+    claves = [df[g] for g in ([grupos] if isinstance(grupos, str) else grupos)]
+    m = tabla.groupby(claves, observed=True).agg(n=("x", "count"), suma=("x", "sum"), suma2=("x2", "sum"))
+    return m[m["n"] > 0]
+
+
+def combinar_momentos(*tablas):
+    """Suma tablas de momentos con las mismas claves (p. ej. de bloques distintos)."""
+    tablas = [t for t in tablas if t is not None]
+    unidas = pd.concat(tablas)
+    return unidas.groupby(level=list(unidas.index.names), observed=True).sum()
+
+
+def agrupar_momentos(m, nivel):
+    """Momentos de un nivel (o niveles) del índice, sumando los de los demás niveles."""
+    return m.groupby(level=nivel, observed=True).sum()
+
+
+def momentos_por_bloques(grupos, valor, preparar=None, columnas=None, filas=None):
+    """
+    Momentos recorriendo el dataset por bloques (comun/bloques.py).
+
+    `preparar` recibe cada bloque y devuelve el bloque filtrado o con columnas
+    calculadas; `columnas` son las del dataset que necesita (por defecto grupos y valor).
+    """
+    grupos = [grupos] if isinstance(grupos, str) else list(grupos)
+    columnas = columnas or grupos + [valor]
+    acumulado = None
+    for bloque in bloques.leer_bloques(columnas, filas):
+        if preparar is not None:
+            bloque = preparar(bloque)
+        acumulado = combinar_momentos(acumulado, momentos(bloque, grupos, valor))
+    return acumulado
+
+
+def medias(m):
+    """Media de cada grupo."""
+    return m["suma"] / m["n"]
+
+
+def varianzas(m):
+    """Varianza muestral (ddof=1) de cada grupo; NaN si el grupo tiene un solo valor."""
+    sc = m["suma2"] - m["suma"] ** 2 / m["n"]
+    return (sc.clip(lower=0) / (m["n"] - 1)).where(m["n"] > 1)
+
+
+def anova(m):
+    """
+    ANOVA de un factor a partir de los momentos de cada grupo.
+
+    Devuelve (F, p), igual que scipy.stats.f_oneway con los valores de cada grupo.
+    """
+    n, suma, suma2 = (m[c].to_numpy(dtype="float64") for c in MOMENTOS)
+    k, total = len(n), n.sum()
+    if k < 2 or total <= k:
+        return np.nan, np.nan
+    media_total = suma.sum() / total
+    ss_entre = (n * (suma / n - media_total) ** 2).sum()
+    ss_dentro = max((suma2 - suma ** 2 / n).sum(), 0.0)
+    gl_entre, gl_dentro = k - 1, total - k
+    if ss_dentro == 0:
+        return (np.inf, 0.0) if ss_entre > 0 else (np.nan, np.nan)
+    F = (ss_entre / gl_entre) / (ss_dentro / gl_dentro)
+    return F, stats.f.sf(F, gl_entre, gl_dentro)
+
+
+def ajustar_p(p, metodo="holm"):
+    """
+    p-valores corregidos por comparaciones múltiples: "holm", "bh"
+    (Benjamini-Hochberg) o "bonferroni". Los NaN se dejan fuera de la corrección.
+    """
+    p = np.asarray(p, dtype="float64")
+    ajustados = np.full_like(p, np.nan)
+    validos = ~np.isnan(p)
+    q, m = p[validos], validos.sum()
+    if m == 0:
+        return ajustados
+    orden = np.argsort(q)
+    if metodo == "holm":
+        paso = np.maximum.accumulate((m - np.arange(m)) * q[orden])
+    elif metodo == "bh":
+        paso = np.minimum.accumulate((m / np.arange(m, 0, -1) * q[orden][::-1]))[::-1]
+    elif metodo == "bonferroni":
+        paso = m * q[orden]
+    else:
+        raise ValueError(f"Corrección desconocida: {metodo!r} (holm, bh o bonferroni)")
+    corregidos = np.empty(m)
+    corregidos[orden] = np.minimum(paso, 1)
+    ajustados[validos] = corregidos
+    return ajustados
+
+
+def welch_por_pares(m, correccion="holm"):
+    """
+    t de Welch para todos los pares de grupos a partir de sus momentos.
+
+    Cada grupo se resume una sola vez (n, media, varianza) y los k·(k-1)/2 pares
+    se calculan vectorizados. Devuelve una fila por par con n_A, n_B, t, p_valor
+    (igual que scipy.stats.ttest_ind con equal_var=False) y p_ajustado.
+    """
+    grupos = np.asarray(m.index)
+    n = m["n"].to_numpy(dtype="float64")
+    media, var = medias(m).to_numpy(), varianzas(m).to_numpy()
+    a, b = np.triu_indices(len(grupos), k=1)
+
+    ea, eb = var[a] / n[a], var[b] / n[b]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = (media[a] - media[b]) / np.sqrt(ea + eb)
+        gl = (ea + eb) ** 2 / (ea ** 2 / (n[a] - 1) + eb ** 2 / (n[b] - 1))
+    p = 2 * stats.t.sf(np.abs(t), gl)
+
+    return pd.DataFrame({
+        "Grupo A": grupos[a], "Grupo B": grupos[b],
+        "n_A": n[a].astype("int64"), "n_B": n[b].astype("int64"),
+        "t": t, "p_valor": p, "p_ajustado": ajustar_p(p, correccion),
+    })
+
+
+def matriz_pares(pares, columna="p_ajustado"):
+    """Tabla cuadrada grupo x grupo con `columna` de welch_por_pares (simétrica)."""
+    directa = pares.pivot(index="Grupo A", columns="Grupo B", values=columna)
+    grupos = list(dict.fromkeys(list(pares["Grupo A"]) + list(pares["Grupo B"])))
+    directa = directa.reindex(index=grupos, columns=grupos)
+    return directa.combine_first(directa.T).rename_axis(index=None, columns=None)
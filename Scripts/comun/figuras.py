@@ -0,0 +1,166 @@
+"""
+Guardado de las figuras de los informes sin pantalla y en segundo plano.
+
+Los scripts terminan con plt.savefig(..., dpi=300) y plt.show(). Dentro de
+guardado_figuras() el backend es Agg (plt.show() no bloquea) y cada savefig se
+intercepta: la figura se serializa (pickle) y se manda a un pool de procesos que
+la dibuja y la codifica mientras el script sigue calculando. El formato y los
+dpi de cada fichero salen de `Salida`:
+
+    salida = Salida(formatos=["png", "webp"], dpi=150,
+                    destinos=[destino_desde_texto("ventas_tiempo:svg")])
+    with guardado_figuras(salida, procesos=2) as guardado:
+        plt.savefig("grafico.png", dpi=300)   # -> grafico.png y grafico.webp a 150 dpi
+    guardado.errores                          # [(etiqueta, ruta, traza)] de los que fallaron
+
+Las figuras que no se pueden serializar se guardan en el momento, como antes.
+"""
+import contextlib
+import os
+import pickle
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+
+FORMATOS = ("png", "svg", "webp", "pdf", "jpg")
+
+
+@dataclass
+class Destino:
+    # Texto que debe contener la ruta del fichero (p. ej. "Parte 1/G6" o "ventas_tiempo")
+    patron: str
+    formatos: list = None
+    dpi: float = None
+
+
+@dataclass
+class Salida:
+    # Formatos y dpi por defecto (None: los que pide el script)
+    formatos: list = None
+    dpi: float = None
+    # Excepciones por fichero: gana el primer Destino cuyo patrón aparece en la ruta
+    destinos: list = field(default_factory=list)
+
+    def ficheros(self, ruta, dpi=None):
+        """[(ruta, formato, dpi)] que hay que escribir para un savefig(ruta, dpi=dpi)."""
+        base, extension = os.path.splitext(ruta)
+        formatos, dpi_salida = self.formatos, self.dpi
+        normalizada = ruta.replace(os.sep, "/")
+        for destino in self.destinos:
+            if destino.patron in normalizada:
+                formatos = destino.formatos or formatos
+                dpi_salida = destino.dpi or dpi_salida
+                break
+        formatos = formatos or [extension.lstrip(".").lower() or "png"]
+        return [(f"{base}.{formato}", formato, dpi_salida or dpi) for formato in formatos]
+
+
+def destino_desde_texto(texto):
+    """Destino a partir de "patrón:formato[,formato...][@dpi]" (p. ej. "Parte 1:png,webp@150")."""
+    patron, _, resto = texto.rpartition(":")
+    if not patron:
+        raise ValueError(f"Destino sin patrón: {texto!r} (se espera patrón:formatos[@dpi])")
+    formatos, _, dpi = resto.partition("@")
+    formatos = [f.strip().lower() for f in formatos.split(",") if f.strip()] or None
+    return Destino(patron, comprobar_formatos(formatos), float(dpi) if dpi else None)
+
+
+def comprobar_formatos(formatos):
+    """Devuelve `formatos` o lanza ValueError si alguno no está en FORMATOS."""
+    for formato in formatos or []:
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato no admitido: {formato!r} ({', '.join(FORMATOS)})")
+    return formatos
+
+
+def _guardar(figura, ficheros, opciones, guardar=Figure.savefig):
+    for ruta, formato, dpi in ficheros:
+        guardar(figura, ruta, format=formato, dpi=dpi or "figure", **opciones)
+
+
+def _guardar_serializada(datos_figura, ficheros, opciones):
+    figura = pickle.loads(datos_figura)
+    try:
+        _guardar(figura, ficheros, opciones)
+    finally:
+        plt.close(figura)
+
+
+class GuardadoFiguras:
+    """
+    Lo que devuelve guardado_figuras(). `etiqueta` (p. ej. el informe en curso)
+    acompaña a cada guardado para saber de quién es un error.
+    """
+
+    def __init__(self, salida, pool):
+        self.salida = salida
+        self.pool = pool
+        self.etiqueta = None
+        self.pendientes = {}
+        self.escritos = []
+        # [(etiqueta, ruta, traza)]
+        self.errores = []
+
+    def guardar(self, figura, ruta, guardar_original, *args, **opciones):
+        # Ficheros abiertos, buffers o formato explícito: tal cual, sin pool
+        if not isinstance(ruta, (str, os.PathLike)) or args or "format" in opciones:
+            return guardar_original(figura, ruta, *args, **opciones)
+        ficheros = self.salida.ficheros(os.path.abspath(os.fspath(ruta)), opciones.pop("dpi", None))
+        if self.pool is not None:
+            try:
+                datos_figura = pickle.dumps(figura)
+            except Exception:
+                datos_figura = None
+            if datos_figura is not None:
+                futuro = self.pool.submit(_guardar_serializada, datos_figura, ficheros, opciones)
+                self.pendientes[futuro] = (self.etiqueta, ficheros)
+                return
+        _guardar(figura, ficheros, opciones, guardar_original)
+        self.escritos += [r for r, _, _ in ficheros]
+
+    def esperar(self):
+        """Espera a los guardados pendientes; devuelve los errores nuevos [(etiqueta, ruta, traza)]."""
+        errores = []
+        for futuro, (etiqueta, ficheros) in self.pendientes.items():
+            try:
+                futuro.result()
+                self.escritos += [r for r, _, _ in ficheros]
+            except Exception:
+                errores.append((etiqueta, ficheros[0][0], traceback.format_exc()))
+        self.pendientes = {}
+        self.errores += errores
+        return errores
+
+
+@contextlib.contextmanager
+def guardado_figuras(salida=None, procesos=0, mp_context=None):
+    """
+    Intercepta Figure.savefig (y por tanto plt.savefig) mientras dura el bloque.
+
+    Con `procesos` > 0 las figuras se dibujan y codifican en un pool de ese
+    tamaño; con 0, en el momento. Al salir se espera a todos los pendientes.
+    """
+    salida = salida or Salida()
+    pool = ProcessPoolExecutor(max_workers=procesos, mp_context=mp_context) if procesos > 0 else None
+    guardado = GuardadoFiguras(salida, pool)
+    original = Figure.savefig
+
+    def savefig(figura, ruta, *args, **opciones):
+        return guardado.guardar(figura, ruta, original, *args, **opciones)
+
+    Figure.savefig = savefig
+    try:
+        yield guardado
+    finally:
+        Figure.savefig = original
+        try:
+            guardado.esperar()
+        finally:
+            if pool is not None:
+                pool.shutdown()
@@ -0,0 +1,68 @@
+"""
+Gráficos compartidos por los informes.
+
+dispersion_densidad() sustituye a plt.scatter cuando hay muchos puntos: los
+agrupa en una rejilla 2-D (np.histogram2d) y dibuja la rejilla como una sola
+imagen, con el número de puntos de cada celda o la media de una tercera
+variable. El tiempo de dibujo y el tamaño del fichero dependen de la rejilla,
+no del número de filas:
+
+    from comun.graficos import dispersion_densidad
+    im = dispersion_densidad(data["price"], data["total"])
+    plt.colorbar(im, label="Pedidos")
+"""
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.colors import LogNorm
+
+# Celdas por eje de la rejilla
+CELDAS = 200
+
+
+def rejilla_densidad(x, y, valores=None, celdas=CELDAS, rango=None):
+    """
+    Rejilla (celdas x celdas) con el número de puntos por celda, o la media de
+    `valores` si se indican (NaN en las celdas vacías). `celdas` admite también
+    lo mismo que `bins` de np.histogram2d (p. ej. [bordes_x, 200] para fijar las
+    columnas de una variable discreta). Devuelve (rejilla, bordes_x, bordes_y).
+    Sin puntos válidos la rejilla sale vacía (a ceros, o NaN con `valores`) sobre [0, 1].
+    """
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    validos = ~(np.isnan(x) | np.isnan(y))
+    if valores is not None:
+        valores = np.asarray(valores, dtype="float64")
+        validos &= ~np.isnan(valores)
+    x, y = x[validos], y[validos]
+    if rango is None and len(x) == 0:
+        rango = [[0, 1], [0, 1]]
+    elif rango is None:
+        rango = [[x.min(), x.max()], [y.min(), y.max()]]
+        # Rango de ancho cero (variable constante): se abre un poco para que haya celdas
+        rango = [[lo - 0.5, hi + 0.5] if lo == hi else [lo, hi] for lo, hi in rango]
+    conteos, bordes_x, bordes_y = np.histogram2d(x, y, bins=celdas, range=rango)
+    if valores is None:
+        return conteos, bordes_x, bordes_y
+    sumas, _, _ = np.histogram2d(x, y, bins=[bordes_x, bordes_y], weights=valores[validos])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(conteos > 0, sumas / conteos, np.nan), bordes_x, bordes_y
+
+
+def dispersion_densidad(x, y, valores=None, ax=None, celdas=CELDAS, rango=None, cmap="viridis", log=True):
+    """
+    Dispersión rasterizada de `x` frente a `y` sobre `ax` (el actual por defecto).
+
+    Sin `valores` el color es el número de puntos por celda (escala logarítmica
+    con log=True); con `valores`, su media en la celda. Las celdas vacías no se
+    pintan. Devuelve la imagen, para plt.colorbar().
+    """
+    ax = ax or plt.gca()
+    rejilla, bordes_x, bordes_y = rejilla_densidad(x, y, valores, celdas, rango)
+    if valores is None:
+        rejilla = np.where(rejilla > 0, rejilla, np.nan)
+    # Sin puntos la rejilla es toda NaN: la escala queda en [1, 1]
+    maximo = np.nanmax(rejilla) if np.isfinite(rejilla).any() else 1
+    norma = LogNorm(vmin=1, vmax=max(maximo, 1)) if (log and valores is None) else None
+    # histogram2d devuelve [x, y]: se transpone para que y sean las filas de la imagen
+    return ax.imshow(rejilla.T, origin="lower", aspect="auto", interpolation="nearest", cmap=cmap, norm=norma,
+                     extent=(bordes_x[0], bordes_x[-1], bordes_y[0], bordes_y[-1]))
@@ -0,0 +1,208 @@
+"""
+Ejecución de los informes (scripts de análisis) con el dataset compartido.
+
+El dataset se precarga una vez y cada script se ejecuta tal cual con runpy,
+desde su propia carpeta, de modo que genera los mismos PNG/CSV que al lanzarlo
+a mano. Las llamadas a cargar_datos() de los scripts devuelven columnas del
+dataset ya cargado en lugar de volver a leer el disco.
+
+Con varios procesos, los informes se reparten en un pool de workers. Donde
+existe fork, los workers heredan el dataset precargado por el proceso padre
+(páginas compartidas de solo lectura); si no, cada worker lo precarga una vez
+desde la caché Parquet al arrancar.
+
+Los savefig de los scripts pasan por comun/figuras.py: formato y dpi según la
+`Salida` pedida y, con procesos_figuras > 0, dibujo y codificación en otro pool
+mientras sigue el siguiente informe (solo en la ejecución secuencial; con
+varios procesos cada worker guarda sus figuras en el momento).
+"""
+import contextlib
+import io
+import multiprocessing
+import os
+import runpy
+import sys
+import time
+import traceback
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+
+import matplotlib
+
+matplotlib.use("Agg")  # sin ventanas: plt.show() no bloquea
+import matplotlib.pyplot as plt
+
+from . import datos
+from .figuras import guardado_figuras
+
+# Informes de la Parte 1, relativos a la carpeta Scripts/
+INFORMES_PARTE1 = [
+    "Parte 1/G1/boxplot_envio_vs_estado.py",
+    "Parte 1/G2/scatterplot_precio_vs_pedido.py",
+    "Parte 1/G3/boxplot_envio_vs_transporte.py",
+    "Parte 1/G4/barras_tipoclient_vs_pais.py",
+    "Parte 1/G5/top10vip.py",
+    "Parte 1/G6/evolucion_ventas.py",
+    "Parte 1/G7/barrasH_sales_vs_category_name.py",
+    "Parte 1/G7/boxplots.py",
+    "Parte 1/G7/stadistic.py",
+    "Parte 1/G8/barras_benefit_per_order_vs_customer_segment.py",
+    "Parte 1/G8/estudio.py",
+    "Parte 1/G9/analisis.py",
+    "Parte 1/G9/order_item_profit_ratio_hist.py",
+    "Parte 1/G10/analisis.py",
+    "Parte 1/G10/top10_productos_mayor_retraso.py",
+    "Parte 1/2017vs2018/analisisTicket.py",
+    "Parte 1/2017vs2018/analisis_caida_ventas_desde_corte.py",
+    "Parte 1/2017vs2018/analisiscategorias.py",
+    "Parte 1/Estudio 2/beneficio_mensual.py",
+    "Parte 1/Estudio 2/descuento_envio.py",
+    "Parte 1/Estudio 2/descuento_vs_margen.py",
+    "Parte 1/Estudio 2/margen_por_categoria.py",
+    "Parte 1/Estudio 3/benef_cat_modo.py",
+    "Parte 1/Estudio 3/entregas_tiempo_modo.py",
+    "Parte 1/Estudio 3/envio_vs_beneficio.py",
+    "Parte 1/Estudio 3/tenvio_modo_categoria.py",
+]
+
+# Mapas de la Parte 2
+INFORMES_PARTE2 = [
+    "Parte 2/G1/beneificio_pais.py",
+    "Parte 2/G2/mapa_calor_retrasos.py",
+    "Parte 2/G3/mapa_burbujas_ventas.py",
+    "Parte 2/G3/mapa_customers_country.py",
+    "Parte 2/G4/mapa_cluster.py",
+    "Parte 2/G5/rutas_comerciales.py",
+]
+
+INFORMES = INFORMES_PARTE1 + INFORMES_PARTE2
+
+
+@dataclass
+class ResultadoInforme:
+    informe: str
+    ok: bool
+    segundos: float
+    error: str = ""
+    salida: str = ""
+
+
+def seleccionar_informes(filtros=None, informes=None):
+    """Informes cuya ruta contiene alguno de los textos de `filtros` (todos si no hay filtros)."""
+    informes = INFORMES if informes is None else informes
+    if not filtros:
+        return list(informes)
+    return [inf for inf in informes if any(f in inf for f in filtros)]
+
+
+def ejecutar_informe(informe, capturar=False, salida=None):
+    """
+    Ejecuta un script desde su carpeta y devuelve un ResultadoInforme (no propaga errores).
+
+    Con `capturar=True` la salida del script se guarda en el resultado en vez de imprimirse.
+    Con `salida` (figuras.Salida) las figuras se guardan con esos formatos y dpi.
+    """
+    ruta = os.path.join(datos.DIR_SCRIPTS, informe)
+    cwd, path = os.getcwd(), list(sys.path)
+    texto = io.StringIO()
+    inicio = time.perf_counter()
+    try:
+        os.chdir(os.path.dirname(ruta))
+        with warnings.catch_warnings(), \
+                (contextlib.redirect_stdout(texto) if capturar else contextlib.nullcontext()), \
+                (guardado_figuras(salida) if salida is not None else contextlib.nullcontext()):
+            warnings.filterwarnings("ignore", message=".*non-interactive.*")
+            runpy.run_path(ruta, run_name="__main__")
+        ok, error = True, ""
+    except SystemExit as e:
+        # Algunos scripts terminan con sys.exit() tras informar del problema
+        ok, error = e.code in (None, 0), f"sys.exit({e.code})"
+    except Exception:
+        ok, error = False, traceback.format_exc()
+    finally:
+        plt.close("all")
+        os.chdir(cwd)
+        sys.path[:] = path
+    return ResultadoInforme(informe, ok, time.perf_counter() - inicio, error, texto.getvalue())
+
+
+def _iniciar_worker():
+    # Sin fork el worker no hereda el dataset del padre: lo precarga una vez al arrancar
+    if not datos.hay_datos_precargados():
+        datos.precargar_datos()
+
+
+def _contexto_procesos():
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+def ejecutar_informes(informes, procesos=1, salida=None, procesos_figuras=0):
+    """
+    Precarga el dataset una vez y ejecuta los informes.
+
+    Con `procesos` > 1 los informes se reparten en un pool de ese tamaño; los
+    resultados se devuelven en el orden de `informes` y los fallos (incluida la
+    caída de un worker) quedan registrados en el resultado de cada informe.
+    `salida` (figuras.Salida) fija formatos y dpi de las figuras; con
+    `procesos_figuras` > 0 y un solo proceso de informes, las figuras se
+    guardan en segundo plano y un fallo al guardarlas marca su informe.
+    """
+    inicio = time.perf_counter()
+    datos.precargar_datos()
+    print(f"Dataset cargado en {time.perf_counter() - inicio:.2f} s")
+    try:
+        if procesos <= 1:
+            return _ejecutar_en_serie(informes, salida, procesos_figuras)
+        return _ejecutar_en_paralelo(informes, procesos, salida)
+    finally:
+        datos.liberar_datos()
+
+
+def _ejecutar_en_serie(informes, salida, procesos_figuras):
+    resultados = {}
+    with guardado_figuras(salida, procesos_figuras, _contexto_procesos()) as guardado:
+        for informe in informes:
+            print(f"\n=== {informe}")
+            guardado.etiqueta = informe
+            resultados[informe] = ejecutar_informe(informe)
+    if procesos_figuras > 0:
+        print(f"\nFiguras guardadas en segundo plano: {len(guardado.escritos)}")
+    for informe, ruta, traza in guardado.errores:
+        r = resultados[informe]
+        r.ok = False
+        r.error = "\n".join(filter(None, [r.error, f"No se pudo guardar {ruta}:", traza]))
+    return [resultados[informe] for informe in informes]
+
+
+def _ejecutar_en_paralelo(informes, procesos, salida):
+    resultados = {}
+    with ProcessPoolExecutor(max_workers=procesos, mp_context=_contexto_procesos(),
+                             initializer=_iniciar_worker) as pool:
+        futuros = {pool.submit(ejecutar_informe, informe, True, salida): informe for informe in informes}
+        for futuro in as_completed(futuros):
+            informe = futuros[futuro]
+            try:
+                r = futuro.result()
+            except Exception:
+                r = ResultadoInforme(informe, False, 0.0, traceback.format_exc())
+            resultados[informe] = r
+            print(f"\n=== {informe} ({r.segundos:.2f} s)")
+            if r.salida:
+                print(r.salida.rstrip())
+    return [resultados[informe] for informe in informes]
+
+
+def resumen(resultados):
+    """Texto con el tiempo de cada informe y el detalle de los que fallaron."""
+    lineas = ["", "=== Resumen"]
+    for r in resultados:
+        lineas.append(f"{'OK   ' if r.ok else 'FALLO'} {r.segundos:7.2f} s  {r.informe}")
+    fallidos = [r for r in resultados if not r.ok]
+    for r in fallidos:
+        lineas += ["", f"--- {r.informe}", r.error.rstrip()]
+    lineas.append(f"\n{len(resultados) - len(fallidos)}/{len(resultados)} informes correctos, "
+                  f"{sum(r.segundos for r in resultados):.2f} s en total")
+    return "\n".join(lineas)
@@ -0,0 +1,108 @@
+"""
+Indicadores de tipo cociente (ticket medio, margen %, % de retrasos...) por dimensiones.
+
+Cada indicador es numerador / denominador, donde cada parte es una agregación de
+una columna del dataset (sum, count o nunique). Se calculan desde el cubo de
+ventas (comun/cubo.py), que ya tiene esas agregaciones como medidas: se toman
+las de numeradores y denominadores y se dividen vectorizado, sin volver a los datos:
+
+    from comun.kpis import ratios_cubo
+    ticket = ratios_cubo("category_name", ["ticket_medio"])["ticket_medio"]
+
+ratios_medidas() hace lo mismo con cualquier tabla que tenga las medidas del
+cubo (p. ej. la serie de comun/series.py).
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from . import cubo
+
+FUNCIONES = ("sum", "count", "nunique")
+
+
+@dataclass
+class Ratio:
+    # (columna, función) de cada parte del cociente
+    numerador: tuple
+    denominador: tuple
+    # Factor que multiplica el cociente (100 para porcentajes)
+    escala: float = 1.0
+
+
+RATIOS = {
+    # Ventas por pedido distinto
+    "ticket_medio": Ratio(("sales", "sum"), ("order_id", "nunique")),
+    # Beneficio sobre ventas, en %
+    "margen_pct": Ratio(("benefit_per_order", "sum"), ("sales", "sum"), 100),
+    # Líneas con riesgo de retraso sobre el total de líneas, en %
+    "retraso_pct": Ratio(("late_delivery_risk", "sum"), ("late_delivery_risk", "count"), 100),
+    # Artículos por pedido distinto
+    "articulos_pedido": Ratio(("order_item_quantity", "sum"), ("order_id", "nunique")),
+}
+
+# Agregación del dataset -> medida del cubo que la contiene (late_delivery_risk no
+# tiene nulos: su recuento es el de líneas)
+MEDIDAS_CUBO = {**{(columna, "sum"): medida for medida, columna in cubo.SUMAS.items()},
+                ("late_delivery_risk", "count"): "lineas",
+                ("order_id", "nunique"): "pedidos"}
+
+
+def _ratios(ratios):
+    ratios = [ratios] if isinstance(ratios, str) else ratios
+    definidos = {}
+    for ratio in ratios:
+        if isinstance(ratio, str):
+            if ratio not in RATIOS:
+                raise KeyError(f"Indicador desconocido: {ratio!r} ({', '.join(RATIOS)})")
+            definidos[ratio] = RATIOS[ratio]
+        else:
+            # (nombre, Ratio) para indicadores que no están en RATIOS
+            definidos[ratio[0]] = ratio[1]
+    for nombre, ratio in definidos.items():
+        for _, funcion in (ratio.numerador, ratio.denominador):
+            if funcion not in FUNCIONES:
+                raise ValueError(f"Función '{funcion}' de '{nombre}' no admitida: {FUNCIONES}")
+    return definidos
+
+
+def _componente(columna, funcion):
+    return f"{columna}__{funcion}"
+
+
+def _dividir(componentes, definidos, incluir_componentes):
+    resultado = componentes.copy() if incluir_componentes else pd.DataFrame(index=componentes.index)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for nombre, ratio in definidos.items():
+            num = componentes[_componente(*ratio.numerador)].astype("float64")
+            den = componentes[_componente(*ratio.denominador)].astype("float64")
+            # Grupos sin denominador: NaN en vez de infinito
+            resultado[nombre] = (num / den.where(den != 0)) * ratio.escala
+    return resultado
+
+
+def ratios_cubo(dimensiones, ratios, celdas=None, componentes=False):
+    """
+    Indicadores `ratios` (nombres de RATIOS o pares (nombre, Ratio)) por `dimensiones`,
+    sobre el cubo de ventas (`celdas` filtradas o el cubo entero).
+
+    Devuelve un DataFrame indexado por las dimensiones con una columna por
+    indicador; con componentes=True también las agregaciones "<columna>__<función>"
+    de numeradores y denominadores (p. ej. sales__sum, order_id__nunique). Solo
+    admite las partes de MEDIDAS_CUBO: sumas de las columnas del cubo, líneas y
+    pedidos distintos.
+    """
+    return ratios_medidas(cubo.consultar_cubo(dimensiones, celdas), ratios, componentes)
+
+
+def ratios_medidas(medidas, ratios, componentes=False):
+    """Indicadores a partir de una tabla con las medidas del cubo (ventas, pedidos...) por fila."""
+    definidos = _ratios(ratios)
+    agregados = pd.DataFrame(index=medidas.index)
+    for nombre, ratio in definidos.items():
+        for parte in (ratio.numerador, ratio.denominador):
+            if parte not in MEDIDAS_CUBO:
+                raise KeyError(f"'{nombre}' usa {parte}, que no está en el cubo de ventas")
+            agregados[_componente(*parte)] = medidas[MEDIDAS_CUBO[parte]]
+    return _dividir(agregados, definidos, componentes)
@@ -0,0 +1,77 @@
+"""
+Capas de folium compartidas por los mapas de la Parte 2.
+
+cluster_rapido() sustituye al bucle de folium.Marker + Popup + Icon dentro de
+un MarkerCluster: los puntos van al HTML como un único array compacto
+[lat, lon, categoría, campos...] y el navegador crea los marcadores con una
+sola función (FastMarkerCluster). Los iconos se crean una vez por categoría y
+los popups solo cuando se abren, así que el HTML pesa una fracción y el mapa
+carga bien con cientos de miles de puntos:
+
+    from comun.mapas import cluster_rapido
+    cluster_rapido(puntos, "latitude_dest", "longitude_dest", "shipping_mode",
+                   colores={"Same Day": "red"},
+                   campos=[("Shipping mode", "shipping_mode"), ("Pedidos", "count")]).add_to(m)
+"""
+import html
+import json
+
+import numpy as np
+import pandas as pd
+from folium.plugins import FastMarkerCluster
+
+# Decimales de las coordenadas en el HTML (5: ~1 m)
+DECIMALES = 5
+COLOR_DEFECTO = "gray"
+
+
+def _callback(categorias, colores, campos, categoria, icono):
+    # Popup: cada campo es la etiqueta de la categoría (columna 2) o una columna extra (3, 4...)
+    partes, extra = [], 3
+    for etiqueta, columna in campos:
+        valor = "categorias[row[2]]" if columna == categoria else f"row[{extra}]"
+        extra += columna != categoria
+        partes.append(f"{json.dumps(f'<b>{html.escape(str(etiqueta))}:</b> ')} + {valor}")
+    popup = ' + "<br>" + '.join(partes) or '""'
+    return f"""(function () {{
+        var categorias = {json.dumps(categorias)};
+        var iconos = {json.dumps(colores)}.map(function (color) {{
+            return L.AwesomeMarkers.icon({{icon: {json.dumps(icono)}, markerColor: color, prefix: "glyphicon"}});
+        }});
+        return function (row) {{
+            var marker = L.marker(new L.LatLng(row[0], row[1]), {{icon: iconos[row[2]]}});
+            marker.bindPopup(function () {{ return {popup}; }}, {{maxWidth: 300}});
+            return marker;
+        }};
+    }})()"""
+
+
+def cluster_rapido(df, lat, lon, categoria, colores=None, campos=(), nombre=None, icono="circle",
+                   decimales=DECIMALES, **opciones):
+    """
+    FastMarkerCluster con un marcador por fila de `df`, coloreado por `categoria`.
+
+    `colores` es {valor de categoría: color de folium.Icon} (COLOR_DEFECTO para
+    el resto); `campos` son pares (etiqueta, columna) que se muestran en el
+    popup. Las `opciones` van a Leaflet.markercluster. Los textos del popup se
+    escapan aquí (html.escape), así que pueden llevar <, > o &.
+    """
+    codigos, categorias = pd.factorize(df[categoria].astype(str), sort=True)
+    colores = colores or {}
+    extras = [columna for _, columna in campos if columna != categoria]
+
+    filas = np.column_stack([df[lat].to_numpy(dtype="float64").round(decimales),
+                             df[lon].to_numpy(dtype="float64").round(decimales),
+                             codigos]).tolist()
+    if extras:
+        # Se juntan por filas como objetos para no pasar los enteros a float
+        valores = [[html.escape(v) if isinstance(v, str) else v for v in fila]
+                   for fila in df[extras].astype(object).to_numpy().tolist()]
+        filas = [fila[:2] + [int(fila[2])] + resto for fila, resto in zip(filas, valores)]
+    else:
+        filas = [fila[:2] + [int(fila[2])] for fila in filas]
+
+    callback = _callback([html.escape(c) for c in categorias],
+                         [colores.get(c, COLOR_DEFECTO) for c in categorias], campos, categoria, icono)
+    # chunkedLoading: el navegador agrupa los puntos por tandas sin bloquear la página
+    return FastMarkerCluster(filas, callback=callback, name=nombre, chunkedLoading=True, **opciones)
@@ -0,0 +1,103 @@
+"""
+Mapas de folium que se abren sin red: las librerías JS/CSS van junto al HTML.
+
+folium enlaza Leaflet, jQuery, Bootstrap, Font Awesome y los plugins desde
+CDN. guardar_mapa() guarda el HTML con esos enlaces cambiados a copias en
+<carpeta del HTML>/lib/, con la misma estructura host/ruta que la URL (así
+las fuentes que los CSS enlazan con rutas relativas también se encuentran):
+
+    from comun.recursos import guardar_mapa
+    guardar_mapa(m, "mapa.html")           # en vez de m.save("mapa.html")
+
+Las copias salen de DIR_RECURSOS (DATA/cache/recursos), que se llena la
+primera vez que se descarga cada fichero; se puede llenar a mano con la misma
+estructura para generar los mapas sin red. Si un fichero no está y no se
+puede descargar, se avisa y ese enlace se queda en el CDN.
+"""
+import os
+import re
+import shutil
+import urllib.parse
+import urllib.request
+import warnings
+
+from . import datos
+
+DIR_RECURSOS = os.path.join(datos.DIR_CACHE, "recursos")
+# Carpeta de las copias, relativa al HTML
+CARPETA_LIB = "lib"
+# Segundos de espera por descarga
+ESPERA = 20
+
+# <script src="http..."> y <link href="http..."> del HTML; url(...) de los CSS
+_ENLACE = re.compile(r'(<script[^>]*\bsrc=|<link[^>]*\bhref=)"(https?://[^"]+)"')
+_URL_CSS = re.compile(r"""url\(\s*['"]?([^'")]+?)['"]?\s*\)""")
+
+
+def ruta_local(url):
+    """Ruta relativa (host/ruta) de la copia de `url`."""
+    partes = urllib.parse.urlsplit(url)
+    return "/".join([partes.netloc] + [p for p in partes.path.split("/") if p])
+
+
+def _descargar(url, ruta):
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    with urllib.request.urlopen(url, timeout=ESPERA) as respuesta:
+        contenido = respuesta.read()
+    with open(ruta + ".tmp", "wb") as f:
+        f.write(contenido)
+    os.replace(ruta + ".tmp", ruta)
+
+
+def recurso(url):
+    """
+    Copia de `url` en DIR_RECURSOS (se descarga si falta) y, si es un CSS, de
+    los ficheros que enlaza con rutas relativas. Devuelve sus rutas relativas.
+    """
+    relativa = ruta_local(url)
+    ruta = os.path.join(DIR_RECURSOS, *relativa.split("/"))
+    if not os.path.exists(ruta):
+        _descargar(url, ruta)
+    rutas = [relativa]
+    if ruta.endswith(".css"):
+        with open(ruta, encoding="utf-8", errors="replace") as f:
+            css = f.read()
+        for enlace in _URL_CSS.findall(css):
+            if enlace.startswith(("data:", "#")) or "//" in enlace:
+                continue
+            # ?#iefix, #glyphicons...: el fichero es el mismo
+            absoluta = urllib.parse.urlsplit(urllib.parse.urljoin(url, enlace))._replace(query="", fragment="")
+            for dependencia in recurso(absoluta.geturl()):
+                if dependencia not in rutas:
+                    rutas.append(dependencia)
+    return rutas
+
+
+def _copiar(relativa, carpeta):
+    origen = os.path.join(DIR_RECURSOS, *relativa.split("/"))
+    destino = os.path.join(carpeta, CARPETA_LIB, *relativa.split("/"))
+    if os.path.exists(destino) and os.path.getsize(destino) == os.path.getsize(origen):
+        return
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    shutil.copyfile(origen, destino)
+
+
+def guardar_mapa(mapa, ruta):
+    """Guarda `mapa` en `ruta` con las librerías JS/CSS copiadas en lib/ junto al HTML."""
+    carpeta = os.path.dirname(os.path.abspath(ruta))
+
+    def local(enlace):
+        prefijo, url = enlace.groups()
+        try:
+            rutas = recurso(url)
+        except OSError as e:
+            warnings.warn(f"Sin copia local de {url} ({e}): el mapa la cargará del CDN", stacklevel=3)
+            return enlace.group(0)
+        for relativa in rutas:
+            _copiar(relativa, carpeta)
+        return f'{prefijo}"{CARPETA_LIB}/{rutas[0]}"'
+
+    html = _ENLACE.sub(local, mapa.get_root().render())
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write(html)
+    return ruta
@@ -0,0 +1,166 @@
+"""
+Series temporales de las medidas sumables a grano día, semana, mes o trimestre.
+
+La base es una tabla diaria (fecha del pedido x mercado x categoría) con las
+mismas medidas que el cubo de ventas (comun/cubo.py), guardada en DATA/cache y
+actualizada al anexar datos nuevos. Cualquier serie (por semana, mes o
+trimestre, total o separada por mercado o categoría) se suma desde esa tabla,
+que tiene unas decenas de miles de filas, sin volver al dataset:
+
+    from comun.series import contrastes_serie, serie
+    ventas = serie("ventas", grano="M")["ventas"]
+    por_mercado = serie("ventas", grano="M", por="market", desde="2017-09-01")
+    print(contrastes_serie(ventas))   # tendencia (Pearson con el tiempo), asimetría y curtosis
+
+Los periodos sin pedidos dentro del rango cuentan como 0. Cada periodo se
+indexa por su primer día (el lunes en las semanas), como order_month y
+order_week en comun/datos.py.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from . import bloques, cubo, datos
+
+RUTA_SERIE = os.path.join(datos.DIR_CACHE, "serie_diaria.parquet")
+RUTA_HUELLA_SERIE = os.path.join(datos.DIR_CACHE, "serie_diaria.json")
+
+# Se incrementa cuando cambian las dimensiones o medidas de la tabla diaria
+VERSION_SERIE = 1
+
+# Granos admitidos: D (día), W (semana, desde el lunes), M (mes), Q (trimestre)
+GRANOS = ("D", "W", "M", "Q")
+DIMENSIONES = ["market", "category_name"]
+MEDIDAS = cubo.MEDIDAS
+COLUMNAS = ["order_date_dateorders"] + DIMENSIONES + list(cubo.SUMAS.values()) + ["order_id"]
+
+
+def _huella_serie():
+    return {**datos.huella_datos(), "serie": VERSION_SERIE}
+
+
+def serie_vigente():
+    """True si la tabla diaria guardada corresponde a la caché actual (CSV y anexos)."""
+    if not os.path.exists(RUTA_SERIE) or not os.path.exists(RUTA_HUELLA_SERIE):
+        return False
+    if not os.path.exists(datos.RUTA_CSV):
+        return True
+    with open(RUTA_HUELLA_SERIE, encoding="utf-8") as f:
+        return json.load(f) == _huella_serie()
+
+
+def _con_fecha(bloque):
+    bloque = bloque.assign(fecha=bloque["order_date_dateorders"].dt.normalize())
+    return bloque[bloque["fecha"].notna()]
+
+
+def _diaria(bloques_filas):
+    return cubo.celdas_por_bloques(bloques_filas, ["fecha"] + DIMENSIONES, preparar=_con_fecha)
+
+
+def _guardar(tabla):
+    os.makedirs(datos.DIR_CACHE, exist_ok=True)
+    tmp = RUTA_SERIE + ".tmp"
+    tabla.to_parquet(tmp, index=False)
+    os.replace(tmp, RUTA_SERIE)
+    with open(RUTA_HUELLA_SERIE, "w", encoding="utf-8") as f:
+        json.dump(_huella_serie(), f)
+
+
+def construir_serie(forzar=False):
+    """Agrega el dataset bloque a bloque por día, mercado y categoría y lo guarda si no está al día."""
+    if not forzar and serie_vigente():
+        return RUTA_SERIE
+    _guardar(_diaria(bloques.leer_bloques(COLUMNAS)))
+    return RUTA_SERIE
+
+
+def actualizar_serie(parte):
+    """Suma a la tabla diaria la de una parte recién anexada (sus pedidos son nuevos)."""
+    nuevas = _diaria([datos.cargar_parte(parte, COLUMNAS)])
+    tabla = pd.concat([pd.read_parquet(RUTA_SERIE), nuevas], ignore_index=True)
+    tabla = tabla.groupby(["fecha"] + DIMENSIONES, observed=True, dropna=False, sort=True).sum().reset_index()
+    _guardar(tabla)
+    return RUTA_SERIE
+
+
+def cargar_serie_diaria():
+    """Tabla diaria: una fila por día, mercado y categoría con pedidos."""
+    construir_serie()
+    return pd.read_parquet(RUTA_SERIE)
+
+
+def serie(medidas=None, grano="M", por=None, desde=None, hasta=None, etiqueta="inicio"):
+    """
+    Suma de `medidas` (de MEDIDAS; todas por defecto) por periodo de `grano`.
+
+    `por` separa la serie por market y/o category_name (índice periodo x `por`);
+    `desde` (incluido) y `hasta` (excluido) recortan por fecha del pedido. Como
+    en el cubo, `pedidos` sin category_name cuenta cada pedido una vez.
+    Cada periodo se etiqueta con su primer día, o con el último si
+    etiqueta="fin" (como pd.Grouper(freq="ME")).
+    """
+    if grano not in GRANOS:
+        raise ValueError(f"Grano desconocido: {grano!r} ({', '.join(GRANOS)})")
+    if etiqueta not in ("inicio", "fin"):
+        raise ValueError(f"Etiqueta desconocida: {etiqueta!r} (inicio o fin)")
+    medidas = MEDIDAS if medidas is None else ([medidas] if isinstance(medidas, str) else list(medidas))
+    por = [] if por is None else ([por] if isinstance(por, str) else list(por))
+    fuera = [d for d in por if d not in DIMENSIONES]
+    if fuera:
+        raise KeyError(f"Dimensiones que no están en la serie: {fuera}")
+
+    tabla = cargar_serie_diaria()
+    if desde is not None:
+        tabla = tabla[tabla["fecha"] >= pd.Timestamp(desde)]
+    if hasta is not None:
+        tabla = tabla[tabla["fecha"] < pd.Timestamp(hasta)]
+    periodo = tabla["fecha"].dt.to_period(grano).dt.start_time.rename("periodo")
+    sumas = tabla.groupby([periodo] + [tabla[d] for d in por], observed=True, sort=True)[
+        MEDIDAS + ["pedidos_linea1"]].sum()
+    if "category_name" not in por:
+        sumas["pedidos"] = sumas["pedidos_linea1"]
+    sumas = sumas[medidas]
+    if sumas.empty:
+        return sumas
+
+    # Todos los periodos del rango, también los que no tienen pedidos
+    fechas = sumas.index.get_level_values("periodo")
+    periodos = pd.period_range(fechas.min(), fechas.max(), freq=grano).start_time.rename("periodo")
+    if not por:
+        sumas = sumas.reindex(periodos, fill_value=0)
+    else:
+        completo = pd.MultiIndex.from_product([periodos] + [sumas.index.unique(d) for d in por],
+                                              names=["periodo"] + por)
+        sumas = sumas.reindex(completo, fill_value=0)
+    if etiqueta == "fin":
+        fin = periodos.to_period(grano).end_time.normalize().rename("periodo")
+        sumas.index = fin if not por else sumas.index.set_levels(fin, level="periodo")
+    return sumas
+
+
+def contrastes_serie(valores):
+    """
+    Tendencia y forma de una serie (Series indexada por periodo):
+    r de Pearson con el tiempo, su p-valor y la pendiente por periodo; asimetría
+    y curtosis (de exceso, como scipy.stats.skew/kurtosis) con los p-valores de
+    skewtest/kurtosistest cuando hay periodos suficientes.
+    """
+    y = np.asarray(valores, dtype="float64")
+    t = np.arange(len(y))
+    tendencia = stats.linregress(t, y)
+    resultado = {
+        "n": len(y),
+        "r": tendencia.rvalue,
+        "p_tendencia": tendencia.pvalue,
+        "pendiente": tendencia.slope,
+        "asimetria": stats.skew(y),
+        "curtosis": stats.kurtosis(y),
+        # skewtest pide al menos 8 valores y kurtosistest al menos 5
+        "p_asimetria": stats.skewtest(y).pvalue if len(y) >= 8 else np.nan,
+        "p_curtosis": stats.kurtosistest(y).pvalue if len(y) >= 5 else np.nan,
+    }
+    return pd.Series(resultado)
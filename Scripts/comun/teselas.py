@@ -0,0 +1,301 @@
+"""
+Pirámide de teselas (XYZ, Web Mercator, PNG de 256 px) en disco local para los mapas de folium.
+
+En vez de meter cada punto o línea en el HTML, se dibujan una vez por nivel de
+zoom en teselas PNG (<directorio>/<z>/<x>/<y>.png) y el mapa solo pide las que
+se ven. Las teselas se sirven desde la carpeta del HTML (ruta relativa), así
+que no hace falta red para la capa de datos:
+
+    from comun.teselas import capa_teselas, piramide_guardada, teselas_puntos
+    piramide_guardada("teselas_destinos",
+                      lambda d: teselas_puntos(d, lat, lon, colores), colores="modo")
+    capa_teselas("teselas_destinos", "Destinos").add_to(m)
+
+Para verlo sin conexión basta con abrir el HTML o servir su carpeta
+(python -m http.server). Más allá de ZOOM_MAX Leaflet amplía las del último nivel.
+
+capa_base() hace lo mismo con los países de DATA/countries.geojson (tierra,
+mar y fronteras) para tener un mapa de fondo que tampoco necesita red:
+
+    capa_base("teselas_base").add_to(m)
+
+Las librerías JS/CSS del propio mapa (Leaflet...) las copia comun.recursos.guardar_mapa().
+"""
+import json
+import os
+import shutil
+
+import folium
+import numpy as np
+from matplotlib.colors import to_rgba_array
+from PIL import Image, ImageDraw
+
+from . import datos
+
+TAMAÑO = 256
+ZOOM_MAX = 6
+# Latitud máxima de Web Mercator
+LATITUD_MAX = 85.0511
+RUTA_VACIA = "vacia.png"
+
+# Mapa de fondo sin red: países de un GeoJSON
+RUTA_PAISES = os.path.join(datos.DIR_DATOS, "countries.geojson")
+ZOOM_BASE = 5
+COLOR_MAR = "#aad3df"
+COLOR_TIERRA = "#f2efe9"
+COLOR_BORDE = "#a0a0a0"
+
+
+def a_pixeles(lat, lon, zoom):
+    """Coordenadas (x, y) en píxeles del mundo entero al nivel `zoom` (Web Mercator)."""
+    lado = TAMAÑO * 2 ** zoom
+    lat = np.radians(np.clip(np.asarray(lat, dtype="float64"), -LATITUD_MAX, LATITUD_MAX))
+    x = (np.asarray(lon, dtype="float64") + 180) / 360 * lado
+    y = (0.5 - np.log(np.tan(np.pi / 4 + lat / 2)) / (2 * np.pi)) * lado
+    return x, y
+
+
+def _colores(colores, n, opacidad):
+    """Colores (uno o uno por elemento, en cualquier formato de matplotlib) como RGBA uint8 (n, 4)."""
+    if isinstance(colores, str) or np.ndim(colores) == 0:
+        colores = [colores] * n
+    valores, codigos = np.unique(np.asarray(colores, dtype=object).astype(str), return_inverse=True)
+    rgba = to_rgba_array(list(valores))
+    rgba[:, 3] *= opacidad
+    return (rgba * 255).round().astype("uint8")[codigos]
+
+
+def _guardar_tesela(directorio, zoom, tx, ty, imagen):
+    carpeta = os.path.join(directorio, str(zoom), str(tx))
+    os.makedirs(carpeta, exist_ok=True)
+    # Compresión rápida: son muchas teselas y casi todo es transparente
+    imagen.save(os.path.join(carpeta, f"{ty}.png"), compress_level=1)
+
+
+def _agrupar(claves, elementos, n):
+    """Teselas distintas y, para cada una, sus elementos sin repetir y en orden."""
+    pares = np.unique(claves * max(n, 1) + elementos)
+    claves, elementos = np.divmod(pares, max(n, 1))
+    teselas, inicios = np.unique(claves, return_index=True)
+    return teselas, np.split(elementos, inicios[1:])
+
+
+def teselas_puntos(directorio, lat, lon, colores="red", zoom_max=ZOOM_MAX, radio=2, opacidad=0.9):
+    """
+    Dibuja los puntos (lat, lon) como círculos de `radio` píxeles en todas las
+    teselas de los niveles 0..zoom_max. `colores` es un color o uno por punto.
+    Devuelve el número de teselas escritas.
+    """
+    validos = ~(np.isnan(np.asarray(lat, dtype="float64")) | np.isnan(np.asarray(lon, dtype="float64")))
+    lat, lon = np.asarray(lat, dtype="float64")[validos], np.asarray(lon, dtype="float64")[validos]
+    rgba = _colores(colores, len(validos), opacidad)[validos]
+    # Desplazamientos del círculo
+    dy, dx = np.mgrid[-radio:radio + 1, -radio:radio + 1]
+    dentro = dx ** 2 + dy ** 2 <= radio ** 2 + radio
+    dx, dy = dx[dentro], dy[dentro]
+
+    escritas = 0
+    for zoom in range(zoom_max + 1):
+        x, y = a_pixeles(lat, lon, zoom)
+        x, y = np.floor(x).astype("int64"), np.floor(y).astype("int64")
+        lado = 2 ** zoom
+        # Cada punto va a todas las teselas que toca su círculo (hasta 4 si cae en un borde)
+        claves, puntos = [], []
+        for ox in (-radio, radio):
+            for oy in (-radio, radio):
+                tx, ty = (x + ox) // TAMAÑO, (y + oy) // TAMAÑO
+                ok = (tx >= 0) & (tx < lado) & (ty >= 0) & (ty < lado)
+                claves.append(tx[ok] * lado + ty[ok])
+                puntos.append(np.flatnonzero(ok))
+        teselas, grupos = _agrupar(np.concatenate(claves), np.concatenate(puntos), len(lat))
+        for clave, indices in zip(teselas, grupos):
+            tx, ty = divmod(int(clave), lado)
+            # Margen de 2 radios: el centro puede caer hasta un radio fuera de la tesela
+            margen = 2 * radio
+            lienzo = np.zeros((TAMAÑO + 2 * margen, TAMAÑO + 2 * margen, 4), dtype="uint8")
+            px = x[indices] - tx * TAMAÑO + margen
+            py = y[indices] - ty * TAMAÑO + margen
+            for ddx, ddy in zip(dx, dy):
+                lienzo[py + ddy, px + ddx] = rgba[indices]
+            recorte = lienzo[margen:margen + TAMAÑO, margen:margen + TAMAÑO]
+            _guardar_tesela(directorio, zoom, tx, ty, Image.fromarray(recorte))
+            escritas += 1
+    return escritas
+
+
+def teselas_lineas(directorio, lat1, lon1, lat2, lon2, colores="red", anchos=2, zoom_max=ZOOM_MAX,
+                   opacidad=0.8):
+    """
+    Dibuja los segmentos (lat1, lon1) -> (lat2, lon2) en los niveles 0..zoom_max.
+    `colores` y `anchos` (en píxeles) son un valor o uno por segmento; los
+    segmentos se dibujan en orden, así que los últimos quedan encima.
+    Devuelve el número de teselas escritas.
+    """
+    lat1, lon1, lat2, lon2 = (np.asarray(v, dtype="float64") for v in (lat1, lon1, lat2, lon2))
+    n = len(lat1)
+    rgba = [tuple(c) for c in _colores(colores, n, opacidad)]
+    anchos = np.broadcast_to(np.asarray(anchos, dtype="float64"), (n,))
+
+    escritas = 0
+    for zoom in range(zoom_max + 1):
+        x1, y1 = a_pixeles(lat1, lon1, zoom)
+        x2, y2 = a_pixeles(lat2, lon2, zoom)
+        lado = 2 ** zoom
+        # Teselas que toca cada segmento: se muestrea cada media tesela y cada muestra se abre
+        # medio paso más el ancho, así que ningún trozo del segmento queda sin tesela
+        paso = TAMAÑO / 2
+        pasos = np.ceil(np.hypot(x2 - x1, y2 - y1) / paso).astype("int64") + 1
+        segmento = np.repeat(np.arange(n), pasos + 1)
+        t = np.concatenate([np.linspace(0, 1, p + 1) for p in pasos]) if n else np.empty(0)
+        sx = x1[segmento] + t * (x2 - x1)[segmento]
+        sy = y1[segmento] + t * (y2 - y1)[segmento]
+        margen = paso / 2 + anchos[segmento] / 2 + 1
+        claves, segmentos = [], []
+        for ox in (-1, 1):
+            for oy in (-1, 1):
+                tx = np.floor((sx + ox * margen) / TAMAÑO).astype("int64")
+                ty = np.floor((sy + oy * margen) / TAMAÑO).astype("int64")
+                ok = (tx >= 0) & (tx < lado) & (ty >= 0) & (ty < lado)
+                claves.append(tx[ok] * lado + ty[ok])
+                segmentos.append(segmento[ok])
+        teselas, grupos = _agrupar(np.concatenate(claves), np.concatenate(segmentos), n)
+        for clave, indices in zip(teselas, grupos):
+            tx, ty = divmod(int(clave), lado)
+            imagen = Image.new("RGBA", (TAMAÑO, TAMAÑO))
+            dibujo = ImageDraw.Draw(imagen)
+            ox, oy = tx * TAMAÑO, ty * TAMAÑO
+            # Dentro de cada tesela van ordenados por segmento: se respeta el orden de dibujo
+            for i in indices:
+                dibujo.line([(x1[i] - ox, y1[i] - oy), (x2[i] - ox, y2[i] - oy)],
+                            fill=rgba[i], width=max(int(round(anchos[i])), 1))
+            _guardar_tesela(directorio, zoom, tx, ty, imagen)
+            escritas += 1
+    return escritas
+
+
+def anillos_geojson(ruta):
+    """
+    Polígonos de un GeoJSON (Polygon y MultiPolygon) como listas de anillos:
+    arrays (lon, lat), el primero el exterior y el resto los huecos.
+    """
+    with open(ruta, encoding="utf-8") as f:
+        geojson = json.load(f)
+    poligonos = []
+    for elemento in geojson.get("features", []):
+        geometria = elemento.get("geometry") or {}
+        if geometria.get("type") == "Polygon":
+            partes = [geometria["coordinates"]]
+        elif geometria.get("type") == "MultiPolygon":
+            partes = geometria["coordinates"]
+        else:
+            continue
+        poligonos += [[np.asarray(anillo, dtype="float64")[:, :2] for anillo in parte] for parte in partes if parte]
+    return poligonos
+
+
+def teselas_poligonos(directorio, poligonos, relleno=COLOR_TIERRA, borde=COLOR_BORDE, fondo=COLOR_MAR,
+                      zoom_max=ZOOM_BASE):
+    """
+    Dibuja los `poligonos` (de anillos_geojson) rellenos de `relleno` y con el
+    contorno de `borde` sobre `fondo`, en los niveles 0..zoom_max. Solo se
+    escriben las teselas que toca la caja de algún polígono; para las demás
+    (todo fondo) está la tesela vacía de piramide_guardada(vacia=fondo).
+    Devuelve el número de teselas escritas.
+    """
+    relleno, borde, fondo = (tuple(c) for c in _colores([relleno, borde, fondo], 3, 1.0))
+    escritas = 0
+    for zoom in range(zoom_max + 1):
+        lado = 2 ** zoom
+        proyectados = [[np.column_stack(a_pixeles(anillo[:, 1], anillo[:, 0], zoom)) for anillo in anillos]
+                       for anillos in poligonos]
+        # Cada polígono va a todas las teselas de su caja (con un píxel de margen para el borde)
+        claves, indices = [], []
+        for i, anillos in enumerate(proyectados):
+            x0, y0 = np.clip(((anillos[0].min(axis=0) - 1) // TAMAÑO).astype("int64"), 0, lado - 1)
+            x1, y1 = np.clip(((anillos[0].max(axis=0) + 1) // TAMAÑO).astype("int64"), 0, lado - 1)
+            tx, ty = np.meshgrid(np.arange(x0, x1 + 1), np.arange(y0, y1 + 1))
+            claves.append((tx * lado + ty).ravel())
+            indices.append(np.full(tx.size, i))
+        if not claves:
+            continue
+        teselas, grupos = _agrupar(np.concatenate(claves), np.concatenate(indices), len(poligonos))
+        for clave, grupo in zip(teselas, grupos):
+            tx, ty = divmod(int(clave), lado)
+            origen = np.array([tx * TAMAÑO, ty * TAMAÑO])
+            imagen = Image.new("RGBA", (TAMAÑO, TAMAÑO), fondo)
+            dibujo = ImageDraw.Draw(imagen)
+            for i in grupo:
+                exterior, *huecos = proyectados[i]
+                dibujo.polygon([tuple(p) for p in exterior - origen], fill=relleno)
+                for hueco in huecos:
+                    dibujo.polygon([tuple(p) for p in hueco - origen], fill=fondo)
+            # Los contornos encima de todos los rellenos, para que no los tape el país vecino
+            for i in grupo:
+                for anillo in proyectados[i]:
+                    dibujo.line([tuple(p) for p in anillo - origen], fill=borde, width=1)
+            _guardar_tesela(directorio, zoom, tx, ty, imagen)
+            escritas += 1
+    return escritas
+
+
+def piramide_guardada(directorio, dibujar, vacia=None, con_datos=True, **parametros):
+    """
+    Pirámide de `directorio`, rehecha con dibujar(directorio) solo si cambian los
+    datos (huella de la caché) o los `parametros`. Devuelve True si se ha rehecho.
+
+    `vacia` es el color de la tesela que Leaflet pone donde no hay ninguna
+    (transparente por defecto); con con_datos=False la pirámide no depende del
+    dataset (p. ej. el mapa de fondo) y solo cuentan los `parametros`.
+    """
+    ruta_huella = os.path.join(directorio, "huella.json")
+    huella = {"datos": datos.huella_datos() if con_datos and os.path.exists(datos.RUTA_CSV) else None,
+              **{k: repr(v) for k, v in parametros.items()}}
+    if vacia is not None:
+        huella["vacia"] = repr(vacia)
+    if os.path.exists(ruta_huella):
+        with open(ruta_huella, encoding="utf-8") as f:
+            guardada = json.load(f)
+        # Sin el CSV original se da por buena la pirámide guardada, como el resto de la caché
+        if huella["datos"] is None:
+            guardada["datos"] = None
+        if guardada == huella:
+            return False
+
+    tmp = directorio.rstrip(os.sep) + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    dibujar(tmp)
+    color = (0, 0, 0, 0) if vacia is None else tuple(_colores(vacia, 1, 1.0)[0])
+    Image.new("RGBA", (TAMAÑO, TAMAÑO), color).save(os.path.join(tmp, RUTA_VACIA))
+    with open(os.path.join(tmp, "huella.json"), "w", encoding="utf-8") as f:
+        json.dump(huella, f)
+    shutil.rmtree(directorio, ignore_errors=True)
+    os.replace(tmp, directorio)
+    return True
+
+
+def capa_teselas(directorio, nombre, zoom_max=ZOOM_MAX, **opciones):
+    """
+    TileLayer de folium (superpuesta) con la pirámide de `directorio`, relativa
+    a la carpeta donde se guarda el HTML.
+    """
+    url = directorio.replace(os.sep, "/").rstrip("/")
+    opciones = {"attr": nombre, "overlay": True, **opciones}
+    return folium.TileLayer(tiles=url + "/{z}/{x}/{y}.png", name=nombre, max_native_zoom=zoom_max,
+                            error_tile_url=f"{url}/{RUTA_VACIA}", **opciones)
+
+
+def capa_base(directorio, ruta=RUTA_PAISES, nombre="Países (sin red)", zoom_max=ZOOM_BASE):
+    """
+    Capa base (no superpuesta) con los países del GeoJSON `ruta` en teselas de
+    `directorio`, relativa a la carpeta del HTML. Las teselas solo se rehacen
+    si cambia el GeoJSON.
+    """
+    estado = os.stat(ruta)
+
+    def dibujar(destino):
+        teselas_poligonos(destino, anillos_geojson(ruta), zoom_max=zoom_max)
+
+    piramide_guardada(directorio, dibujar, vacia=COLOR_MAR, con_datos=False,
+                      geojson=(os.path.basename(ruta), estado.st_size, estado.st_mtime_ns), zoom=zoom_max)
+    return capa_teselas(directorio, nombre, zoom_max, overlay=False, attr=os.path.basename(ruta))
@@ -0,0 +1,81 @@
+"""
+Los K mejores grupos de una tabla agregada sin ordenarla entera.
+
+La selección es parcial (np.argpartition): de cada bloque solo se ordenan los
+K candidatos, y entre bloques se guardan solo los K mejores vistos hasta el
+momento. La memoria depende de K y del tamaño de bloque, no del número de
+claves, así que una tabla producto x mes o de rutas con millones de claves se
+puede recorrer por bloques (p. ej. agregados.bloques_agregado()):
+
+    from comun.topk import top_k
+    top10 = top_k(stats, 10, "pct_retraso", minimo=20, soporte="total_pedidos")
+
+Cada clave debe aparecer en un solo bloque (tablas ya agregadas). Con empates
+gana la fila que aparece antes, como en un ordenado estable.
+"""
+import numpy as np
+import pandas as pd
+
+
+class TopK:
+    """
+    Acumula los `k` mejores por la columna `por` (de mayor a menor, o de menor a
+    mayor con ascendente=True). Con `minimo` solo entran las filas con
+    `soporte` >= minimo (por defecto el soporte es la propia columna `por`).
+    `preparar` recibe cada bloque antes de seleccionar (p. ej. para calcular un ratio).
+    Con k <= 0 el resultado es una tabla vacía.
+    """
+
+    def __init__(self, k, por, minimo=None, soporte=None, ascendente=False, preparar=None):
+        self.k = k
+        self.por = por
+        self.minimo = minimo
+        self.soporte = soporte or por
+        self.ascendente = ascendente
+        self.preparar = preparar
+        self._mejores = None
+
+    def _seleccionar(self, tabla):
+        if self.k <= 0:
+            return tabla.iloc[:0]
+        puntos = tabla[self.por].to_numpy(dtype="float64")
+        if not self.ascendente:
+            puntos = -puntos
+        # Los NaN al final, como en sort_values
+        puntos = np.where(np.isnan(puntos), np.inf, puntos)
+        if len(puntos) > self.k:
+            umbral = puntos[np.argpartition(puntos, self.k - 1)[:self.k]].max()
+            # Los empatados con el último entran como candidatos para desempatar por posición
+            candidatos = np.flatnonzero(puntos <= umbral)
+        else:
+            candidatos = np.arange(len(puntos))
+        orden = candidatos[np.lexsort((candidatos, puntos[candidatos]))][:self.k]
+        return tabla.iloc[orden]
+
+    def añadir(self, bloque):
+        """Añade un bloque (DataFrame) y se queda con los k mejores hasta ahora."""
+        if self.preparar is not None:
+            bloque = self.preparar(bloque)
+        if self.minimo is not None:
+            bloque = bloque[bloque[self.soporte] >= self.minimo]
+        if self._mejores is not None:
+            bloque = pd.concat([self._mejores, bloque])
+        self._mejores = self._seleccionar(bloque)
+        return self
+
+    def resultado(self):
+        """Los k mejores, ordenados (None si no se ha añadido nada)."""
+        return self._mejores
+
+
+def top_k(tabla, k, por, minimo=None, soporte=None, ascendente=False):
+    """Las `k` filas de `tabla` con mayor (o menor) `por`, con soporte mínimo opcional."""
+    return TopK(k, por, minimo, soporte, ascendente).añadir(tabla).resultado()
+
+
+def top_k_bloques(bloques, k, por, minimo=None, soporte=None, ascendente=False, preparar=None):
+    """Como top_k() pero recorriendo un iterable de bloques (DataFrames con claves distintas)."""
+    acumulado = TopK(k, por, minimo, soporte, ascendente, preparar)
+    for bloque in bloques:
+        acumulado.añadir(bloque)
+    return acumulado.resultado()
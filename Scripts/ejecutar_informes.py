@@ -0,0 +1,63 @@
+"""
+Regenera los informes de la Parte 1 y los mapas de la Parte 2 cargando el dataset una sola vez.
+
+    python ejecutar_informes.py              # todos los informes, uno tras otro
+    python ejecutar_informes.py Parte\ 2     # solo los que contienen "Parte 2" en la ruta
+    python ejecutar_informes.py -j 8         # repartidos entre 8 procesos (-j 0: todos los núcleos)
+    python ejecutar_informes.py --lista      # muestra los informes disponibles
+
+Sin pantalla (p. ej. por la noche) las figuras se pueden guardar en segundo plano
+y en otros formatos o resoluciones:
+
+    python ejecutar_informes.py --figuras 2                  # 2 procesos guardando figuras
+    python ejecutar_informes.py --formatos png,webp --dpi 150
+    python ejecutar_informes.py --destino "ventas_tiempo:svg" --destino "Parte 1/G2:png@600"
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from comun.figuras import FORMATOS, Salida, comprobar_formatos, destino_desde_texto
+from comun.informes import ejecutar_informes, resumen, seleccionar_informes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ejecuta los informes con el dataset compartido.")
+    parser.add_argument("filtros", nargs="*", help="textos que debe contener la ruta del informe")
+    parser.add_argument("-j", "--procesos", type=int, default=1,
+                        help="número de procesos en paralelo (0 = uno por núcleo; por defecto 1)")
+    parser.add_argument("--lista", action="store_true", help="lista los informes y termina")
+    parser.add_argument("--figuras", type=int, default=0,
+                        help="procesos que guardan las figuras en segundo plano (por defecto 0: en el momento)")
+    parser.add_argument("--formatos", help=f"formatos de las figuras separados por comas ({', '.join(FORMATOS)})")
+    parser.add_argument("--dpi", type=float, help="dpi de todas las figuras (por defecto los de cada script)")
+    parser.add_argument("--destino", action="append", default=[], metavar="PATRON:FORMATOS[@DPI]",
+                        help="formatos y dpi de las figuras cuyo fichero contiene PATRON en la ruta (se puede repetir)")
+    args = parser.parse_args()
+
+    try:
+        formatos = args.formatos.lower().split(",") if args.formatos else None
+        salida = Salida(comprobar_formatos(formatos), args.dpi, [destino_desde_texto(d) for d in args.destino])
+    except ValueError as e:
+        parser.error(str(e))
+
+    informes = seleccionar_informes(args.filtros)
+    if args.lista:
+        print("\n".join(informes))
+        return 0
+    if not informes:
+        print(f"Ningún informe coincide con: {args.filtros}")
+        return 1
+
+    procesos = args.procesos if args.procesos > 0 else os.cpu_count()
+    inicio = time.perf_counter()
+    resultados = ejecutar_informes(informes, procesos=procesos, salida=salida, procesos_figuras=args.figuras)
+    print(resumen(resultados))
+    print(f"Tiempo real: {time.perf_counter() - inicio:.2f} s con {procesos} proceso(s)")
+    return 0 if all(r.ok for r in resultados) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
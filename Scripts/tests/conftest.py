@@ -0,0 +1,69 @@
+"""
+Configuración común de los tests de comun/.
+
+Los módulos de comun/ fijan sus rutas al importarse, así que SIO_DATOS se
+apunta aquí, antes de importar nada, a una carpeta temporal con el
+diccionario del repositorio. Los tests que necesitan el dataset piden el
+fixture `csv_sintetico`, que escribe un CSV pequeño con todas las columnas.
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+DIR_SCRIPTS = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIR_DATOS_TEST = tempfile.mkdtemp(prefix="sio_tests_")
+os.environ["SIO_DATOS"] = DIR_DATOS_TEST
+sys.path.insert(0, DIR_SCRIPTS)
+
+from comun import datos  # noqa: E402
+
+shutil.copy(os.path.join(DIR_SCRIPTS, "..", "DATA", os.path.basename(datos.RUTA_DICCIONARIO)), DIR_DATOS_TEST)
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(DIR_DATOS_TEST, ignore_errors=True)
+
+
+def pedidos_sinteticos(n, primer_pedido=1, desde="2015-01-01", dias=1100, semilla=0):
+    """
+    `n` líneas de pedido con todas las columnas del diccionario. Los pedidos
+    (order_id desde `primer_pedido`) tienen de 1 a 5 líneas y la fecha crece con
+    el número de pedido; lo que es del pedido se repite en todas sus líneas.
+    """
+    rng = np.random.default_rng(semilla)
+    pedidos = max(n // 3, 1)
+    order_id = np.sort(rng.integers(0, pedidos, n)) + primer_pedido
+    df = pd.DataFrame({c: rng.integers(0, 1000, n) for c, t in datos.TIPOS.items() if t in (datos.ENTERO, datos.ENTERO_PEQ)})
+    for c, t in datos.TIPOS.items():
+        if t == datos.DECIMAL:
+            df[c] = rng.gamma(2, 50, n).round(2)
+        elif t in (datos.TEXTO, datos.CATEGORIA):
+            df[c] = rng.choice([f"{c} {i}" for i in range(4)], n)
+    df["order_id"] = order_id
+    df["category_name"] = rng.choice([f"Categoría {i}" for i in range(12)], n)
+    df["late_delivery_risk"] = rng.integers(0, 2, n)
+    df["order_item_quantity"] = rng.integers(1, 5, n)
+    df["sales"] = rng.gamma(2, 100, n).round(2)
+
+    fecha = pd.Series(pd.Timestamp(desde) + pd.to_timedelta((order_id - primer_pedido) / pedidos * dias, unit="D"))
+    fecha = fecha.dt.floor("min")
+    df["order_date_dateorders"] = fecha.dt.strftime("%m/%d/%Y %H:%M")
+    envio = fecha + pd.to_timedelta(df["days_for_shipping_real"] % 7, unit="D")
+    df["shipping_date_dateorders"] = envio.dt.strftime("%m/%d/%Y %H:%M")
+    del_pedido = ["market", "shipping_mode", "order_country_en", "customer_segment", "delivery_status", "customer_id"]
+    for c in del_pedido:
+        df[c] = df.groupby("order_id")[c].transform("first")
+    return df[list(datos.TIPOS)]
+
+
+@pytest.fixture(scope="session")
+def csv_sintetico():
+    """CSV principal sintético en la carpeta de datos de los tests (se escribe una vez)."""
+    if not os.path.exists(datos.RUTA_CSV):
+        pedidos_sinteticos(6000).to_csv(datos.RUTA_CSV, index=False)
+    return datos.RUTA_CSV
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from comun import bootstrap
+from comun.bootstrap import bootstrap_regresion
+
+
+@pytest.fixture
+def pares():
+    rng = np.random.default_rng(5)
+    x = rng.uniform(0, 100, 300) + 1e4  # lejos del 0: las sumas van centradas
+    return x, 3 - 0.5 * x + rng.normal(0, 10, 300)
+
+
+def test_estimacion_igual_que_linregress(pares):
+    x, y = pares
+    b = bootstrap_regresion(x, y, remuestras=20)
+    ref = stats.linregress(x, y)
+    assert b.estimacion["r"] == pytest.approx(ref.rvalue, rel=1e-9)
+    assert b.estimacion["pendiente"] == pytest.approx(ref.slope, rel=1e-9)
+    assert b.estimacion["ordenada"] == pytest.approx(ref.intercept, rel=1e-9)
+
+
+def test_remuestras_igual_que_una_a_una(pares, monkeypatch):
+    # Lotes de 7 remuestras: cada lote con su semilla, como un bucle por remuestra
+    x, y = pares
+    monkeypatch.setattr(bootstrap, "ELEMENTOS_LOTE", 7 * len(x))
+    b = bootstrap_regresion(x, y, remuestras=30, semilla=4)
+    filas = []
+    for semilla, tamano in zip(np.random.SeedSequence(4).spawn(5), [7, 7, 7, 7, 2]):
+        for indices in np.random.default_rng(semilla).integers(0, len(x), size=(tamano, len(x))):
+            ref = stats.linregress(x[indices], y[indices])
+            filas.append([ref.rvalue, ref.slope, ref.intercept])
+    np.testing.assert_allclose(b.muestras.to_numpy(), filas, rtol=1e-7)
+
+
+def test_mismo_resultado_con_procesos(pares, monkeypatch):
+    x, y = pares
+    monkeypatch.setattr(bootstrap, "ELEMENTOS_LOTE", 50 * len(x))
+    serie = bootstrap_regresion(x, y, remuestras=200, procesos=1)
+    paralelo = bootstrap_regresion(x, y, remuestras=200, procesos=2)
+    pd.testing.assert_frame_equal(serie.muestras, paralelo.muestras)
+
+
+def test_intervalos_y_banda(pares):
+    x, y = pares
+    b = bootstrap_regresion(pd.Series(np.append(x, np.nan)), pd.Series(np.append(y, 1.0)))
+    intervalos = b.intervalos()
+    assert (intervalos["inferior"] < intervalos["estimacion"]).all()
+    assert (intervalos["estimacion"] < intervalos["superior"]).all()
+    inferior, superior = b.banda([x.min(), x.max()])
+    recta = b.estimacion["ordenada"] + b.estimacion["pendiente"] * np.array([x.min(), x.max()])
+    assert (inferior < recta).all() and (recta < superior).all()
+
+
+def test_pocos_pares():
+    with pytest.raises(ValueError):
+        bootstrap_regresion([1.0, 2.0, np.nan], [1.0, 2.0, 3.0])
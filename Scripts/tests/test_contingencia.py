@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from comun.contingencia import chi_cuadrado, tabla_contingencia, v_cramer
+
+
+@pytest.fixture
+def muestra():
+    rng = np.random.default_rng(1)
+    n = 3000
+    return pd.DataFrame({
+        "grupo": rng.choice(["A", "B", "C", "D"], n),
+        "sub": rng.choice(["x", "y"], n),
+        "clase": rng.choice(["p", "q", "r"], n, p=[0.5, 0.3, 0.2]),
+    })
+
+
+@pytest.mark.parametrize("columna", ["clase", "sub"])
+def test_chi_cuadrado_igual_que_chi2_contingency(muestra, columna):
+    # "sub" x "sub" es una 2x2: ahí se comprueba también la corrección de Yates
+    for fila in ("grupo", "sub"):
+        densa = pd.crosstab(muestra[fila], muestra[columna])
+        chi2_ref, p_ref, gl_ref, _ = stats.chi2_contingency(densa)
+        chi2, p, gl = chi_cuadrado(tabla_contingencia(muestra, fila, columna))
+        assert gl == gl_ref
+        assert chi2 == pytest.approx(chi2_ref, rel=1e-9)
+        assert p == pytest.approx(p_ref, rel=1e-6)
+
+
+def test_tabla_con_pesos_igual_que_filas(muestra):
+    conteos = muestra.groupby(["grupo", "clase"]).size().rename("n").reset_index()
+    a = chi_cuadrado(tabla_contingencia(muestra, "grupo", "clase"))
+    b = chi_cuadrado(tabla_contingencia(conteos, "grupo", "clase", pesos="n"))
+    assert a == pytest.approx(b)
+
+
+def test_v_cramer(muestra):
+    densa = pd.crosstab(muestra["grupo"], muestra["clase"])
+    chi2 = stats.chi2_contingency(densa, correction=False)[0]
+    esperado = np.sqrt(chi2 / (densa.to_numpy().sum() * (min(densa.shape) - 1)))
+    assert v_cramer(tabla_contingencia(muestra, "grupo", "clase")) == pytest.approx(esperado, rel=1e-9)
+    assert v_cramer(tabla_contingencia(muestra, "grupo", "grupo")) == pytest.approx(1.0)
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from comun import cortes, series
+
+
+def _serie_sintetica(lineas):
+    # Sustituye a series.serie() con una tabla meses x categorías de líneas (ventas = 10 por línea)
+    meses = pd.date_range("2015-01-01", periods=len(lineas), freq="MS", name="periodo")
+    tabla = pd.DataFrame(lineas, index=meses, columns=[f"c{i}" for i in range(lineas.shape[1])])
+    tabla.columns.name = "category_name"
+
+    def serie(medidas=None, grano="M", por=None, **_):
+        medidas = [medidas] if isinstance(medidas, str) else list(medidas)
+        largo = tabla.stack().rename("lineas").to_frame()
+        largo["ventas"] = 10.0 * largo["lineas"]
+        largo["pedidos"] = largo["lineas"]
+        return largo[medidas] if por else largo.groupby(level="periodo")[medidas].sum()
+    return serie
+
+
+def _lineas(rng, repartos, volumen):
+    return np.stack([rng.multinomial(v, r) for r, v in zip(repartos, volumen)])
+
+
+def test_encuentra_el_cambio_de_reparto(monkeypatch):
+    rng = np.random.default_rng(0)
+    antes, despues = np.full(6, 1 / 6), np.array([0.3, 0.1, 0.2, 0.1, 0.2, 0.1])
+    repartos = [antes] * 22 + [despues] * 14
+    monkeypatch.setattr(series, "serie", _serie_sintetica(_lineas(rng, repartos, [3000] * 36)))
+    barrido = cortes.barrido_cortes()
+    assert cortes.mejor_corte() == pd.Timestamp("2016-11-01")  # mes 23
+    assert barrido["chi2"].is_monotonic_decreasing
+    assert len(barrido) == 36 - 2 * cortes.MINIMO_MESES + 1
+
+
+def test_los_ultimos_meses_con_pocas_lineas_no_ganan(monkeypatch):
+    # Cambio real a mitad y unos últimos meses casi vacíos con otro reparto: el
+    # desplazamiento de ventas es mayor en el extremo, pero no es significativo
+    rng = np.random.default_rng(1)
+    antes, despues = np.full(6, 1 / 6), np.array([0.22, 0.12, 0.2, 0.12, 0.2, 0.14])
+    raro = np.array([0.05, 0.05, 0.05, 0.05, 0.05, 0.75])
+    repartos = [antes] * 16 + [despues] * 17 + [raro] * 3
+    volumen = [3000] * 33 + [40] * 3
+    monkeypatch.setattr(series, "serie", _serie_sintetica(_lineas(rng, repartos, volumen)))
+    barrido = cortes.barrido_cortes()
+    assert barrido["desplazamiento"].idxmax() == pd.Timestamp("2017-10-01")
+    assert barrido.index[0] == pd.Timestamp("2016-05-01")
+
+
+def test_pocos_meses(monkeypatch):
+    monkeypatch.setattr(series, "serie", _serie_sintetica(np.ones((5, 3), dtype=int)))
+    with pytest.raises(ValueError):
+        cortes.barrido_cortes()
@@ -0,0 +1,48 @@
+import os
+
+import pandas as pd
+
+from comun import anexos, cubo, datos, series
+from conftest import pedidos_sinteticos
+
+
+def _celdas_pandas(df):
+    # Referencia directa sobre todas las filas
+    df = df.assign(pedidos_linea1=(~df["order_id"].duplicated()).astype("int32"))
+    return df.groupby(cubo.DIMENSIONES, observed=True, dropna=False, sort=True).agg(
+        **{m: (c, "sum") for m, c in cubo.SUMAS.items()}, lineas=("order_id", "size"),
+        pedidos=("order_id", "nunique"), pedidos_linea1=("pedidos_linea1", "sum")).reset_index()
+
+
+def _comparar(a, b):
+    # Las categorías pueden salir en otro orden según el camino; se comparan como texto
+    a, b = (t.astype({c: str for c in t.columns if isinstance(t[c].dtype, pd.CategoricalDtype)}) for t in (a, b))
+    pd.testing.assert_frame_equal(a.sort_values(cubo.DIMENSIONES, ignore_index=True),
+                                  b.sort_values(cubo.DIMENSIONES, ignore_index=True), check_dtype=False)
+
+
+def test_cubo_por_bloques_igual_que_pandas(csv_sintetico):
+    # Bloques pequeños: hay pedidos partidos entre bloques
+    celdas = cubo.celdas_por_bloques(datos.cargar_datos(cubo.COLUMNAS).pipe(
+        lambda df: [df.iloc[i:i + 500] for i in range(0, len(df), 500)]))
+    _comparar(celdas, _celdas_pandas(datos.cargar_datos(cubo.COLUMNAS)))
+
+
+def test_anexar_igual_que_reconstruir(csv_sintetico, tmp_path):
+    cubo.construir_cubo(forzar=True)
+    series.construir_serie(forzar=True)
+
+    # Pedidos nuevos, posteriores al histórico
+    ruta = os.path.join(tmp_path, "pedidos_2018_02.csv")
+    pedidos_sinteticos(1500, primer_pedido=10 ** 6, desde="2018-01-10", dias=40, semilla=7).to_csv(ruta, index=False)
+    assert anexos.anexar_datos(ruta) is not None
+    assert anexos.anexar_datos(ruta) is None  # el mismo fichero no se anexa dos veces
+
+    anexado, serie_anexada = cubo.cargar_cubo(), series.cargar_serie_diaria()
+    cubo.construir_cubo(forzar=True)
+    series.construir_serie(forzar=True)
+    _comparar(anexado, cubo.cargar_cubo())
+    pd.testing.assert_frame_equal(serie_anexada.astype({c: str for c in series.DIMENSIONES}),
+                                  series.cargar_serie_diaria().astype({c: str for c in series.DIMENSIONES}),
+                                  check_dtype=False)
+    _comparar(anexado, _celdas_pandas(datos.cargar_datos(cubo.COLUMNAS)))
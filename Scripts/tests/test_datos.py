@@ -0,0 +1,31 @@
+import os
+
+import pandas as pd
+
+from comun import datos
+
+
+def test_particiones_del_rango(csv_sintetico):
+    datos.construir_cache()
+    carpetas = datos.particiones(desde="2016-03-15", hasta="2016-06-01")
+    # El mes de `desde` entra entero; el de `hasta` no
+    assert carpetas == [os.path.join("anio=2016", f"mes={m:02d}") for m in (3, 4, 5)]
+    assert all(datos.SIN_FECHA not in f for f in datos.partes_cache(desde="2016-03-15"))
+
+
+def test_cargar_rango_igual_que_filtrar(csv_sintetico):
+    columnas = ["order_id", "sales"]
+    todo = datos.cargar_datos(columnas + ["order_date_dateorders"])
+    fecha = todo["order_date_dateorders"]
+    esperado = todo.loc[(fecha >= "2016-03-15") & (fecha < "2016-06-01"), columnas].reset_index(drop=True)
+    rango = datos.cargar_datos(columnas, desde="2016-03-15", hasta="2016-06-01")
+    pd.testing.assert_frame_equal(rango, esperado)
+    # Solo se leen los ficheros de esos meses
+    leidas = sum(pd.read_parquet(f, columns=["order_id"]).shape[0] for f in datos.partes_cache("2016-03-15", "2016-06-01"))
+    assert leidas < len(todo)
+    assert leidas == ((fecha >= "2016-03-01") & (fecha < "2016-06-01")).sum()
+
+
+def test_rango_sin_meses(csv_sintetico):
+    vacio = datos.cargar_datos(["order_id", "sales"], desde="2030-01-01")
+    assert vacio.empty and list(vacio.columns) == ["order_id", "sales"]
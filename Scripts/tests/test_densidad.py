@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from comun.densidad import ancho_scott, densidad_guardada, densidad_rejilla, niveles_masa
+
+
+@pytest.fixture
+def puntos():
+    rng = np.random.default_rng(6)
+    x = np.concatenate([rng.normal(-20, 8, 700), rng.normal(30, 5, 300)])
+    y = np.concatenate([rng.normal(10, 6, 700), rng.normal(-15, 10, 300)])
+    return x, y, rng.uniform(0.5, 2, 1000)
+
+
+def _directa(x, y, pesos, hx, hy, centros_x, centros_y):
+    # Suma del núcleo de cada punto en cada centro de la rejilla (lo que hace kdeplot)
+    nx = np.exp(-0.5 * ((centros_x[None, :] - x[:, None]) / hx) ** 2) / (hx * np.sqrt(2 * np.pi))
+    ny = np.exp(-0.5 * ((centros_y[None, :] - y[:, None]) / hy) ** 2) / (hy * np.sqrt(2 * np.pi))
+    return (ny * pesos[:, None]).T @ nx / pesos.sum()
+
+
+@pytest.mark.parametrize("con_pesos", [False, True])
+def test_igual_que_la_suma_directa_de_nucleos(puntos, con_pesos):
+    x, y, pesos = puntos
+    pesos = pesos if con_pesos else None
+    d = densidad_rejilla(x, y, pesos, celdas=(240, 200))
+    hx, hy = d.ancho_banda
+    assert (hx, hy) == pytest.approx(ancho_scott(x, y, pesos))
+    directa = _directa(x, y, np.ones_like(x) if pesos is None else pesos, hx, hy, d.x, d.y)
+    # La única diferencia es llevar cada punto al centro de su celda
+    assert np.abs(d.valores - directa).max() <= 0.01 * directa.max()
+    dx, dy = np.diff(d.bordes_x)[0], np.diff(d.bordes_y)[0]
+    assert d.valores.sum() * dx * dy == pytest.approx(1, abs=1e-3)
+
+
+def test_niveles_de_masa(puntos):
+    x, y, _ = puntos
+    d = densidad_rejilla(x, y, celdas=(100, 100))
+    niveles = niveles_masa(d, umbral=0.05)
+    assert np.all(np.diff(niveles) > 0)
+    # Por debajo del primer nivel queda el 5 % de la masa
+    assert d.valores[d.valores < niveles[0]].sum() / d.valores.sum() == pytest.approx(0.05, abs=0.01)
+
+
+def test_densidad_guardada_no_vuelve_a_los_puntos(puntos):
+    x, y, _ = puntos
+    llamadas = []
+
+    def leer():
+        llamadas.append(1)
+        return x, y, None
+    primera = densidad_guardada("test_puntos", leer, celdas=(60, 40), ajuste=1.5)
+    segunda = densidad_guardada("test_puntos", leer, celdas=(60, 40), ajuste=1.5)
+    np.testing.assert_array_equal(primera.valores, segunda.valores)
+    assert len(llamadas) == 1
+    # Con otros parámetros se recalcula
+    densidad_guardada("test_puntos", leer, celdas=(60, 40), ajuste=1.0)
+    assert len(llamadas) == 2
+
+
+def test_pocos_puntos():
+    with pytest.raises(ValueError):
+        densidad_rejilla([1.0, np.nan], [1.0, 2.0])
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from comun.descriptivos import PRECISION_CUANTILES, combinar_resumenes, cuantiles, describir, resumen_total, resumir
+
+
+@pytest.fixture
+def ventas():
+    rng = np.random.default_rng(3)
+    n = 5000
+    df = pd.DataFrame({
+        "categoria": pd.Categorical(rng.choice(["a", "b", "c"], n)),
+        # Asimétrica, con negativos y algún nulo
+        "valor": rng.gamma(2, 100, n) - 50,
+    })
+    df.loc[df.sample(50, random_state=0).index, "valor"] = np.nan
+    return df
+
+
+def _referencia(df):
+    g = df.groupby("categoria", observed=True)["valor"]
+    tabla = g.describe()
+    tabla["sum"] = g.sum()
+    tabla["skewness"] = g.skew()
+    tabla["kurtosis"] = g.apply(pd.Series.kurt)
+    return tabla
+
+
+def test_describir_igual_que_pandas(ventas):
+    tabla = describir(resumir(ventas, "valor", "categoria"))
+    referencia = _referencia(ventas)
+    pd.testing.assert_frame_equal(tabla[referencia.columns], referencia, check_names=False, rtol=1e-9)
+
+
+def test_combinar_resumenes_de_bloques(ventas):
+    # Dos mitades combinadas dan lo mismo que el DataFrame entero (cuantiles incluidos)
+    combinado = combinar_resumenes(resumir(ventas.iloc[:1234], "valor", "categoria"),
+                                   resumir(ventas.iloc[1234:], "valor", "categoria"))
+    pd.testing.assert_frame_equal(describir(combinado), describir(resumir(ventas, "valor", "categoria")), rtol=1e-9)
+
+
+def test_resumen_total(ventas):
+    total = describir(resumen_total(resumir(ventas, "valor", "categoria"), "Total")).loc["Total"]
+    x = ventas["valor"].dropna()
+    assert total["count"] == len(x)
+    assert total["std"] == pytest.approx(x.std(), rel=1e-9)
+    assert total["skewness"] == pytest.approx(x.skew(), rel=1e-9)
+    assert total["kurtosis"] == pytest.approx(x.kurt(), rel=1e-9)
+    assert total["50%"] == pytest.approx(x.median())
+
+
+def test_cuantiles_del_boceto(ventas):
+    # Por bloques los cuantiles salen del boceto: error relativo acotado
+    boceto = combinar_resumenes(resumir(ventas.iloc[:2000], "valor", "categoria", exactos=False),
+                                resumir(ventas.iloc[2000:], "valor", "categoria", exactos=False))
+    qs = (0.1, 0.25, 0.5, 0.75, 0.9)
+    aproximados = cuantiles(boceto, qs)
+    # Cada cuantil cae entre las dos observaciones que lo rodean, con el margen relativo de la cubeta
+    for grupo, x in ventas.groupby("categoria", observed=True)["valor"]:
+        x = np.sort(x.dropna().to_numpy())
+        for q in qs:
+            rango = q * (len(x) - 1)
+            bajo, alto = x[int(np.floor(rango))], x[int(np.ceil(rango))]
+            margen = PRECISION_CUANTILES * max(abs(bajo), abs(alto)) + 1e-12
+            assert bajo - margen <= aproximados.loc[grupo, q] <= alto + margen
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from comun import datos
+from comun.distintos import (PRECISION_DISTINTOS, boceto_distintos, cargar_boceto, combinar_distintos,
+                             construir_boceto, contar_distintos, distintos_exactos)
+
+# Error relativo típico de HyperLogLog; los tests admiten tres veces el típico
+ERROR_TIPICO = 1.04 / np.sqrt(2 ** PRECISION_DISTINTOS)
+
+
+@pytest.mark.parametrize("distintos", [50, 2_000, 40_000, 300_000])
+def test_error_dentro_de_la_cota(distintos):
+    rng = np.random.default_rng(distintos)
+    # Cada valor repetido varias veces: lo que cuenta es el número de distintos
+    valores = rng.permutation(np.repeat(np.arange(distintos) * 7919 + 13, 3))
+    estimado = contar_distintos(boceto_distintos(pd.DataFrame({"id": valores}), "id"))
+    assert abs(estimado - distintos) / distintos <= 3 * ERROR_TIPICO
+
+
+def test_error_por_grupo():
+    rng = np.random.default_rng(4)
+    df = pd.DataFrame({"grupo": rng.choice(["a", "b", "c"], 200_000), "id": rng.integers(0, 60_000, 200_000)})
+    estimados = contar_distintos(boceto_distintos(df, "id", "grupo"))
+    exactos = df.groupby("grupo")["id"].nunique()
+    error = (estimados - exactos).abs() / exactos
+    assert (error <= 3 * ERROR_TIPICO).all()
+
+
+def test_combinar_es_la_union():
+    # El boceto de dos bloques combinados es exactamente el del conjunto entero
+    rng = np.random.default_rng(5)
+    df = pd.DataFrame({"grupo": rng.choice(["a", "b"], 50_000), "id": rng.integers(0, 20_000, 50_000)})
+    combinado = combinar_distintos(boceto_distintos(df.iloc[:17_000], "id", "grupo"),
+                                   boceto_distintos(df.iloc[17_000:], "id", "grupo"))
+    pd.testing.assert_frame_equal(combinado, boceto_distintos(df, "id", "grupo"), check_dtype=False)
+
+
+def test_sin_valores():
+    assert contar_distintos(boceto_distintos(pd.DataFrame({"id": [np.nan, np.nan]}), "id")) == 0
+
+
+def test_distintos_exactos(csv_sintetico):
+    df = datos.cargar_datos(["customer_segment", "customer_id"])
+    assert distintos_exactos("customer_id", filas=700) == df["customer_id"].nunique()
+    por_segmento = distintos_exactos("customer_id", "customer_segment", filas=700)
+    pd.testing.assert_series_equal(por_segmento, df.groupby("customer_segment", observed=True)["customer_id"].nunique(),
+                                   check_names=False)
+
+
+def test_boceto_guardado_en_un_rango_de_meses(csv_sintetico):
+    # Los meses guardados se combinan sin volver a las filas
+    construir_boceto("clientes", forzar=True)
+    df = datos.cargar_datos(["order_date_dateorders", "customer_segment", "customer_id"])
+    df = df[df["order_date_dateorders"] >= "2016-06-01"]
+    estimados = contar_distintos(cargar_boceto("clientes", desde="2016-06-01"), "customer_segment")
+    exactos = df.groupby("customer_segment", observed=True)["customer_id"].nunique()
+    for segmento, n in exactos.items():
+        assert abs(estimados[segmento] - n) / n <= 3 * ERROR_TIPICO
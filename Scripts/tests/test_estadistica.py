@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+from statsmodels.stats.multitest import multipletests
+
+from comun.estadistica import agrupar_momentos, ajustar_p, anova, combinar_momentos, momentos, welch_por_pares
+
+
+@pytest.fixture
+def muestra():
+    rng = np.random.default_rng(1)
+    n = 3000
+    grupo = rng.choice(["A", "B", "C", "D"], n)
+    return pd.DataFrame({
+        "grupo": grupo,
+        "sub": rng.choice(["x", "y"], n),
+        # Medias y varianzas distintas por grupo
+        "valor": rng.normal(0, 1, n) * np.where(grupo == "A", 3, 1) + np.where(grupo == "B", 0.3, 0),
+    })
+
+
+def _por_grupo(df):
+    return {g: d["valor"].to_numpy() for g, d in df.groupby("grupo")}
+
+
+def test_anova_igual_que_f_oneway(muestra):
+    F, p = anova(momentos(muestra, "grupo", "valor"))
+    F_ref, p_ref = stats.f_oneway(*_por_grupo(muestra).values())
+    assert F == pytest.approx(F_ref, rel=1e-9)
+    assert p == pytest.approx(p_ref, rel=1e-6, abs=1e-300)
+
+
+def test_anova_con_momentos_de_bloques(muestra):
+    # Los momentos de dos mitades (y de subgrupos) se suman sin cambiar el contraste
+    m = combinar_momentos(momentos(muestra.iloc[:1000], ["grupo", "sub"], "valor"),
+                          momentos(muestra.iloc[1000:], ["grupo", "sub"], "valor"))
+    F, _ = anova(agrupar_momentos(m, "grupo"))
+    assert F == pytest.approx(stats.f_oneway(*_por_grupo(muestra).values())[0], rel=1e-9)
+
+
+def test_welch_igual_que_ttest_ind(muestra):
+    pares = welch_por_pares(momentos(muestra, "grupo", "valor"))
+    valores = _por_grupo(muestra)
+    assert len(pares) == 6
+    for fila in pares.itertuples():
+        ref = stats.ttest_ind(valores[fila[1]], valores[fila[2]], equal_var=False)
+        assert fila.t == pytest.approx(ref.statistic, rel=1e-9)
+        assert fila.p_valor == pytest.approx(ref.pvalue, rel=1e-6, abs=1e-300)
+
+
+@pytest.mark.parametrize("metodo, referencia", [("holm", "holm"), ("bh", "fdr_bh"), ("bonferroni", "bonferroni")])
+def test_ajustar_p_igual_que_multipletests(metodo, referencia):
+    p = np.random.default_rng(2).uniform(0, 0.2, 25)
+    p[[3, 7]] = p[5]  # empates
+    np.testing.assert_allclose(ajustar_p(p, metodo), multipletests(p, method=referencia)[1], rtol=1e-12)
+
+
+def test_ajustar_p_deja_fuera_los_nan():
+    p = np.array([0.01, np.nan, 0.04, 0.03])
+    ajustados = ajustar_p(p, "holm")
+    assert np.isnan(ajustados[1])
+    np.testing.assert_allclose(ajustados[[0, 2, 3]], multipletests(p[[0, 2, 3]], method="holm")[1])
+
+
+def test_ajustar_p_metodo_desconocido():
+    with pytest.raises(ValueError):
+        ajustar_p([0.1, 0.2], "sidak")
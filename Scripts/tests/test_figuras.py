@@ -0,0 +1,60 @@
+import os
+
+import matplotlib.pyplot as plt
+import pytest
+
+from comun.figuras import Destino, Salida, destino_desde_texto, guardado_figuras
+
+
+def _figura():
+    fig, ax = plt.subplots(figsize=(2, 2))
+    ax.plot([1, 2, 3], [3, 1, 2])
+    return fig
+
+
+def test_ficheros_por_destino():
+    salida = Salida(formatos=["png"], dpi=150, destinos=[Destino("G6", ["svg", "pdf"]), Destino("G6/mapa", ["jpg"])])
+    assert salida.ficheros("a/G2/x.png", 300) == [("a/G2/x.png", "png", 150)]
+    # Gana el primer destino que coincide; sin dpi propio se queda el de la salida
+    assert salida.ficheros("a/G6/mapa.png") == [("a/G6/mapa.svg", "svg", 150), ("a/G6/mapa.pdf", "pdf", 150)]
+    assert Salida().ficheros("x.svg", 300) == [("x.svg", "svg", 300)]
+
+
+def test_destino_desde_texto():
+    assert destino_desde_texto("Parte 1:png, webp@150") == Destino("Parte 1", ["png", "webp"], 150.0)
+    assert destino_desde_texto("C:/informes:svg") == Destino("C:/informes", ["svg"], None)
+    with pytest.raises(ValueError):
+        destino_desde_texto("svg")
+    with pytest.raises(ValueError):
+        destino_desde_texto("G6:gif")
+
+
+@pytest.mark.parametrize("procesos", [0, 2])
+def test_guardado_en_segundo_plano(tmp_path, procesos):
+    salida = Salida(formatos=["png", "svg"], dpi=50)
+    with guardado_figuras(salida, procesos=procesos) as guardado:
+        _figura()
+        plt.savefig(os.path.join(tmp_path, "grafico.png"), dpi=300)
+    plt.close("all")
+    with open(os.path.join(tmp_path, "grafico.png"), "rb") as f:
+        assert f.read(8) == b"\x89PNG\r\n\x1a\n"
+    assert os.path.getsize(os.path.join(tmp_path, "grafico.svg")) > 0
+    assert sorted(os.path.basename(r) for r in guardado.escritos) == ["grafico.png", "grafico.svg"]
+
+
+def test_errores_del_pool(tmp_path):
+    # Un error en el pool no para el bloque: queda en guardado.errores con la etiqueta
+    with guardado_figuras(procesos=1) as guardado:
+        guardado.etiqueta = "informe"
+        _figura().savefig(os.path.join(tmp_path, "no_existe", "grafico.png"))
+    plt.close("all")
+    assert [(e, os.path.basename(r)) for e, r, _ in guardado.errores] == [("informe", "grafico.png")]
+    assert "FileNotFoundError" in guardado.errores[0][2]
+    assert guardado.escritos == []
+
+
+def test_sin_pool_los_errores_se_lanzan(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        with guardado_figuras():
+            _figura().savefig(os.path.join(tmp_path, "no_existe", "grafico.png"))
+    plt.close("all")
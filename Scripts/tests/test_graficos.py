@@ -0,0 +1,53 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from comun.graficos import dispersion_densidad, rejilla_densidad
+
+
+def _puntos():
+    rng = np.random.default_rng(4)
+    x, y = rng.normal(0, 1, 20_000), rng.gamma(2, 3, 20_000)
+    x[::97] = np.nan
+    return x, y, x * 2 + y
+
+
+def test_conteos_igual_que_histogram2d():
+    x, y, _ = _puntos()
+    rejilla, bordes_x, bordes_y = rejilla_densidad(x, y, celdas=50)
+    validos = ~np.isnan(x)
+    conteos, bx, by = np.histogram2d(x[validos], y[validos], bins=50)
+    np.testing.assert_array_equal(rejilla, conteos)
+    np.testing.assert_allclose(bordes_x, bx)
+    np.testing.assert_allclose(bordes_y, by)
+    assert rejilla.sum() == validos.sum()
+
+
+def test_media_por_celda_igual_que_groupby():
+    x, y, valores = _puntos()
+    rejilla, bordes_x, bordes_y = rejilla_densidad(x, y, valores, celdas=[12, 8])
+    df = pd.DataFrame({"x": x, "y": y, "v": valores}).dropna()
+    # Celda de cada punto como la de histogram2d (el borde final cuenta en la última)
+    df["i"] = np.clip(np.searchsorted(bordes_x, df["x"], side="right") - 1, 0, 11)
+    df["j"] = np.clip(np.searchsorted(bordes_y, df["y"], side="right") - 1, 0, 7)
+    medias = df.groupby(["i", "j"])["v"].mean()
+    esperado = np.full((12, 8), np.nan)
+    esperado[medias.index.get_level_values("i"), medias.index.get_level_values("j")] = medias
+    np.testing.assert_allclose(rejilla, esperado, rtol=1e-9)
+
+
+def test_sin_puntos_y_constante():
+    rejilla, bordes_x, _ = rejilla_densidad([], [], celdas=10)
+    assert rejilla.shape == (10, 10) and rejilla.sum() == 0 and bordes_x[0] == 0
+    rejilla, bordes_x, _ = rejilla_densidad([3.0] * 5, [1.0, 2.0, 3.0, 4.0, 5.0], celdas=10)
+    assert rejilla.sum() == 5 and bordes_x[0] < 3 < bordes_x[-1]
+
+
+def test_dispersion_pinta_la_rejilla():
+    x, y, _ = _puntos()
+    fig, ax = plt.subplots()
+    imagen = dispersion_densidad(x, y, ax=ax, celdas=40)
+    assert imagen.get_array().shape == (40, 40)
+    # Las celdas vacías no se pintan
+    assert np.ma.count(imagen.get_array()) == np.count_nonzero(rejilla_densidad(x, y, celdas=40)[0])
+    plt.close(fig)
@@ -0,0 +1,30 @@
+import pandas as pd
+import pytest
+
+from comun import cubo, datos
+from comun.kpis import RATIOS, Ratio, ratios_cubo
+
+
+def _referencia(df, dimension, ratio):
+    # El cociente directo sobre las filas del dataset
+    g = df.groupby(dimension, observed=True)
+    num = g[ratio.numerador[0]].agg(ratio.numerador[1])
+    den = g[ratio.denominador[0]].agg(ratio.denominador[1])
+    return num / den * ratio.escala
+
+
+@pytest.mark.parametrize("nombre", list(RATIOS))
+def test_ratios_del_cubo_igual_que_los_datos(csv_sintetico, nombre):
+    cubo.construir_cubo(forzar=True)
+    df = datos.cargar_datos()
+    for dimension in ("category_name", "market"):
+        resultado = ratios_cubo(dimension, nombre)[nombre]
+        referencia = _referencia(df, dimension, RATIOS[nombre])
+        resultado.index, referencia.index = resultado.index.astype(str), referencia.index.astype(str)
+        pd.testing.assert_series_equal(resultado.sort_index(), referencia.sort_index(),
+                                       check_names=False, rtol=1e-9)
+
+
+def test_ratio_fuera_del_cubo(csv_sintetico):
+    with pytest.raises(KeyError):
+        ratios_cubo("market", [("clientes", Ratio(("customer_id", "nunique"), ("order_id", "nunique")))])
@@ -0,0 +1,44 @@
+import html
+import json
+import re
+
+import folium
+import pandas as pd
+
+from comun.mapas import COLOR_DEFECTO, cluster_rapido
+
+
+def _puntos():
+    return pd.DataFrame({
+        "lat": [40.4167754, -33.86882, 51.5],
+        "lon": [-3.7037902, 151.20929, -0.12],
+        "modo": ["Same Day", "<script>alert(1)</script>", "Same Day"],
+        "ciudad": ["A Coruña & Ferrol", "Sydney", 'Londres "centro"'],
+        "pedidos": [3, 12, 7],
+    })
+
+
+def test_filas_escapadas_ida_y_vuelta():
+    df = _puntos()
+    capa = cluster_rapido(df, "lat", "lon", "modo", colores={"Same Day": "red"},
+                          campos=[("Modo", "modo"), ("Ciudad", "ciudad"), ("Pedidos", "pedidos")])
+    filas = capa.data
+    # Coordenadas redondeadas, código de categoría y campos extra en orden
+    assert filas[0][:2] == [40.41678, -3.70379]
+    assert [html.unescape(f[3]) for f in filas] == df["ciudad"].tolist()
+    assert [f[4] for f in filas] == [3, 12, 7] and all(isinstance(f[4], int) for f in filas)
+
+    # Las categorías van escapadas en el callback, en el orden de los códigos
+    categorias = json.loads(re.search(r"var categorias = (\[.*?\]);", capa.callback).group(1))
+    assert [html.unescape(categorias[f[2]]) for f in filas] == df["modo"].tolist()
+    colores = json.loads(re.search(r"var iconos = (\[.*?\])\.map", capa.callback).group(1))
+    assert [colores[f[2]] for f in filas] == ["red", COLOR_DEFECTO, "red"]
+
+
+def test_html_sin_etiquetas_de_los_datos():
+    m = folium.Map()
+    cluster_rapido(_puntos(), "lat", "lon", "modo", campos=[("<i>Ciudad</i>", "ciudad")]).add_to(m)
+    pagina = m.get_root().render()
+    assert "<script>alert(1)</script>" not in pagina
+    assert "<i>Ciudad</i>" not in pagina
+    assert "&lt;script&gt;alert(1)&lt;/script&gt;" in pagina
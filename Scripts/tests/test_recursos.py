@@ -0,0 +1,72 @@
+import os
+import warnings
+
+import folium
+import pytest
+
+from comun import recursos
+
+
+@pytest.fixture
+def sin_red(monkeypatch, tmp_path):
+    # Caché de recursos vacía y ninguna descarga posible
+    monkeypatch.setattr(recursos, "DIR_RECURSOS", str(tmp_path / "recursos"))
+
+    def descargar(url, ruta):
+        raise OSError(f"sin red: {url}")
+    monkeypatch.setattr(recursos, "_descargar", descargar)
+    return tmp_path
+
+
+def _enlaces(mapa):
+    return [url for _, url in recursos._ENLACE.findall(mapa.get_root().render())]
+
+
+def _llenar(urls):
+    # Lo que se haría a mano: cada URL en host/ruta; los CSS enlazan una fuente relativa
+    for url in urls:
+        ruta = os.path.join(recursos.DIR_RECURSOS, *recursos.ruta_local(url).split("/"))
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        with open(ruta, "w", encoding="utf-8") as f:
+            f.write('@font-face { src: url("../fonts/letra.woff2?v=4#iefix"); }' if url.endswith(".css") else "//")
+        if url.endswith(".css"):
+            fuente = os.path.join(os.path.dirname(os.path.dirname(ruta)), "fonts", "letra.woff2")
+            os.makedirs(os.path.dirname(fuente), exist_ok=True)
+            open(fuente, "w").close()
+
+
+def test_guardar_con_la_cache_llena(sin_red):
+    mapa = folium.Map(tiles=None)
+    urls = _enlaces(mapa)
+    assert urls
+    _llenar(urls)
+    ruta = os.path.join(sin_red, "mapas", "mapa.html")
+    os.makedirs(os.path.dirname(ruta))
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        recursos.guardar_mapa(mapa, ruta)
+
+    with open(ruta, encoding="utf-8") as f:
+        html = f.read()
+    assert not any(url in html for url in urls)
+    for url in urls:
+        relativa = recursos.ruta_local(url)
+        assert f'"lib/{relativa}"' in html
+        assert os.path.exists(os.path.join(sin_red, "mapas", "lib", *relativa.split("/")))
+        if url.endswith(".css"):
+            # La fuente que enlaza el CSS también se copia, en su ruta relativa
+            fuente = os.path.join(os.path.dirname(os.path.dirname(relativa)), "fonts", "letra.woff2")
+            assert os.path.exists(os.path.join(sin_red, "mapas", "lib", *fuente.split("/")))
+
+
+def test_sin_copia_se_queda_el_cdn(sin_red):
+    mapa = folium.Map(tiles=None)
+    urls = _enlaces(mapa)
+    _llenar(urls[1:])
+    ruta = os.path.join(sin_red, "mapa.html")
+    with pytest.warns(UserWarning, match="Sin copia local"):
+        recursos.guardar_mapa(mapa, ruta)
+    with open(ruta, encoding="utf-8") as f:
+        html = f.read()
+    assert urls[0] in html
+    assert f'"lib/{recursos.ruta_local(urls[1])}"' in html
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from comun import datos
+from comun.series import serie
+
+
+def test_meses_etiquetados_al_final(csv_sintetico):
+    # Las mismas etiquetas y sumas que el groupby con freq="ME" de los informes originales
+    df = datos.cargar_datos(["order_date_dateorders", "order_item_total"])
+    esperado = df.groupby(pd.Grouper(key="order_date_dateorders", freq="ME"))["order_item_total"].sum()
+    obtenido = serie("total", grano="M", etiqueta="fin")["total"]
+    pd.testing.assert_series_equal(obtenido, esperado, check_names=False, check_index_type=False, check_freq=False)
+
+
+@pytest.mark.parametrize("grano, regla", [("W", dict(rule="W-MON", label="left", closed="left")),
+                                          ("M", dict(rule="MS")), ("Q", dict(rule="QS"))])
+def test_grano_igual_que_resample(csv_sintetico, grano, regla):
+    # Periodos etiquetados con su primer día; los que no tienen pedidos, a 0
+    df = datos.cargar_datos(["order_date_dateorders", "sales", "order_item_quantity"])
+    esperado = df.resample(on="order_date_dateorders", **regla)[["sales", "order_item_quantity"]].sum()
+    obtenido = serie(["ventas", "articulos"], grano=grano)
+    np.testing.assert_array_equal(obtenido.index, esperado.index)
+    np.testing.assert_allclose(obtenido.to_numpy(), esperado.to_numpy(), rtol=1e-9)
+
+
+def test_por_mercado_en_un_rango(csv_sintetico):
+    df = datos.cargar_datos(["order_date_dateorders", "market", "order_id", "sales"])
+    df = df[(df["order_date_dateorders"] >= "2016-01-01") & (df["order_date_dateorders"] < "2017-01-01")]
+    mes = df["order_date_dateorders"].dt.to_period("M").dt.start_time.rename("periodo")
+    esperado = df.groupby([mes, df["market"]], observed=True).agg(ventas=("sales", "sum"), pedidos=("order_id", "nunique"))
+    obtenido = serie(["ventas", "pedidos"], grano="M", por="market", desde="2016-01-01", hasta="2017-01-01")
+    # Todos los meses x mercados; los que no tienen pedidos, a 0
+    assert len(obtenido) == 12 * df["market"].nunique()
+    obtenido = obtenido[obtenido["pedidos"] > 0]
+    obtenido.index = obtenido.index.set_levels(obtenido.index.levels[1].astype(str), level="market")
+    esperado.index = esperado.index.set_levels(esperado.index.levels[1].astype(str), level="market")
+    pd.testing.assert_frame_equal(obtenido.sort_index(), esperado.sort_index(), check_dtype=False)
+
+
+def test_grano_desconocido():
+    with pytest.raises(ValueError):
+        serie("ventas", grano="Y")
@@ -0,0 +1,85 @@
+import math
+import os
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from comun.teselas import TAMAÑO, a_pixeles, piramide_guardada, teselas_lineas, teselas_puntos
+
+
+def _pixel(lat, lon, zoom):
+    # Web Mercator con math, punto a punto
+    lado = TAMAÑO * 2 ** zoom
+    y = (1 - math.log(math.tan(math.radians(lat)) + 1 / math.cos(math.radians(lat))) / math.pi) / 2
+    return math.floor((lon + 180) / 360 * lado), math.floor(y * lado)
+
+
+def _teselas(directorio):
+    return {tuple(int(p) for p in os.path.relpath(os.path.join(raiz, f), directorio)[:-4].split(os.sep))
+            for raiz, _, ficheros in os.walk(directorio) for f in ficheros if f.endswith(".png")}
+
+
+def test_a_pixeles():
+    x, y = a_pixeles([0, 40.4168, -33.8688], [0, -3.7038, 151.2093], 3)
+    assert (x[0], y[0]) == (1024, 1024)
+    assert [(math.floor(a), math.floor(b)) for a, b in zip(x[1:], y[1:])] == [_pixel(40.4168, -3.7038, 3),
+                                                                             _pixel(-33.8688, 151.2093, 3)]
+
+
+def test_teselas_de_los_puntos(tmp_path):
+    rng = np.random.default_rng(2)
+    lat, lon = rng.uniform(-60, 70, 300), rng.uniform(-179, 179, 300)
+    lat[5] = np.nan
+    radio = 2
+    escritas = teselas_puntos(str(tmp_path), lat, lon, colores="red", zoom_max=4, radio=radio)
+
+    # Cada punto va a las teselas que toca el cuadrado de su círculo (las que existen)
+    esperadas = set()
+    for z in range(5):
+        for la, lo in zip(lat, lon):
+            if np.isnan(la):
+                continue
+            x, y = _pixel(la, lo, z)
+            for ox in (-radio, radio):
+                for oy in (-radio, radio):
+                    tx, ty = (x + ox) // TAMAÑO, (y + oy) // TAMAÑO
+                    if 0 <= tx < 2 ** z and 0 <= ty < 2 ** z:
+                        esperadas.add((z, tx, ty))
+    assert _teselas(str(tmp_path)) == esperadas
+    assert escritas == len(esperadas)
+
+    # El centro de cada punto está pintado en su tesela
+    x, y = _pixel(lat[0], lon[0], 4)
+    tesela = Image.open(os.path.join(tmp_path, "4", str(x // TAMAÑO), f"{y // TAMAÑO}.png"))
+    assert tesela.getpixel((x % TAMAÑO, y % TAMAÑO))[:3] == (255, 0, 0)
+
+
+def test_punto_en_el_borde_va_a_dos_teselas(tmp_path):
+    # Longitud 0 es el borde entre las dos columnas de teselas del nivel 1
+    teselas_puntos(str(tmp_path), [45.0], [0.0], zoom_max=1)
+    assert _teselas(str(tmp_path)) == {(0, 0, 0), (1, 0, 0), (1, 1, 0)}
+
+
+def test_teselas_de_una_linea(tmp_path):
+    # Una línea en el ecuador de punta a punta: cruza todas las columnas de teselas
+    escritas = teselas_lineas(str(tmp_path), [1.0], [-170.0], [1.0], [170.0], zoom_max=3, anchos=2)
+    teselas = _teselas(str(tmp_path))
+    assert escritas == len(teselas)
+    for z in range(4):
+        assert {x for zz, x, _ in teselas if zz == z} == set(range(2 ** z))
+
+
+@pytest.mark.parametrize("cambio", [False, True])
+def test_piramide_solo_se_rehace_si_cambia(tmp_path, cambio):
+    directorio = os.path.join(tmp_path, "teselas_prueba")
+    llamadas = []
+
+    def dibujar(destino):
+        llamadas.append(destino)
+        teselas_puntos(destino, [10.0], [10.0], zoom_max=1)
+    assert piramide_guardada(directorio, dibujar, top=10)
+    assert piramide_guardada(directorio, dibujar, top=20 if cambio else 10) == cambio
+    assert len(llamadas) == 1 + cambio
+    assert os.path.exists(os.path.join(directorio, "vacia.png"))
+    assert not os.path.exists(directorio + ".tmp")
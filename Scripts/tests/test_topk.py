@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from comun.topk import top_k, top_k_bloques
+
+
+@pytest.fixture
+def tabla():
+    rng = np.random.default_rng(8)
+    n = 5000
+    df = pd.DataFrame({
+        # Pocos valores distintos: muchos empates
+        "valor": rng.integers(0, 300, n).astype("float64"),
+        "pedidos": rng.integers(0, 50, n),
+    }, index=pd.Index([f"clave {i}" for i in range(n)], name="clave"))
+    df.loc[df.sample(40, random_state=1).index, "valor"] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("k", [1, 10, 250])
+def test_igual_que_nlargest(tabla, k):
+    pd.testing.assert_frame_equal(top_k(tabla, k, "valor"), tabla.nlargest(k, "valor", keep="first"))
+    pd.testing.assert_frame_equal(top_k(tabla, k, "valor", ascendente=True), tabla.nsmallest(k, "valor", keep="first"))
+
+
+def test_por_bloques_con_soporte_minimo(tabla):
+    bloques = (tabla.iloc[i:i + 333] for i in range(0, len(tabla), 333))
+    resultado = top_k_bloques(bloques, 20, "valor", minimo=25, soporte="pedidos")
+    esperado = tabla[tabla["pedidos"] >= 25].nlargest(20, "valor", keep="first")
+    pd.testing.assert_frame_equal(resultado, esperado)
+
+
+def test_ratio_calculado_por_bloque(tabla):
+    def ratio(bloque):
+        return bloque.assign(ratio=bloque["valor"] / bloque["pedidos"].where(bloque["pedidos"] > 0))
+    bloques = (tabla.iloc[i:i + 700] for i in range(0, len(tabla), 700))
+    resultado = top_k_bloques(bloques, 15, "ratio", minimo=10, soporte="pedidos", preparar=ratio)
+    esperado = ratio(tabla).query("pedidos >= 10").sort_values("ratio", ascending=False, kind="stable").head(15)
+    pd.testing.assert_frame_equal(resultado, esperado)
+
+
+def test_menos_filas_que_k_y_k_cero(tabla):
+    pocas = tabla.iloc[:5]
+    pd.testing.assert_frame_equal(top_k(pocas, 10, "valor"), pocas.sort_values("valor", ascending=False, kind="stable"))
+    assert top_k(tabla, 0, "valor").empty